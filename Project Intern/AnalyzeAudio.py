@@ -1,24 +1,34 @@
 import os
 import json
 from google.genai import types
-from GeminiClient import safe_generate_content
-from Config import ALL_IN_ONE_UNIVERSAL_PROMPT, TRANSCRIBE_TRANSLATE_ONLY_PROMPT, MODEL_NAME
+from GeminiClient import generate_for_task
+from Config import ALL_IN_ONE_UNIVERSAL_PROMPT, TRANSCRIBE_TRANSLATE_ONLY_PROMPT
+from AudioPreprocess import prepare_audio_for_upload
 
-def _call_gemini_with_audio(prompt: str, audio_path: str) -> dict:
+def _call_gemini_with_audio(task: str, prefix_key: str, prefix: str, audio_path: str, prepared: dict = None, prompt_suffix: str = "") -> dict:
+    """
+    task = entry of Config.MODEL_FALLBACK_RULES (model tiers for this call).
+    prefix = static instructions (+ scenarios), sent as cached context when possible.
+    prepared = output of prepare_audio_for_upload (reuse it when calling Gemini twice on one file).
+    """
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio not found: {audio_path}")
 
-    with open(audio_path, "rb") as f:
-        audio_bytes = f.read()
+    if prepared is None:
+        prepared = prepare_audio_for_upload(audio_path)
 
     audio_part = types.Part.from_bytes(
-        data=audio_bytes,
-        mime_type="audio/wav"
+        data=prepared["data"],
+        mime_type=prepared["mime_type"]
     )
 
-    response = safe_generate_content(
-        model=MODEL_NAME,
-        contents=[prompt, audio_part],
+    contents = [prompt_suffix, audio_part] if prompt_suffix else [audio_part]
+
+    response, model_used = generate_for_task(
+        task,
+        prefix_key,
+        prefix,
+        contents,
         config={"response_mime_type": "application/json"},
         max_retries=10,
         base_delay=5.0,
@@ -27,17 +37,20 @@ def _call_gemini_with_audio(prompt: str, audio_path: str) -> dict:
 
     raw = response.text or ""
     try:
-        return json.loads(raw)
+        result = json.loads(raw)
     except json.JSONDecodeError:
         return {"error": "Invalid JSON returned", "raw": raw}
+    if isinstance(result, dict):
+        result["model_used"] = model_used
+    return result
 
-def transcribe_translate_audio(audio_path: str) -> dict:
+def transcribe_translate_audio(audio_path: str, prepared: dict = None, prompt_suffix: str = "") -> dict:
     """Cheaper Gemini call: transcript + translation only."""
-    return _call_gemini_with_audio(TRANSCRIBE_TRANSLATE_ONLY_PROMPT, audio_path)
+    return _call_gemini_with_audio("transcribe", "transcribe", TRANSCRIBE_TRANSLATE_ONLY_PROMPT, audio_path, prepared, prompt_suffix)
 
-def analyze_audio_all_in_one(audio_path: str, scenarios_text: str) -> dict:
-    prompt = ALL_IN_ONE_UNIVERSAL_PROMPT + f"\n\nScenarios:\n{scenarios_text}"
-    return _call_gemini_with_audio(prompt, audio_path)
+def analyze_audio_all_in_one(audio_path: str, scenarios_text: str, prepared: dict = None, prompt_suffix: str = "") -> dict:
+    prefix = ALL_IN_ONE_UNIVERSAL_PROMPT + f"\n\nScenarios:\n{scenarios_text}"
+    return _call_gemini_with_audio("audio_analysis", "all_in_one", prefix, audio_path, prepared, prompt_suffix)
 
 def format_language_used(languages):
     if not languages:
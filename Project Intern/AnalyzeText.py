@@ -1,11 +1,21 @@
 import os
 import json
-from GeminiClient import safe_generate_content
-from Config import MODEL_NAME, ALL_IN_ONE_UNIVERSAL_PROMPT
-from pypdf import PdfReader
-from docx import Document
-
-def extract_text_from_file(file_path: str) -> str:
+from GeminiClient import generate_for_task
+from Config import ALL_IN_ONE_UNIVERSAL_PROMPT, ALL_IN_ONE_BATCH_INSTRUCTIONS
+from ExtractionService import extract_pdf_text, extract_docx_text, EXTRACTOR_VERSION
+from DiskCache import DiskCache
+from Utils import file_sha256
+
+EXTRACT_CACHE_MAX_BYTES = int(os.getenv("EXTRACT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_extracted_text_cache = DiskCache("extracted_text", EXTRACT_CACHE_MAX_BYTES)
+
+def extract_text_from_file(file_path: str, content_hash: str = None) -> str:
+    """
+    PDF/DOCX text is cached on disk by content hash + extractor version,
+    so re-runs over the same files skip parsing. Pass content_hash if the
+    caller already has it (e.g. computed while uploading).
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Text file not found: {file_path}")
 
@@ -16,37 +26,34 @@ def extract_text_from_file(file_path: str) -> str:
             return f.read().strip()
 
     if ext == ".pdf":
-        parts = []
-        with open(file_path, "rb") as f:
-            reader = PdfReader(f)
-            for page in reader.pages:
-                t = page.extract_text() or ""
-                if t.strip():
-                    parts.append(t)
-        return "\n".join(parts).strip()
+        extractor = extract_pdf_text
+    elif ext == ".docx":
+        extractor = extract_docx_text
+    else:
+        raise ValueError(f"Unsupported text-based file type: {ext}")
 
-    if ext == ".docx":
-        doc = Document(file_path)
-        parts = [p.text for p in doc.paragraphs if p.text and p.text.strip()]
-        return "\n".join(parts).strip()
+    cache_key = f"{content_hash or file_sha256(file_path)}:{ext}:{EXTRACTOR_VERSION}"
+    cached = _extracted_text_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    raise ValueError(f"Unsupported text-based file type: {ext}")
+    text = extractor(file_path)
+    _extracted_text_cache.put(cache_key, text)
+    return text
 
 
-def analyze_text_all_in_one(text: str, scenarios_text: str) -> dict:
+def analyze_text_all_in_one(text: str, scenarios_text: str, prompt_suffix: str = "") -> dict:
     text = (text or "").strip()
     if not text:
         return {"error": "Empty text input"}
 
-    prompt = (
-        ALL_IN_ONE_UNIVERSAL_PROMPT
-        + f"\n\nScenarios:\n{scenarios_text}"
-        + f'\n\nINPUT TEXT:\n"""{text}"""'
-    )
-
-    response = safe_generate_content(
-        model=MODEL_NAME,
-        contents=prompt,
+    # static part (instructions + scenarios) is sent as cached context when possible
+    prefix = ALL_IN_ONE_UNIVERSAL_PROMPT + f"\n\nScenarios:\n{scenarios_text}"
+    response, model_used = generate_for_task(
+        "text_analysis",
+        "all_in_one",
+        prefix,
+        prompt_suffix + f'\n\nINPUT TEXT:\n"""{text}"""',
         config={"response_mime_type": "application/json"}
     )
 
@@ -54,9 +61,73 @@ def analyze_text_all_in_one(text: str, scenarios_text: str) -> dict:
     print("RAW TEXT ALL-IN-ONE RESPONSE:", raw)
 
     try:
-        return json.loads(raw)
+        result = json.loads(raw)
     except json.JSONDecodeError:
         return {"error": "Invalid JSON returned", "raw": raw}
+    if isinstance(result, dict):
+        result["model_used"] = model_used
+    return result
+
+
+def _valid_item(item) -> bool:
+    if not isinstance(item, dict):
+        return False
+    sentiment = item.get("sentiment")
+    return isinstance(sentiment, dict) and bool(sentiment.get("label"))
+
+
+def analyze_texts_batch(items, scenarios_text: str) -> dict:
+    """
+    Coalesced ALL-IN-ONE: items = [(input_id, text), ...] in ONE Gemini call.
+
+    Returns {input_id: result} for the items the answer covers. Items that are
+    missing or malformed (all of them if the answer is not a JSON array) are
+    left out: the caller analyzes those on their own.
+    """
+    items = [(str(i), (t or "").strip()) for i, t in items]
+
+    blocks = "\n\n".join(
+        f'<<<INPUT id="{input_id}">>>\n{text}\n<<<END INPUT>>>'
+        for input_id, text in items
+    )
+    prefix = ALL_IN_ONE_UNIVERSAL_PROMPT + f"\n\nScenarios:\n{scenarios_text}"
+
+    parsed = []
+    model_used = None
+    try:
+        response, model_used = generate_for_task(
+            "text_analysis",
+            "all_in_one",
+            prefix,
+            "\n\n" + ALL_IN_ONE_BATCH_INSTRUCTIONS + f"\n\nINPUTS:\n{blocks}",
+            config={"response_mime_type": "application/json"},
+            latency_key="all_in_one_batch",  # same cached prefix, much slower calls
+        )
+        raw = response.text or ""
+        print(f"RAW TEXT BATCH RESPONSE ({len(items)} inputs):", raw)
+        parsed = json.loads(raw)
+    except json.JSONDecodeError:
+        print("[Batch] Invalid JSON returned, falling back to single calls")
+    except Exception as e:
+        print("[Batch] Request failed, falling back to single calls:", e)
+
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results") or parsed.get("items") or []
+    if not isinstance(parsed, list):
+        parsed = []
+
+    wanted = {input_id for input_id, _ in items}
+    out = {}
+    for item in parsed:
+        if _valid_item(item) and str(item.get("id")) in wanted:
+            item["model_used"] = model_used
+            out.setdefault(str(item["id"]), item)
+
+    for input_id, _ in items:
+        if input_id not in out:
+            print(f"[Batch] Item {input_id} missing/malformed -> single call")
+
+    return out
 
 
 def format_language_used(languages):
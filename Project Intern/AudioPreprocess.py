@@ -0,0 +1,191 @@
+import io
+import os
+import wave
+
+# NumPy is optional: without it audio is uploaded as-is (correct MIME type only)
+try:
+    import numpy as np
+    from VoiceActivity import trim_silence
+    _NUMPY_AVAILABLE = True
+except Exception:
+    np = None
+    _NUMPY_AVAILABLE = False
+
+from Config import ENABLE_AUDIO_PREPROCESS, ENABLE_SILENCE_TRIM
+
+TARGET_SAMPLE_RATE = int(os.getenv("AUDIO_TARGET_SAMPLE_RATE", "16000"))
+READ_BLOCK_FRAMES = 1 << 18  # ~6 s at 44.1 kHz, keeps decoding memory flat
+
+AUDIO_MIME_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mp3",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+
+def guess_audio_mime_type(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return AUDIO_MIME_TYPES.get(ext, "application/octet-stream")
+
+
+def _lowpass_taps(sr_in: int, sr_out: int, n_taps: int = 63):
+    """Windowed-sinc anti-alias filter, cutoff just under the new Nyquist."""
+    cutoff = 0.9 * (sr_out / 2) / sr_in  # cycles per input sample
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(n_taps)
+    return (h / h.sum()).astype(np.float32)
+
+
+def _pcm_to_float(raw: bytes, sampwidth: int, channels: int):
+    if sampwidth == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sampwidth == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sampwidth == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        v = np.where(v >= 1 << 23, v - (1 << 24), v)
+        x = v.astype(np.float32) / float(1 << 23)
+    elif sampwidth == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sampwidth}")
+    return x.reshape(-1, channels)
+
+
+def load_wav_mono(path: str, target_rate: int = TARGET_SAMPLE_RATE):
+    """
+    Decode a PCM WAV block by block -> mono -> resampled to target_rate.
+    Never upsamples (8 kHz phone audio stays 8 kHz).
+    Returns (int16 samples, sample_rate).
+    """
+    with wave.open(path, "rb") as w:
+        channels = w.getnchannels()
+        sampwidth = w.getsampwidth()
+        sr_in = w.getframerate()
+        sr_out = min(sr_in, target_rate)
+
+        ratio = sr_in / sr_out
+        taps = _lowpass_taps(sr_in, sr_out) if sr_in > sr_out else None
+        history = np.zeros(0 if taps is None else len(taps) - 1, dtype=np.float32)
+
+        buf = np.zeros(0, dtype=np.float32)  # filtered input not yet consumed
+        buf_start = 0  # input index of buf[0]
+        next_k = 0  # next output sample index
+        out = []
+
+        while True:
+            raw = w.readframes(READ_BLOCK_FRAMES)
+            if not raw:
+                break
+
+            x = _pcm_to_float(raw, sampwidth, channels).mean(axis=1)
+
+            if taps is not None:
+                x_ext = np.concatenate([history, x])
+                history = x_ext[-(len(taps) - 1):]
+                x = np.convolve(x_ext, taps, mode="valid").astype(np.float32)
+
+            if ratio == 1.0:
+                out.append(x)
+                continue
+
+            buf = np.concatenate([buf, x])
+            last_pos = buf_start + len(buf) - 1
+            k_end = int(last_pos / ratio) + 1
+            if k_end > next_k:
+                pos = np.arange(next_k, k_end) * ratio - buf_start
+                out.append(np.interp(pos, np.arange(len(buf)), buf).astype(np.float32))
+                next_k = k_end
+
+            drop = max(0, int(next_k * ratio) - buf_start - 1)
+            buf = buf[drop:]
+            buf_start += drop
+
+    y = np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+    return (np.clip(y, -1.0, 1.0) * 32767.0).astype(np.int16), sr_out
+
+
+def encode_wav(samples, sample_rate: int) -> bytes:
+    bio = io.BytesIO()
+    with wave.open(bio, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(samples.astype("<i2").tobytes())
+    return bio.getvalue()
+
+
+def _is_compact_wav(path: str, target_rate: int) -> bool:
+    with wave.open(path, "rb") as w:
+        return w.getnchannels() == 1 and w.getsampwidth() <= 2 and w.getframerate() <= target_rate
+
+
+def prepare_audio_for_upload(audio_path: str) -> dict:
+    """
+    Shrink a recording before it goes to Gemini:
+      WAV -> mono, <= 16 kHz, 16-bit PCM WAV (stdlib wave + NumPy)
+          -> long silence / hold music cut out (ENABLE_SILENCE_TRIM)
+      other formats (mp3/m4a/...) are already compressed -> sent as-is with their real MIME type.
+
+    Returns:
+      data, mime_type, original_bytes, encoded_bytes, bytes_saved,
+      samples / sample_rate (mono int16 at <= 16 kHz; None when the file could not be decoded),
+      timestamp_map (trimmed -> original time, see VoiceActivity.to_original_time; None if not trimmed),
+      trimmed_seconds
+    """
+    original_bytes = os.path.getsize(audio_path)
+    ext = os.path.splitext(audio_path)[1].lower()
+
+    samples = None
+    sample_rate = None
+    timestamp_map = None
+    trimmed_seconds = 0.0
+    data = None
+    mime_type = guess_audio_mime_type(audio_path)
+
+    if ENABLE_AUDIO_PREPROCESS and _NUMPY_AVAILABLE and ext == ".wav":
+        try:
+            if ENABLE_SILENCE_TRIM or not _is_compact_wav(audio_path, TARGET_SAMPLE_RATE):
+                samples, sample_rate = load_wav_mono(audio_path)
+                if ENABLE_SILENCE_TRIM:
+                    before = len(samples)
+                    samples, timestamp_map = trim_silence(samples, sample_rate)
+                    trimmed_seconds = (before - len(samples)) / sample_rate
+                data = encode_wav(samples, sample_rate)
+        except (wave.Error, ValueError, EOFError) as e:
+            # e.g. float / ADPCM WAVs that stdlib wave cannot read
+            print(f"[AUDIO] Preprocess skipped for {os.path.basename(audio_path)}: {e}")
+            samples, sample_rate, timestamp_map, data = None, None, None, None
+
+    if data is None or len(data) >= original_bytes:
+        with open(audio_path, "rb") as f:
+            data = f.read()
+        # the original file goes out untrimmed: trimmed samples no longer match it
+        if trimmed_seconds:
+            samples, sample_rate = None, None
+        timestamp_map, trimmed_seconds = None, 0.0
+
+    bytes_saved = original_bytes - len(data)
+    if bytes_saved > 0:
+        trimmed = f", {trimmed_seconds:.1f}s silence/hold trimmed" if trimmed_seconds else ""
+        print(
+            f"[AUDIO] {os.path.basename(audio_path)}: {original_bytes / 1e6:.2f} MB -> "
+            f"{len(data) / 1e6:.2f} MB (saved {bytes_saved / 1e6:.2f} MB, "
+            f"{bytes_saved * 100 // max(1, original_bytes)}%{trimmed})"
+        )
+
+    return {
+        "data": data,
+        "mime_type": mime_type,
+        "original_bytes": original_bytes,
+        "encoded_bytes": len(data),
+        "bytes_saved": bytes_saved,
+        "samples": samples,
+        "sample_rate": sample_rate,
+        "timestamp_map": timestamp_map,
+        "trimmed_seconds": trimmed_seconds,
+    }
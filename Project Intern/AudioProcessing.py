@@ -3,7 +3,10 @@ from datetime import datetime
 
 from DBConnector import insert_session_record, get_all_scenarios
 from AnalyzeAudio import analyze_audio_all_in_one, transcribe_translate_audio, format_language_used
+from AudioPreprocess import prepare_audio_for_upload
 from Utils import detect_file_type, get_file_created_at
+from Metrics import STAGE_SECONDS, SVM_DECISIONS, FILES_PROCESSED
+from ResultMerge import merge_models
 
 # SVM is optional: if model not trained yet, we fallback to Gemini FULL
 try:
@@ -12,6 +15,13 @@ try:
 except Exception:
     _SVM_AVAILABLE = False
 
+# Long-audio segment mode needs NumPy; without it long calls go as one request
+try:
+    from LongAudio import long_audio_segments, transcribe_segments, analyze_segments
+    _LONG_AUDIO_AVAILABLE = True
+except Exception:
+    _LONG_AUDIO_AVAILABLE = False
+
 def process_single_audio_file(audio_path: str):
     """
     Hybrid pipeline:
@@ -19,6 +29,9 @@ def process_single_audio_file(audio_path: str):
     2) Local SVM -> first-pass complaint vs non-complaint
     3) If SVM uncertain OR model missing -> Gemini (full) for sentiment + scenario + explanation
 
+    Recordings over LongAudio.LONG_AUDIO_MIN_SECONDS run steps 1 and 3 per segment
+    in parallel; transcripts are stitched and segment sentiments combined.
+
     Returns dict for UI usage.
     """
     scenarios = get_all_scenarios()
@@ -27,15 +40,28 @@ def process_single_audio_file(audio_path: str):
         for s in scenarios
     )
 
+    # 0) Shrink audio once (mono / 16 kHz), reused by both Gemini calls
+    with STAGE_SECONDS.time(stage="audio_prepare"):
+        prepared = prepare_audio_for_upload(audio_path)
+
+    # Long recordings: split at silences, Gemini calls per segment run in parallel
+    segments = long_audio_segments(audio_path, prepared) if _LONG_AUDIO_AVAILABLE else None
+
     # 1) Cheap transcription/translation
-    base = transcribe_translate_audio(audio_path)
+    with STAGE_SECONDS.time(stage="audio_transcribe"):
+        if segments:
+            base = transcribe_segments(audio_path, segments)
+        else:
+            base = transcribe_translate_audio(audio_path, prepared)
     if base.get("error"):
         print("[Error] Transcribe/translate failed:", base.get("raw", ""))
+        FILES_PROCESSED.inc(kind="audio", outcome="error")
         return {"success": False, "error": base.get("error"), "raw": base.get("raw")}
 
     transcript = base.get("transcript")
     translation = base.get("translation")
     language_used = format_language_used(base.get("language_used"))
+    model_used = base.get("model_used")
 
     # 2) SVM first-pass (optional)
     sentiment_label = None
@@ -50,24 +76,33 @@ def process_single_audio_file(audio_path: str):
     if _SVM_AVAILABLE:
         try:
             text_for_cls = (translation or transcript or "").strip()
-            svm_label, p = predict_complaint(text_for_cls)
+            with STAGE_SECONDS.time(stage="svm_score"):
+                svm_label, p = predict_complaint(text_for_cls)
             need_full = should_call_gemini(p)
+            SVM_DECISIONS.inc(decision="escalate" if need_full else "auto")
             if not need_full:
                 sentiment_label = "Complaint" if svm_label == "Complaint" else "Non-Complaint"
                 sentiment_score = int(round(p * 100))
                 sentiment_tone = "auto"
                 explanation = f"Auto-classified by local SVM (confidence={sentiment_score}%)."
+                model_used = merge_models(model_used, "local-svm")
                 scenario_id = None
         except Exception as e:
             # any SVM error -> fallback to Gemini full
             print("[SVM] Fallback to Gemini FULL due to error:", e)
+            SVM_DECISIONS.inc(decision="error")
             need_full = True
 
     # 3) Gemini FULL if needed
     if need_full:
-        full = analyze_audio_all_in_one(audio_path, scenario_text)
+        with STAGE_SECONDS.time(stage="audio_full"):
+            if segments:
+                full = analyze_segments(audio_path, segments, scenario_text)
+            else:
+                full = analyze_audio_all_in_one(audio_path, scenario_text, prepared)
         if full.get("error"):
             print("[Error] Full audio analysis failed:", full.get("raw", ""))
+            FILES_PROCESSED.inc(kind="audio", outcome="error")
             return {"success": False, "error": full.get("error"), "raw": full.get("raw")}
 
         sentiment = full.get("sentiment", {}) or {}
@@ -80,6 +115,7 @@ def process_single_audio_file(audio_path: str):
         transcript = full.get("transcript") or transcript
         translation = full.get("translation") or translation
         language_used = format_language_used(full.get("language_used")) or language_used
+        model_used = merge_models(model_used, full.get("model_used"))
 
     file_created_at = get_file_created_at(audio_path)
     uploaded_at = datetime.now()
@@ -97,8 +133,10 @@ def process_single_audio_file(audio_path: str):
         scenario_id=scenario_id,
         language_used=language_used,
         file_created_at=file_created_at,
-        uploaded_at=uploaded_at
+        uploaded_at=uploaded_at,
+        model_used=model_used
     )
+    FILES_PROCESSED.inc(kind="audio", outcome="ok")
 
     return {
         "success": True,
@@ -111,5 +149,9 @@ def process_single_audio_file(audio_path: str):
         "score": sentiment_score,
         "tone": sentiment_tone,
         "explanation": explanation,
-        "scenario_id": scenario_id
+        "scenario_id": scenario_id,
+        "model_used": model_used,
+        "audio_bytes_saved": prepared["bytes_saved"],
+        "timestamp_map": prepared["timestamp_map"],
+        "segments": base.get("segments")
     }
@@ -0,0 +1,222 @@
+"""
+Synthetic ingestion corpus for benchmarks.
+
+Generates a folder shaped like LOCAL_INPUT_PATH:
+  audio/   stereo 44.1 kHz WAV calls (speech-like bursts, pauses, hold tone, silence)
+  docs/    multi-page PDFs, DOCX, short TXT feedback
+  zips/    ZIPs with nested folders mixing all of the above
+
+Usage (from "Project Intern"):
+  python -m Benchmarks.corpus_generator --out bench_corpus --scale small
+"""
+
+import os
+import io
+import wave
+import random
+import zipfile
+import argparse
+
+import numpy as np
+from docx import Document
+
+SCALES = {
+    # audio durations (s), pdf page counts, docx count, txt count, zip count, files per zip
+    "tiny": {"audio": [10, 20], "pdf_pages": [2, 5], "docx": 2, "txt": 5, "zips": 1, "zip_files": 4},
+    "small": {"audio": [15, 30, 60, 120], "pdf_pages": [2, 10, 60], "docx": 5, "txt": 30, "zips": 2, "zip_files": 10},
+    "medium": {"audio": [15, 30, 60, 120, 300, 900], "pdf_pages": [2, 10, 60, 200], "docx": 20, "txt": 200, "zips": 5, "zip_files": 25},
+}
+
+_PHRASES = [
+    "I have been waiting for my refund for three weeks",
+    "The agent was very helpful and polite",
+    "Why was I charged twice for the same transaction",
+    "Please update my address on the account",
+    "Saya nak tanya pasal baki akaun saya",
+    "The mobile app keeps logging me out",
+    "Thank you, the issue is solved now",
+    "I want to close this account, the fees are too high",
+    "Can you explain the interest rate on my loan",
+    "Nobody called me back like you promised",
+]
+
+
+def _sentence(rng: random.Random, n: int = 3) -> str:
+    return ". ".join(rng.choice(_PHRASES) for _ in range(n)) + "."
+
+
+# ===== audio =====
+def synth_call(seconds: float, rng: np.random.Generator, sample_rate: int = 44100):
+    """Stereo int16 call: alternating speech-like bursts, short pauses, a hold-tone stretch and silence."""
+    out = []
+    t = 0.0
+    while t < seconds:
+        kind = rng.choice(["speech", "speech", "speech", "pause", "hold", "silence"], p=[0.3, 0.25, 0.2, 0.15, 0.05, 0.05])
+        dur = {"speech": rng.uniform(1.5, 6), "pause": rng.uniform(0.2, 1.2), "hold": rng.uniform(5, 15), "silence": rng.uniform(2, 8)}[kind]
+        dur = min(dur, seconds - t)
+        n = int(dur * sample_rate)
+        ts = np.arange(n) / sample_rate
+        if kind == "speech":
+            # noise shaped by a ~4 Hz syllable envelope
+            env = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * ts + rng.uniform(0, 6)), 0, None)
+            x = rng.normal(0, 0.25, n) * env
+        elif kind == "hold":
+            x = 0.15 * np.sin(2 * np.pi * 440 * ts) + 0.1 * np.sin(2 * np.pi * 660 * ts)
+        else:
+            x = rng.normal(0, 0.002, n)
+        out.append(x)
+        t += dur
+
+    mono = np.concatenate(out) if out else np.zeros(0)
+    stereo = np.stack([mono, mono * 0.9], axis=1)
+    return (np.clip(stereo, -1, 1) * 32767).astype("<i2"), sample_rate
+
+
+def write_wav(path: str, seconds: float, rng: np.random.Generator):
+    data, sr = synth_call(seconds, rng)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(data.tobytes())
+
+
+# ===== documents =====
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_bytes(pages) -> bytes:
+    """Minimal text PDF (Helvetica), one list of lines per page. No external deps."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for i, lines in enumerate(pages):
+        ops = ["BT", "/F1 11 Tf", "14 TL", "60 750 Td"]
+        for ln in lines:
+            ops.append(f"({_pdf_escape(ln)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, o in enumerate(objs):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n".encode() + o + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def write_pdf(path: str, n_pages: int, rng: random.Random):
+    pages = [[f"Statement page {p + 1}"] + [_sentence(rng, 2) for _ in range(40)] for p in range(n_pages)]
+    with open(path, "wb") as f:
+        f.write(pdf_bytes(pages))
+
+
+def docx_bytes(rng: random.Random, paragraphs: int = 30) -> bytes:
+    doc = Document()
+    doc.add_heading("Customer complaint", level=1)
+    for _ in range(paragraphs):
+        doc.add_paragraph(_sentence(rng, rng.randint(2, 6)))
+    bio = io.BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+
+def write_docx(path: str, rng: random.Random):
+    with open(path, "wb") as f:
+        f.write(docx_bytes(rng, rng.randint(10, 60)))
+
+
+def write_txt(path: str, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_sentence(rng, rng.randint(1, 4)))
+
+
+# ===== zips =====
+def write_zip(path: str, n_files: int, rng: random.Random, np_rng: np.random.Generator):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for i in range(n_files):
+            folder = f"batch_{i % 3}/day_{i % 2}"
+            kind = rng.choice(["txt", "txt", "txt", "docx", "pdf", "wav"])
+            name = f"{folder}/item_{i:03d}.{kind}"
+            if kind == "txt":
+                z.writestr(name, _sentence(rng, rng.randint(1, 4)))
+            elif kind == "docx":
+                z.writestr(name, docx_bytes(rng, rng.randint(5, 20)))
+            elif kind == "pdf":
+                pages = [[_sentence(rng, 2) for _ in range(30)] for _ in range(rng.randint(1, 8))]
+                z.writestr(name, pdf_bytes(pages))
+            else:
+                data, sr = synth_call(rng.uniform(5, 30), np_rng)
+                bio = io.BytesIO()
+                with wave.open(bio, "wb") as w:
+                    w.setnchannels(2)
+                    w.setsampwidth(2)
+                    w.setframerate(sr)
+                    w.writeframes(data.tobytes())
+                z.writestr(name, bio.getvalue())
+
+
+def generate_corpus(out_dir: str, scale: str = "small", seed: int = 7) -> dict:
+    """Write the corpus and return a manifest {"files": {...counts}, "bytes": total}."""
+    spec = SCALES[scale]
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+
+    for sub in ("audio", "docs", "zips"):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+
+    counts = {"wav": 0, "pdf": 0, "docx": 0, "txt": 0, "zip": 0}
+
+    for i, secs in enumerate(spec["audio"]):
+        write_wav(os.path.join(out_dir, "audio", f"call_{i:03d}_{secs}s.wav"), secs, np_rng)
+        counts["wav"] += 1
+
+    for i, n_pages in enumerate(spec["pdf_pages"]):
+        write_pdf(os.path.join(out_dir, "docs", f"statement_{i:03d}_{n_pages}p.pdf"), n_pages, rng)
+        counts["pdf"] += 1
+
+    for i in range(spec["docx"]):
+        write_docx(os.path.join(out_dir, "docs", f"complaint_{i:03d}.docx"), rng)
+        counts["docx"] += 1
+
+    for i in range(spec["txt"]):
+        write_txt(os.path.join(out_dir, "docs", f"feedback_{i:04d}.txt"), rng)
+        counts["txt"] += 1
+
+    for i in range(spec["zips"]):
+        write_zip(os.path.join(out_dir, "zips", f"upload_{i:03d}.zip"), spec["zip_files"], rng, np_rng)
+        counts["zip"] += 1
+
+    total = 0
+    for root, _, files in os.walk(out_dir):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+
+    return {"scale": scale, "seed": seed, "files": counts, "bytes": total}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic ingestion corpus")
+    ap.add_argument("--out", default="bench_corpus")
+    ap.add_argument("--scale", choices=sorted(SCALES), default="small")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    info = generate_corpus(args.out, args.scale, args.seed)
+    print(f"[CORPUS] {args.out}: {info['files']} ({info['bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
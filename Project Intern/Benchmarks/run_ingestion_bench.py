@@ -0,0 +1,298 @@
+"""
+End-to-end ingestion benchmark.
+
+Runs the real pipeline (FolderProcessing.process_all_files_once or
+ZipFolderProcessing.process_zip_upload) over a synthetic corpus with
+  - FakeGeminiBackend instead of Gemini (latency / 429 / 503 configurable)
+  - a SQLite file instead of MySQL (Benchmarks/sqlite_db.py)
+  - a fresh extraction cache (unless --warm-cache)
+and prints one JSON document: files/sec, per-stage latency percentiles,
+LLM call counts and peak RSS (null on Windows, no getrusage). Compare two JSON
+files to spot regressions.
+
+Usage (from "Project Intern"):
+  python -m Benchmarks.run_ingestion_bench --scale small --out bench.json
+  python -m Benchmarks.run_ingestion_bench --mode zip --latency constant:0.05 --rate-429 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import zipfile
+from datetime import datetime
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {"count": 0}
+    s = sorted(values)
+
+    def pick(q):
+        return round(s[min(len(s) - 1, int(q * len(s)))], 4)
+
+    return {
+        "count": len(s),
+        "total": round(sum(s), 4),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": round(s[-1], 4),
+    }
+
+
+class StageTimer:
+    """Wraps module-level functions and records wall time per call, per stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, module, attr: str, stage: str):
+        fn = getattr(module, attr)
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - t0)
+
+        setattr(module, attr, timed)
+
+    def report(self) -> dict:
+        with self._lock:
+            return {stage: percentiles(v) for stage, v in sorted(self.samples.items())}
+
+
+def _peak_rss_mb():
+    """{"self", "children"} in MB, or None where getrusage is unavailable (Windows)."""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _count_inputs(corpus: str, zips_only: bool = False) -> int:
+    """Supported files in the corpus, ZIP members included (what should end up as DB rows)."""
+    from Utils import detect_file_type
+
+    n = 0
+    for root, _, files in os.walk(corpus):
+        for f in files:
+            p = os.path.join(root, f)
+            if f.lower().endswith(".zip"):
+                with zipfile.ZipFile(p) as z:
+                    n += sum(1 for m in z.namelist() if not m.endswith("/") and detect_file_type(m) in ("audio", "text"))
+            elif not zips_only and detect_file_type(f) in ("audio", "text"):
+                n += 1
+    return n
+
+
+def _instrument(timer: StageTimer, backend):
+    import AudioProcessing
+    import TextProcessing
+    import FolderProcessing
+    import ZipFolderProcessing
+
+    timer.wrap(TextProcessing, "extract_text_from_file", "text_extract")
+    timer.wrap(TextProcessing, "insert_text_record", "db_insert")
+    timer.wrap(AudioProcessing, "prepare_audio_for_upload", "audio_prepare")
+    timer.wrap(AudioProcessing, "insert_session_record", "db_insert")
+    timer.wrap(FolderProcessing, "safe_extract_zip", "zip_extract")
+    timer.wrap(ZipFolderProcessing, "safe_extract_zip", "zip_extract")
+    # whole-file stages (include the LLM wait)
+    timer.wrap(FolderProcessing, "process_single_audio_file", "audio_file")
+    timer.wrap(ZipFolderProcessing, "process_single_audio_file", "audio_file")
+    timer.wrap(FolderProcessing, "process_text_files", "text_group")
+    timer.wrap(ZipFolderProcessing, "process_text_files", "text_group")
+    # every LLM attempt, retries included
+    timer.wrap(backend, "generate_content", "llm_call")
+
+
+def _interactive_probe(timer: StageTimer, stop: threading.Event, interval: float):
+    """One small interactive analysis every `interval` s while the bulk run goes (latency under load)."""
+    from AnalyzeText import analyze_text_all_in_one
+    from Scheduler import job_context, PRIORITY_INTERACTIVE
+
+    n = 0
+    while not stop.wait(interval):
+        n += 1
+        t0 = time.perf_counter()
+        with job_context(PRIORITY_INTERACTIVE, "probe"):
+            analyze_text_all_in_one(f"Probe {n}: my card was declined twice today.", "ID 1: Test — probe")
+        timer.record("interactive_probe", time.perf_counter() - t0)
+
+
+def run(args) -> dict:
+    work = tempfile.mkdtemp(prefix="ingest_bench_")
+    corpus = args.corpus or os.path.join(work, "corpus")
+
+    # must be set before the pipeline modules are imported
+    if not args.warm_cache:
+        os.environ["CACHE_ROOT"] = os.path.join(work, "cache")
+    # fresh manifest, or FolderProcessing would skip files done by an earlier run
+    os.environ["MANIFEST_PATH"] = os.path.join(work, "manifest.sqlite3")
+
+    from Benchmarks import corpus_generator, sqlite_db
+
+    corpus_info = None
+    if not args.corpus or not os.path.isdir(corpus):
+        corpus_info = corpus_generator.generate_corpus(corpus, args.scale, args.seed)
+
+    db_path = os.path.join(work, "bench.sqlite3")
+    sqlite_db.install(db_path)
+
+    import GeminiClient
+    import Hedging
+    import Metrics
+    from FakeGemini import FakeGeminiBackend
+    import FolderProcessing
+    import ZipFolderProcessing
+
+    backend = FakeGeminiBackend(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_503=args.rate_503,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+        overloaded_models=[m.strip() for m in args.overloaded_models.split(",") if m.strip()],
+    )
+    GeminiClient.set_backend(backend)
+
+    if not args.keep_delays:
+        FolderProcessing.TEXT_DELAY_SECONDS = 0
+        FolderProcessing.AUDIO_DELAY_SECONDS = 0
+
+    timer = StageTimer()
+    _instrument(timer, backend)
+
+    expected = _count_inputs(corpus, zips_only=args.mode == "zip")
+
+    stop = threading.Event()
+    probe = None
+    if args.probe_interval > 0:
+        probe = threading.Thread(target=_interactive_probe, args=(timer, stop, args.probe_interval), daemon=True)
+        probe.start()
+
+    t0 = time.perf_counter()
+    if args.mode == "folder":
+        FolderProcessing.LOCAL_INPUT_PATH = corpus
+        FolderProcessing.process_all_files_once()
+    else:
+        for root, _, files in os.walk(corpus):
+            for f in sorted(files):
+                if f.lower().endswith(".zip"):
+                    ZipFolderProcessing.process_zip_upload(os.path.join(root, f))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    if probe:
+        probe.join()
+
+    rows = sqlite_db.row_counts(db_path)
+    stored = rows["audio_sessions"] + rows["text_sessions"]
+    llm = {k: v for k, v in backend.stats.items() if k not in ("latencies", "in_flight")}
+    llm["prompt_cache"] = dict(GeminiClient.prompt_prefix_cache.stats)
+    llm["backoff_seconds"] = round(Metrics.LLM_BACKOFF_SECONDS.value(), 3)
+    llm["hedges"] = Hedging.hedge_stats()
+
+    result = {
+        "benchmark": "ingestion",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "mode": args.mode,
+            "scale": args.scale if corpus_info else None,
+            "corpus": args.corpus,
+            "seed": args.seed,
+            "latency": args.latency,
+            "rate_429": args.rate_429,
+            "rate_503": args.rate_503,
+            "max_concurrency": args.max_concurrency,
+            "overloaded_models": args.overloaded_models,
+            "warm_cache": args.warm_cache,
+            "keep_delays": args.keep_delays,
+            "probe_interval": args.probe_interval,
+        },
+        "corpus": corpus_info,
+        "files_expected": expected,
+        "files_stored": stored,
+        "rows": rows,
+        "models_used": sqlite_db.model_counts(db_path),
+        "seconds": round(elapsed, 3),
+        "files_per_sec": round(stored / elapsed, 3) if elapsed > 0 else None,
+        "stages": timer.report(),
+        "llm": llm,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+    if not args.keep_work:
+        shutil.rmtree(work, ignore_errors=True)
+    else:
+        result["work_dir"] = work
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="End-to-end ingestion benchmark (fake LLM, SQLite DB)")
+    ap.add_argument("--mode", choices=["folder", "zip"], default="folder")
+    ap.add_argument("--corpus", help="existing corpus folder (default: generate one)")
+    ap.add_argument("--scale", default="small", help="corpus size when generating: tiny | small | medium")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency", default="lognormal:0.3:0.5", help="fake LLM latency, see FakeGemini.parse_latency")
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-503", type=float, default=0.0)
+    ap.add_argument("--max-concurrency", type=int, default=0)
+    ap.add_argument("--overloaded-models", default="", help="comma-separated models the fake LLM always answers 503")
+    ap.add_argument("--warm-cache", action="store_true", help="reuse the normal extraction cache")
+    ap.add_argument("--keep-delays", action="store_true", help="keep FolderProcessing sleeps between files")
+    ap.add_argument("--keep-work", action="store_true", help="keep the temp corpus / SQLite file")
+    ap.add_argument("--probe-interval", type=float, default=0.0,
+                    help="send an interactive-priority call every N seconds during the run (0 = off)")
+    ap.add_argument("--out", help="write JSON here as well as stdout")
+    args = ap.parse_args()
+
+    result = run(args)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+SQLite stand-in for DBConnector in benchmarks.
+
+install(path) replaces DBConnector.get_db_connection with a connection that
+speaks the subset of the mysql.connector API the pipeline uses
+(cursor(dictionary=True), execute with %s placeholders, fetchone/fetchall,
+commit, close, is_connected). Schema = the columns the ingestion path writes.
+"""
+
+import sqlite3
+import threading
+
+import DBConnector
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    scenario_id INTEGER PRIMARY KEY,
+    scenario_name TEXT,
+    scenario_description TEXT
+);
+CREATE TABLE IF NOT EXISTS audio_sessions (
+    session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    audio_filename TEXT, audio_path TEXT, file_type TEXT,
+    sentiment_label TEXT, sentiment_score REAL, sentiment_tone TEXT, sentiment_explanation TEXT,
+    scenario_id INTEGER, language_used TEXT,
+    file_created_at TIMESTAMP, uploaded_at TIMESTAMP, model_used TEXT,
+    human_sentiment_label TEXT, human_updated_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS text_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text_filename TEXT, text_path TEXT, file_type TEXT,
+    sentiment_label TEXT, sentiment_score REAL, sentiment_tone TEXT, sentiment_explanation TEXT,
+    scenario_id INTEGER, language_used TEXT,
+    file_created_at TIMESTAMP, uploaded_at TIMESTAMP, model_used TEXT,
+    human_sentiment_label TEXT, human_updated_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS session_index (
+    source_type TEXT NOT NULL, session_pk INTEGER NOT NULL,
+    uploaded_at TIMESTAMP, sentiment_label TEXT, human_sentiment_label TEXT,
+    scenario_id INTEGER, file_type TEXT NOT NULL,
+    PRIMARY KEY (source_type, session_pk)
+);
+CREATE TABLE IF NOT EXISTS session_search (
+    source_type TEXT NOT NULL, session_pk INTEGER NOT NULL, body TEXT NOT NULL,
+    PRIMARY KEY (source_type, session_pk)
+);
+CREATE TABLE IF NOT EXISTS session_transcripts (
+    source_type TEXT NOT NULL, session_pk INTEGER NOT NULL, codec TEXT NOT NULL,
+    transcript_raw_z BLOB, transcript_english_z BLOB, raw_bytes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source_type, session_pk)
+);
+CREATE INDEX IF NOT EXISTS idx_session_index_uploaded ON session_index (uploaded_at, source_type, session_pk);
+"""
+
+SCENARIOS = [
+    (1, "Refund delay", "Client waiting for a refund or reversal"),
+    (2, "Double charge", "Client charged twice or wrongly"),
+    (3, "Account update", "Address, phone or profile change"),
+    (4, "App issue", "Mobile / online banking not working"),
+    (5, "General enquiry", "Questions about products, rates or balances"),
+]
+
+
+class _Cursor:
+    def __init__(self, cur, dictionary: bool):
+        self._cur = cur
+        self._dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        self._cur.execute(sql.replace("%s", "?"), tuple(params or ()))
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {d[0]: v for d, v in zip(self._cur.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    def close(self):
+        self._cur.close()
+
+
+class _Connection:
+    def __init__(self, path: str, lock: threading.Lock):
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = lock
+
+    def is_connected(self):
+        return True
+
+    def cursor(self, dictionary: bool = False):
+        return _Cursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        # one writer at a time, like a single MySQL row lock would serialise these
+        with self._lock:
+            self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def install(path: str) -> None:
+    """Create the schema in `path` and route DBConnector to it."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executemany("INSERT OR IGNORE INTO scenarios VALUES (?, ?, ?)", SCENARIOS)
+    conn.commit()
+    conn.close()
+
+    lock = threading.Lock()
+    DBConnector.get_db_connection = lambda: _Connection(path, lock)
+
+
+def row_counts(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            "audio_sessions": conn.execute("SELECT COUNT(*) FROM audio_sessions").fetchone()[0],
+            "text_sessions": conn.execute("SELECT COUNT(*) FROM text_sessions").fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def model_counts(path: str) -> dict:
+    """{model_used: sessions} over both session tables."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT model_used, COUNT(*) FROM ("
+            "SELECT model_used FROM audio_sessions UNION ALL SELECT model_used FROM text_sessions"
+            ") GROUP BY model_used"
+        ).fetchall()
+        return {str(m): n for m, n in rows}
+    finally:
+        conn.close()
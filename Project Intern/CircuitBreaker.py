@@ -0,0 +1,220 @@
+"""
+Process-wide circuit breaker for Gemini overload (503 / "overloaded").
+
+  closed     calls go through; BREAKER_FAILURE_THRESHOLD overload errors in a row -> open
+  open       nobody calls Gemini; callers wait here (no per-file exponential sleeps)
+             for BREAKER_OPEN_SECONDS (doubles on every failed probe, up to BREAKER_MAX_OPEN_SECONDS)
+  half_open  exactly one caller sends a probe; success -> closed, overload -> open again
+
+After a successful probe the queued callers are released gradually: 1 call in
+flight, then 2, 4, ... (doubling each time that many calls succeed) until
+BREAKER_RAMP_MAX, so returning capacity is not hit by the whole herd at once.
+An overload during the ramp re-opens the breaker immediately.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager, ExitStack
+
+from Metrics import LLM_BREAKER_TRANSITIONS, LLM_BREAKER_WAIT_SECONDS
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "20"))
+BREAKER_MAX_OPEN_SECONDS = float(os.getenv("BREAKER_MAX_OPEN_SECONDS", "300"))
+BREAKER_RAMP_MAX = int(os.getenv("BREAKER_RAMP_MAX", "16"))
+# a caller gives up after waiting this long for the breaker to close
+BREAKER_MAX_WAIT_SECONDS = float(os.getenv("BREAKER_MAX_WAIT_SECONDS", "900"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS,
+        ramp_max: int = BREAKER_RAMP_MAX,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.ramp_max = ramp_max
+
+        self._cond = threading.Condition()
+        self.state = CLOSED
+        self._failures = 0
+        self._open_seconds = open_seconds
+        self._open_until = 0.0
+        self._probe_out = False
+        self._in_flight = 0
+        self._ramp_limit = None   # None = no limit
+        self._ramp_ok = 0
+
+    # ===== transitions (lock held) =====
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"[BREAKER] {self.state} -> {state}")
+            LLM_BREAKER_TRANSITIONS.inc(state=state)
+        self.state = state
+
+    def _open(self, longer: bool):
+        if longer:
+            self._open_seconds = min(self.max_open_seconds, self._open_seconds * 2)
+        self._open_until = time.monotonic() + self._open_seconds
+        self._failures = 0
+        self._ramp_limit = None
+        self._probe_out = False
+        self._set_state(OPEN)
+        self._cond.notify_all()
+
+    def _take(self):
+        """Take a permit if one is free (lock held): True = probe, False = normal call, None = refused."""
+        if self.state == OPEN and time.monotonic() >= self._open_until:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN and not self._probe_out:
+            self._probe_out = True
+            self._in_flight += 1
+            return True
+        if self.state == CLOSED and (self._ramp_limit is None or self._in_flight < self._ramp_limit):
+            self._in_flight += 1
+            return False
+        return None
+
+    def _ready(self) -> bool:
+        """Would _take() succeed now (lock held)?"""
+        if self.state == OPEN:
+            return time.monotonic() >= self._open_until
+        if self.state == HALF_OPEN:
+            return not self._probe_out
+        return self._ramp_limit is None or self._in_flight < self._ramp_limit
+
+    def _wait(self, max_wait: float, take: bool):
+        t0 = time.monotonic()
+        deadline = t0 + max_wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if take:
+                    is_probe = self._take()
+                    if is_probe is not None:
+                        break
+                elif self._ready():
+                    is_probe = None
+                    break
+
+                if now >= deadline:
+                    raise CircuitOpenError(
+                        f"Gemini circuit breaker still {self.state} after waiting {max_wait:.0f}s"
+                    )
+                wake = deadline
+                if self.state == OPEN:
+                    wake = min(wake, self._open_until)
+                self._cond.wait(max(0.05, wake - now))
+
+        waited = time.monotonic() - t0
+        if waited > 0.001:
+            LLM_BREAKER_WAIT_SECONDS.observe(waited)
+        return is_probe
+
+    # ===== caller API =====
+    def acquire(self, max_wait: float = BREAKER_MAX_WAIT_SECONDS) -> bool:
+        """Block until a call may be sent. Returns True if this call is the half-open probe."""
+        return self._wait(max_wait, take=True)
+
+    def wait_ready(self, max_wait: float = BREAKER_MAX_WAIT_SECONDS) -> None:
+        """Block until a call could be sent, without taking a permit (try_acquire may still lose the race)."""
+        self._wait(max_wait, take=False)
+
+    def try_acquire(self):
+        """Non-blocking acquire: True = probe, False = normal call, None = not now."""
+        with self._cond:
+            return self._take()
+
+    def release(self, is_probe: bool, outcome: str) -> None:
+        """outcome: "ok" | "overload" | "error" (other errors do not move the breaker)."""
+        with self._cond:
+            self._in_flight -= 1
+
+            if is_probe:
+                self._probe_out = False
+                if outcome == "ok":
+                    self._open_seconds = self.base_open_seconds
+                    self._failures = 0
+                    self._ramp_limit, self._ramp_ok = 1, 0
+                    self._set_state(CLOSED)
+                elif outcome == "overload":
+                    self._open(longer=True)
+                # "error": stay half-open, the next caller probes
+                self._cond.notify_all()
+                return
+
+            if self.state != CLOSED:
+                return
+
+            if outcome == "ok":
+                self._failures = 0
+                if self._ramp_limit is not None:
+                    self._ramp_ok += 1
+                    if self._ramp_ok >= self._ramp_limit:
+                        self._ramp_limit *= 2
+                        self._ramp_ok = 0
+                        if self._ramp_limit > self.ramp_max:
+                            self._ramp_limit = None
+            elif outcome == "overload":
+                if self._ramp_limit is not None:
+                    self._open(longer=True)     # capacity not really back yet
+                else:
+                    self._failures += 1
+                    if self._failures >= self.failure_threshold:
+                        self._open(longer=False)
+            self._cond.notify_all()
+
+    @contextmanager
+    def guard(self, classify, max_wait: float = BREAKER_MAX_WAIT_SECONDS, slot=None):
+        """
+        with breaker.guard(classify): send one request
+        classify(exception) -> "overload" | "error"
+        slot: optional context manager factory (e.g. Scheduler.llm_slot) held while
+        the request runs. It is only taken once the breaker would let the call
+        through, so no caller sits on a slot while the breaker is open; if the
+        permit is gone by the time the slot is granted, the slot goes back and
+        the caller waits again.
+        """
+        held = ExitStack()
+        if slot is None:
+            is_probe = self.acquire(max_wait)
+        else:
+            deadline = time.monotonic() + max_wait
+            while True:
+                self.wait_ready(max(0.0, deadline - time.monotonic()))
+                held.enter_context(slot())
+                is_probe = self.try_acquire()
+                if is_probe is not None:
+                    break
+                held.close()
+
+        with held:
+            try:
+                yield
+            except Exception as e:
+                self.release(is_probe, classify(e))
+                raise
+            self.release(is_probe, "ok")
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "state": self.state,
+                "in_flight": self._in_flight,
+                "ramp_limit": self._ramp_limit,
+                "open_for": max(0.0, round(self._open_until - time.monotonic(), 1)) if self.state == OPEN else 0.0,
+            }
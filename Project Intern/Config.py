@@ -2,9 +2,26 @@ import os
 
 ENABLE_FORMALISATION = False
 ENABLE_TRANSLATION = False
+ENABLE_AUDIO_PREPROCESS = True  # down-mix / resample WAV locally before upload
+ENABLE_SILENCE_TRIM = True  # cut long silence / hold music (see VoiceActivity.py)
+ENABLE_PROMPT_CACHE = True  # static prompt + scenarios as Gemini cached context (see GeminiClient.py)
+ENABLE_CIRCUIT_BREAKER = True  # shared open / half-open / closed breaker on Gemini 503s (see CircuitBreaker.py)
+ENABLE_LLM_SCHEDULER = True  # priority + per-user fair queuing of Gemini calls (see Scheduler.py)
+ENABLE_MODEL_FALLBACK = True  # lighter model tier during sustained overload (see MODEL_FALLBACK_RULES)
+ENABLE_HEDGED_REQUESTS = True  # duplicate slow interactive Gemini calls, first answer wins (see Hedging.py)
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 MODEL_NAME = "gemini-2.5-flash"
+MODEL_LITE_NAME = "gemini-2.5-flash-lite"
+
+# Model tiers per task, best first. A call moves to the next tier after
+# `overloads` 503/overloaded errors in a row, or at once while that model's
+# circuit breaker is open. The last tier keeps retrying as before.
+MODEL_FALLBACK_RULES = {
+    "transcribe": {"models": [MODEL_NAME, MODEL_LITE_NAME], "overloads": 2},
+    "audio_analysis": {"models": [MODEL_NAME, MODEL_LITE_NAME], "overloads": 4},
+    "text_analysis": {"models": [MODEL_NAME, MODEL_LITE_NAME], "overloads": 3},
+}
 
 ALL_IN_ONE_UNIVERSAL_PROMPT = """
 You are an AI engine for client assessment analytics.
@@ -112,3 +129,36 @@ Return ONLY valid JSON exactly:
   "language_used": ["Mandarin", "Hokkien", "English"]
 }
 """.strip()
+
+
+
+# ===== Coalesced TEXT requests: several short inputs in ONE call (appended after ALL_IN_ONE_UNIVERSAL_PROMPT) =====
+ENABLE_TEXT_COALESCING = True
+
+ALL_IN_ONE_BATCH_INSTRUCTIONS = """
+BATCH MODE:
+You will receive SEVERAL independent TEXT inputs. Each one is wrapped as:
+<<<INPUT id="...">>>
+...text...
+<<<END INPUT>>>
+
+Analyse EACH input on its own, exactly as described above (never mix content between inputs).
+
+OUTPUT FORMAT (overrides the single-input format):
+Return ONLY a valid JSON array with ONE object per input, in any order:
+[
+  {
+    "id": "<the input id>",
+    "transcript": "...",
+    "translation": "...",
+    "language_used": ["English"],
+    "sentiment": {
+      "label": "Positive | Neutral | Complaint",
+      "tone": "angry | calm | frustrated | polite | stressed",
+      "score": 0-100,
+      "explanation": "short explanation"
+    },
+    "scenario_id": number
+  }
+]
+""".strip()
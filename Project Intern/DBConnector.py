@@ -1,9 +1,17 @@
 import os
+import time
+import contextvars
 import mysql.connector
 from mysql.connector import Error
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from Metrics import DB_QUERY_SECONDS, DB_ERRORS
+import SessionIndex  # module imports: SessionIndex / SessionSearch / TranscriptStore import DBConnector too
+import SessionSearch
+import TranscriptStore
+
 
 # DB Connection (use ENV if available)
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -32,6 +40,43 @@ def get_db_connection():
         print("[DB ERROR]", e)
     return None
 
+# INGEST JOB FENCING (Worker.py)
+# {file path: (job_id, fence)} of ingest_jobs rows claimed by this worker.
+# A session row for such a path is only committed together with marking its
+# job done, and only while the claim (fence) is still ours -> no duplicates
+# when a lease expires and another worker re-runs the same file.
+_ingest_jobs = contextvars.ContextVar("ingest_jobs", default=None)
+
+
+@contextmanager
+def ingest_job_context(jobs: dict):
+    token = _ingest_jobs.set(jobs)
+    try:
+        yield
+    finally:
+        _ingest_jobs.reset(token)
+
+
+def _fence_ingest_job(cursor, path: str, table: str, row_id) -> bool:
+    """Mark the job for `path` done in the caller's transaction. False = claim lost."""
+    jobs = _ingest_jobs.get()
+    if not jobs or path not in jobs:
+        return True
+
+    job_id, fence = jobs[path]
+    cursor.execute("""
+        UPDATE ingest_jobs
+        SET status = 'done',
+            result_table = %s,
+            result_id = %s,
+            lease_owner = NULL,
+            lease_expires_at = NULL,
+            error = NULL
+        WHERE job_id = %s AND fence = %s AND status = 'running'
+    """, (table, row_id, job_id, fence))
+    return cursor.rowcount == 1
+
+
 # INSERT: audio_sessions
 def insert_session_record(
     *,
@@ -47,10 +92,14 @@ def insert_session_record(
     scenario_id: int = None,
     language_used: str = "Unknown",
     file_created_at=None,
-    uploaded_at=None
+    uploaded_at=None,
+    model_used: str = None
 ):
+    t0 = time.perf_counter()
+    uploaded_at = uploaded_at or datetime.now()  # partition key (Partitions.py), never NULL
     connection = get_db_connection()
     if not connection:
+        DB_ERRORS.inc(op="insert_audio")
         return
 
     cursor = connection.cursor()
@@ -60,8 +109,6 @@ def insert_session_record(
             audio_filename,
             audio_path,
             file_type,
-            transcript_raw,
-            transcript_english,
             sentiment_label,
             sentiment_score,
             sentiment_tone,
@@ -69,17 +116,16 @@ def insert_session_record(
             scenario_id,
             language_used,
             file_created_at,
-            uploaded_at
+            uploaded_at,
+            model_used
         )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
 
     values = (
         file_name,
         audio_path,
         file_type,
-        transcript,
-        translation,
         sentiment_label,
         sentiment_score,
         sentiment_tone,
@@ -87,18 +133,36 @@ def insert_session_record(
         scenario_id,
         language_used,
         file_created_at,
-        uploaded_at
+        uploaded_at,
+        model_used
     )
 
     try:
         cursor.execute(sql, values)
+        row_id = cursor.lastrowid
+        SessionIndex.index_session(
+            cursor, "audio", row_id,
+            file_name=file_name, uploaded_at=uploaded_at,
+            sentiment_label=sentiment_label, scenario_id=scenario_id,
+        )
+        SessionSearch.index_session_text(
+            cursor, "audio", row_id,
+            file_name=file_name, transcript=transcript, translation=translation,
+        )
+        TranscriptStore.put(cursor, "audio", row_id, transcript, translation)
+        if not _fence_ingest_job(cursor, audio_path, "audio_sessions", row_id):
+            connection.rollback()
+            print(f"[DB] Job lease lost, AUDIO session not stored: {file_name}")
+            return
         connection.commit()
         print(f"[DB] Inserted AUDIO session: {file_name} (type={file_type})")
     except Error as e:
         print("[DB ERROR]", e)
+        DB_ERRORS.inc(op="insert_audio")
     finally:
         cursor.close()
         connection.close()
+        DB_QUERY_SECONDS.observe(time.perf_counter() - t0, op="insert_audio")
 
 
 # INSERT: text_sessions
@@ -116,10 +180,14 @@ def insert_text_record(
     scenario_id: int = None,
     language_used: str = "Unknown",
     file_created_at=None,
-    uploaded_at=None
+    uploaded_at=None,
+    model_used: str = None
 ):
+    t0 = time.perf_counter()
+    uploaded_at = uploaded_at or datetime.now()  # partition key (Partitions.py), never NULL
     connection = get_db_connection()
     if not connection:
+        DB_ERRORS.inc(op="insert_text")
         return
 
     cursor = connection.cursor()
@@ -129,8 +197,6 @@ def insert_text_record(
             text_filename,
             text_path,
             file_type,
-            transcript_raw,
-            transcript_english,
             sentiment_label,
             sentiment_score,
             sentiment_tone,
@@ -138,17 +204,16 @@ def insert_text_record(
             scenario_id,
             language_used,
             file_created_at,
-            uploaded_at
+            uploaded_at,
+            model_used
         )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
 
     values = (
         file_name,
         text_path,
         file_type,
-        transcript,
-        translation,
         sentiment_label,
         sentiment_score,
         sentiment_tone,
@@ -156,18 +221,36 @@ def insert_text_record(
         scenario_id,
         language_used,
         file_created_at,
-        uploaded_at
+        uploaded_at,
+        model_used
     )
 
     try:
         cursor.execute(sql, values)
+        row_id = cursor.lastrowid
+        SessionIndex.index_session(
+            cursor, "text", row_id,
+            file_name=file_name, uploaded_at=uploaded_at,
+            sentiment_label=sentiment_label, scenario_id=scenario_id,
+        )
+        SessionSearch.index_session_text(
+            cursor, "text", row_id,
+            file_name=file_name, transcript=transcript, translation=translation,
+        )
+        TranscriptStore.put(cursor, "text", row_id, transcript, translation)
+        if not _fence_ingest_job(cursor, text_path, "text_sessions", row_id):
+            connection.rollback()
+            print(f"[DB] Job lease lost, TEXT session not stored: {file_name}")
+            return
         connection.commit()
         print(f"[DB] Inserted TEXT session: {file_name} (type={file_type})")
     except Error as e:
         print("[DB ERROR]", e)
+        DB_ERRORS.inc(op="insert_text")
     finally:
         cursor.close()
         connection.close()
+        DB_QUERY_SECONDS.observe(time.perf_counter() - t0, op="insert_text")
 
 
 # SCENARIOS
@@ -214,6 +297,7 @@ def update_human_sentiment_label(session_id: int, human_label: str) -> bool:
                 human_updated_at = %s
             WHERE session_id = %s
         """, (human_label, datetime.now(), int(session_id)))
+        SessionIndex.index_human_label(cursor, "audio", session_id, human_label)
         connection.commit()
         return True
     except Error as e:
@@ -225,11 +309,48 @@ def update_human_sentiment_label(session_id: int, human_label: str) -> bool:
 
 
 # FETCH FOR UI (AUDIO + TEXT)
+_UI_AUDIO_SELECT = """
+    SELECT
+        'audio' AS source_type,
+        a.session_id AS session_pk,
+        a.audio_filename AS file_name,
+        a.file_type,
+        a.sentiment_label,
+        CAST(a.sentiment_score AS DECIMAL(10,2)) AS sentiment_score,
+        a.sentiment_tone,
+        a.sentiment_explanation,
+        a.scenario_id,
+        a.uploaded_at,
+        a.human_sentiment_label,
+        a.human_updated_at
+    FROM audio_sessions a
+"""
+
+_UI_TEXT_SELECT = """
+    SELECT
+        'text' AS source_type,
+        t.id AS session_pk,
+        t.text_filename AS file_name,
+        t.file_type,
+        t.sentiment_label,
+        CAST(t.sentiment_score AS DECIMAL(10,2)) AS sentiment_score,
+        t.sentiment_tone,
+        t.sentiment_explanation,
+        t.scenario_id,
+        t.uploaded_at,
+        t.human_sentiment_label,
+        t.human_updated_at
+    FROM text_sessions t
+"""
+
+
 def fetch_sessions_for_ui(limit: int = 500) -> List[Dict]:
     """
     Returns combined latest sessions (audio + text) for UI.
+    Newest keys come from session_index (see SessionIndex.py), rows by primary key.
+    Transcripts are not included: TranscriptStore.get / attach when needed.
     Output fields:
-      source_type, session_pk, file_name, file_type, transcript_raw, transcript_english,
+      source_type, session_pk, file_name, file_type,
       sentiment_label, sentiment_score, sentiment_tone, sentiment_explanation,
       scenario_id, uploaded_at, human_sentiment_label, human_updated_at
     """
@@ -239,47 +360,8 @@ def fetch_sessions_for_ui(limit: int = 500) -> List[Dict]:
 
     cursor = connection.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT
-                'audio' AS source_type,
-                a.session_id AS session_pk,
-                a.audio_filename AS file_name,
-                a.file_type,
-                a.transcript_raw,
-                a.transcript_english,
-                a.sentiment_label,
-                CAST(a.sentiment_score AS DECIMAL(10,2)) AS sentiment_score,
-                a.sentiment_tone,
-                a.sentiment_explanation,
-                a.scenario_id,
-                a.uploaded_at,
-                a.human_sentiment_label,
-                a.human_updated_at
-            FROM audio_sessions a
-
-            UNION ALL
-
-            SELECT
-                'text' AS source_type,
-                t.id AS session_pk,
-                t.text_filename AS file_name,
-                t.file_type,
-                t.transcript_raw,
-                t.transcript_english,
-                t.sentiment_label,
-                CAST(t.sentiment_score AS DECIMAL(10,2)) AS sentiment_score,
-                t.sentiment_tone,
-                t.sentiment_explanation,
-                t.scenario_id,
-                t.uploaded_at,
-                t.human_sentiment_label,
-                t.human_updated_at
-            FROM text_sessions t
-
-            ORDER BY uploaded_at DESC
-            LIMIT %s
-        """, (int(limit),))
-        return cursor.fetchall()
+        _, keys = SessionIndex.query_keys(cursor, limit=limit)
+        return SessionIndex.fetch_by_keys(cursor, keys, _UI_AUDIO_SELECT, _UI_TEXT_SELECT, "session_pk")
     except Error as e:
         print("[DB ERROR]", e)
         return []
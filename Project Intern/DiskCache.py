@@ -0,0 +1,111 @@
+import os
+import hashlib
+import tempfile
+import threading
+from typing import Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_ROOT = os.getenv("CACHE_ROOT", os.path.join(BASE_DIR, "cache"))
+
+
+class DiskCache:
+    """
+    Small on-disk key -> text cache with an LRU size limit.
+
+    One file per entry. File mtime doubles as "last used" (touched on hit),
+    so eviction removes the least recently used entries until the directory
+    is back under max_bytes. Writes are atomic (temp file + replace), so
+    several processes can share one directory.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.dir = os.path.join(CACHE_ROOT, name)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._total = None  # lazily computed
+        self._dir_ready = False  # created on the first put, not at import time
+
+    def _path(self, key: str) -> str:
+        # keys may contain ':' etc. -> hash to a safe file name
+        return os.path.join(self.dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".txt")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read()
+        except OSError:
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        path = self._path(key)
+        data = (value or "").encode("utf-8")
+
+        try:
+            if not self._dir_ready:
+                os.makedirs(self.dir, exist_ok=True)
+                self._dir_ready = True
+            fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        except OSError as e:
+            print("[CACHE ERROR]", e)
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            print("[CACHE ERROR]", e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            else:
+                self._total += len(data)
+
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        out = []
+        with os.scandir(self.dir) as it:
+            for e in it:
+                if not e.name.endswith(".txt"):
+                    continue
+                try:
+                    st = e.stat()
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        # drop down to 90% so we don't evict on every single put
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        self._total = total
@@ -0,0 +1,168 @@
+"""
+In-process pub/sub behind the server-sent events endpoint (GET /api/events).
+
+Each open browser tab subscribes for its user and gets one long-lived
+text/event-stream response; the upload job and the notification store
+publish to it. That replaces polling /api/job_status every 3 s and
+/api/notifications/unread-count every 10 s.
+
+    bus.publish(username, "job", {...})        # job progress / completion
+    notifications.add(username, "Analysis complete", url)  # -> "unread" + "notification"
+
+A user's oldest stream beyond SSE_MAX_PER_USER gets a terminal "close" event:
+the tab stops its EventSource (no reconnect, which would evict the next one)
+and falls back to polling.
+
+Events reach tabs connected to this process only (the Flask app process).
+Every SSE connection holds one server thread, so run the app threaded
+(the Flask dev server is; gunicorn: --threads / gevent workers).
+"""
+
+import os
+import json
+import queue
+import itertools
+import threading
+from datetime import datetime
+
+from Metrics import EVENTS_PUBLISHED
+
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "20"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "5000"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_MAX_PER_USER = int(os.getenv("SSE_MAX_PER_USER", "5"))
+NOTIFY_MAX_PER_USER = int(os.getenv("NOTIFY_MAX_PER_USER", "100"))
+
+_CLOSE = object()
+
+
+class Subscription:
+    def __init__(self, user: str):
+        self.user = user
+        self.queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+
+    def put(self, item) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                # a stalled tab loses its oldest events rather than blocking publishers
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class EventBus:
+    def __init__(self):
+        self._subs = {}  # user -> [Subscription], oldest first
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user: str) -> Subscription:
+        sub = Subscription(user)
+        with self._lock:
+            subs = self._subs.setdefault(user, [])
+            subs.append(sub)
+            while len(subs) > SSE_MAX_PER_USER:
+                subs.pop(0).put(_CLOSE)  # -> "close" event, the tab switches to polling
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.user, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                self._subs.pop(sub.user, None)
+
+    def publish(self, user: str, event: str, data: dict) -> None:
+        item = (next(self._ids), event, data)
+        with self._lock:
+            subs = list(self._subs.get(user, ()))
+        for sub in subs:
+            sub.put(item)
+        EVENTS_PUBLISHED.inc(event=event)
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+
+def _format(event_id, event: str, data: dict) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def sse_stream(sub: Subscription, initial=()):
+    """Generator for the text/event-stream response. initial = [(event, data)] sent first."""
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        for event, data in initial:
+            yield _format(0, event, data)
+        while True:
+            try:
+                item = sub.queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                # comment line: keeps proxies from closing an idle connection
+                # and lets the server notice a closed tab
+                yield ": keepalive\n\n"
+                continue
+            if item is _CLOSE:
+                yield _format(0, "close", {"reason": "too many open tabs"})
+                return
+            yield _format(*item)
+    finally:
+        bus.unsubscribe(sub)
+
+
+class NotificationStore:
+    """Per-user notifications kept in memory (newest first, NOTIFY_MAX_PER_USER each)."""
+
+    def __init__(self, event_bus: EventBus):
+        self.bus = event_bus
+        self._items = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _unread(self, user: str) -> int:
+        return sum(1 for n in self._items.get(user, ()) if not n["is_read"])
+
+    def add(self, user: str, message: str, url: str = None) -> dict:
+        item = {
+            "id": next(self._ids),
+            "message": message,
+            "url": url,
+            "created_at": datetime.now().strftime("%d %b %Y %I:%M %p"),
+            "is_read": False,
+        }
+        with self._lock:
+            items = self._items.setdefault(user, [])
+            items.insert(0, item)
+            del items[NOTIFY_MAX_PER_USER:]
+            unread = self._unread(user)
+        self.bus.publish(user, "notification", item)
+        self.bus.publish(user, "unread", {"unread_count": unread})
+        return item
+
+    def items(self, user: str, limit: int = 10) -> list:
+        with self._lock:
+            return [dict(n) for n in self._items.get(user, ())[:limit]]
+
+    def unread_count(self, user: str) -> int:
+        with self._lock:
+            return self._unread(user)
+
+    def mark_read(self, user: str, notification_id=None) -> int:
+        """Mark one (or all, id None) read. Returns the new unread count."""
+        with self._lock:
+            for n in self._items.get(user, ()):
+                if notification_id is None or n["id"] == notification_id:
+                    n["is_read"] = True
+            unread = self._unread(user)
+        self.bus.publish(user, "unread", {"unread_count": unread})
+        return unread
+
+
+bus = EventBus()
+notifications = NotificationStore(bus)
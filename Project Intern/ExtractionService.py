@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+
+from pypdf import PdfReader
+from docx import Document
+
+# Extraction limits (use ENV if available)
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+EXTRACT_PAGES_PER_TASK = int(os.getenv("EXTRACT_PAGES_PER_TASK", "20"))
+EXTRACT_PARALLEL_MIN_PAGES = int(os.getenv("EXTRACT_PARALLEL_MIN_PAGES", "40"))
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "1000"))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "120"))
+
+# Bump when extraction output changes, so cached text from older versions is ignored.
+EXTRACTOR_VERSION = f"1-p{EXTRACT_MAX_PAGES}"
+
+
+class ExtractionTimeout(TimeoutError):
+    pass
+
+
+_pool = None
+_pool_pending = set()  # futures submitted to the current pool and not finished yet
+_pool_lock = threading.Lock()
+
+
+def _submit(fn, *args):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max(1, EXTRACT_WORKERS))
+        fut = _pool.submit(fn, *args)
+        _pool_pending.add(fut)
+    fut.add_done_callback(_forget)
+    return fut
+
+
+def _forget(fut):
+    with _pool_lock:
+        _pool_pending.discard(fut)
+
+
+def _retire_pool(stuck):
+    """
+    Swap in a fresh pool after a timeout. A stuck worker cannot be cancelled,
+    so the old pool is left to finish other documents' running work and its
+    processes are terminated only then (or after one more timeout period).
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+        others = [f for f in _pool_pending if f not in stuck]
+        _pool_pending.clear()
+
+    if pool is None:
+        return
+
+    def reap():
+        wait(others, timeout=EXTRACT_TIMEOUT_SECONDS)
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for p in processes:
+            try:
+                p.terminate()
+            except Exception:
+                pass
+
+    threading.Thread(target=reap, name="extract-pool-reaper", daemon=True).start()
+
+
+def _wait_all(futures, timeout: float, kind: str, path: str):
+    """Results of futures in order; raises the first failure or ExtractionTimeout."""
+    done, not_done = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+    for fut in not_done:
+        fut.cancel()
+
+    for fut in done:
+        if fut.exception() is not None:
+            raise fut.exception()
+
+    if not_done:
+        _retire_pool(set(futures))
+        raise ExtractionTimeout(f"{kind} extraction timed out: {os.path.basename(path)}")
+    return [fut.result() for fut in futures]
+
+
+# ===== worker functions (top-level so they can be pickled on Windows spawn) =====
+def _pdf_page_count(pdf_path: str) -> int:
+    with open(pdf_path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def _extract_pdf_range(pdf_path: str, start: int, end: int) -> list:
+    """Returns [(page_no, text), ...] for pages [start, end)."""
+    out = []
+    with open(pdf_path, "rb") as f:
+        reader = PdfReader(f)
+        for i in range(start, end):
+            t = reader.pages[i].extract_text() or ""
+            out.append((i, t))
+    return out
+
+
+def _extract_docx(docx_path: str) -> str:
+    doc = Document(docx_path)
+    parts = [p.text for p in doc.paragraphs if p.text and p.text.strip()]
+    return "\n".join(parts).strip()
+
+
+def _join_pages(pages) -> str:
+    parts = [t for _, t in sorted(pages) if t.strip()]
+    return "\n".join(parts).strip()
+
+
+def extract_pdf_text(pdf_path: str, *, max_pages: int = None, timeout: float = None) -> str:
+    """
+    Extract PDF text page by page in the process pool.
+    - Small PDFs (or EXTRACT_WORKERS <= 1): one task for the whole document.
+    - Large PDFs: page ranges fanned out across the pool.
+    Pages beyond max_pages are skipped; the whole document, parsing the page
+    tree included, must finish within timeout. Result is always in page order.
+    """
+    max_pages = EXTRACT_MAX_PAGES if max_pages is None else max_pages
+    timeout = EXTRACT_TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    # counted in the pool too: a hostile page tree must not hang the caller
+    total = _wait_all([_submit(_pdf_page_count, pdf_path)], timeout, "PDF", pdf_path)[0]
+
+    n_pages = min(total, max_pages)
+    if total > n_pages:
+        print(f"[EXTRACT] {os.path.basename(pdf_path)}: {total} pages, capped at {n_pages}")
+
+    step = n_pages
+    if n_pages >= EXTRACT_PARALLEL_MIN_PAGES and EXTRACT_WORKERS > 1:
+        step = EXTRACT_PAGES_PER_TASK
+    futures = [
+        _submit(_extract_pdf_range, pdf_path, start, min(start + step, n_pages))
+        for start in range(0, n_pages, max(1, step))
+    ]
+
+    ranges = _wait_all(futures, max(0.0, deadline - time.monotonic()), "PDF", pdf_path)
+    return _join_pages(page for pages in ranges for page in pages)
+
+
+def extract_docx_text(docx_path: str, *, timeout: float = None) -> str:
+    """DOCX has no page structure, so the whole document runs as one pooled task."""
+    timeout = EXTRACT_TIMEOUT_SECONDS if timeout is None else timeout
+
+    fut = _submit(_extract_docx, docx_path)
+    return _wait_all([fut], timeout, "DOCX", docx_path)[0]
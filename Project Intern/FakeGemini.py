@@ -0,0 +1,230 @@
+"""
+Offline stand-in for the Gemini API.
+
+FakeGeminiBackend answers generate_content() with schema-valid JSON for every
+prompt this project sends (ALL-IN-ONE, transcribe-only, batch), after a
+configurable latency, and can inject 429 / 503 errors worded like the real
+API so GeminiClient.safe_generate_content retries them the same way.
+
+Select it with LLM_BACKEND=fake, or GeminiClient.set_backend(FakeGeminiBackend(...)).
+
+ENV (used by from_env):
+  FAKE_LLM_LATENCY          "constant:0.3" | "uniform:0.2:1.5" | "lognormal:<median_s>:<sigma>"  (default lognormal:0.8:0.5)
+  FAKE_LLM_429_RATE         probability of a 429 RESOURCE_EXHAUSTED per call (default 0)
+  FAKE_LLM_503_RATE         probability of a 503 UNAVAILABLE per call (default 0)
+  FAKE_LLM_MAX_CONCURRENCY  calls above this many in flight get a 429 (default 0 = unlimited)
+  FAKE_LLM_RETRY_AFTER      seconds put in "Please retry in Xs" of 429s (default 0.2)
+  FAKE_LLM_OVERLOADED_MODELS  comma-separated models that always answer 503 (model tier fallback tests)
+  FAKE_LLM_SEED             RNG seed for latency / errors (default 42)
+"""
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+
+
+_INPUT_BLOCK_RE = re.compile(r'<<<INPUT id="([^"]+)">>>\n(.*?)\n<<<END INPUT>>>', re.DOTALL)
+_INPUT_TEXT_RE = re.compile(r'INPUT TEXT:\n"""(.*)"""', re.DOTALL)
+_SCENARIO_ID_RE = re.compile(r"^ID (\d+):", re.MULTILINE)
+
+_LABELS = ["Complaint", "Neutral", "Positive"]
+_TONES = {"Complaint": ["angry", "frustrated", "stressed"], "Neutral": ["calm", "polite"], "Positive": ["polite", "calm"]}
+
+
+class FakeGeminiError(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, text: str, model_version: str):
+        self.text = text
+        self.model_version = model_version
+
+
+def parse_latency(spec: str):
+    """'constant:0.3' | 'uniform:a:b' | 'lognormal:median:sigma' -> (kind, params)"""
+    parts = (spec or "lognormal:0.8:0.5").split(":")
+    kind = parts[0].strip().lower()
+    params = [float(p) for p in parts[1:]]
+    if kind not in ("constant", "uniform", "lognormal"):
+        raise ValueError(f"Unknown latency distribution: {spec}")
+    return kind, params
+
+
+class FakeGeminiBackend:
+    def __init__(
+        self,
+        *,
+        latency: str = "lognormal:0.8:0.5",
+        rate_429: float = 0.0,
+        rate_503: float = 0.0,
+        max_concurrency: int = 0,
+        retry_after: float = 0.2,
+        seed: int = 42,
+        overloaded_models=(),
+    ):
+        self.latency_kind, self.latency_params = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.overloaded_models = set(overloaded_models or ())
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._caches = {}
+        self._cache_seq = 0
+
+        self.stats = {
+            "calls": 0,
+            "ok": 0,
+            "errors_429": 0,
+            "errors_503": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "latencies": [],
+        }
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency=os.getenv("FAKE_LLM_LATENCY", "lognormal:0.8:0.5"),
+            rate_429=float(os.getenv("FAKE_LLM_429_RATE", "0")),
+            rate_503=float(os.getenv("FAKE_LLM_503_RATE", "0")),
+            max_concurrency=int(os.getenv("FAKE_LLM_MAX_CONCURRENCY", "0")),
+            retry_after=float(os.getenv("FAKE_LLM_RETRY_AFTER", "0.2")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "42")),
+            overloaded_models=[m.strip() for m in os.getenv("FAKE_LLM_OVERLOADED_MODELS", "").split(",") if m.strip()],
+        )
+
+    # ===== prompt-prefix cache interface (same as GeminiBackend) =====
+    def create(self, model: str, prefix: str, ttl_seconds: int) -> str:
+        with self._lock:
+            self._cache_seq += 1
+            name = f"cachedContents/fake-{self._cache_seq}"
+            self._caches[name] = prefix
+        return name
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            self._caches.pop(name, None)
+
+    # ===== generation =====
+    def _sample_latency(self) -> float:
+        with self._lock:
+            if self.latency_kind == "constant":
+                return self.latency_params[0]
+            if self.latency_kind == "uniform":
+                return self._rng.uniform(*self.latency_params)
+            median, sigma = self.latency_params
+            return self._rng.lognormvariate(0.0, sigma) * median
+
+    def _roll_error(self):
+        with self._lock:
+            r = self._rng.random()
+        if r < self.rate_429:
+            return "429"
+        if r < self.rate_429 + self.rate_503:
+            return "503"
+        return None
+
+    def generate_content(self, model, contents, config=None):
+        config = config or {}
+
+        prompt_parts = []
+        cached = config.get("cached_content")
+        if cached:
+            with self._lock:
+                prefix = self._caches.get(cached)
+            if prefix is None:
+                raise FakeGeminiError(f"404 NOT_FOUND. CachedContent not found: {cached}")
+            prompt_parts.append(prefix)
+
+        for part in contents if isinstance(contents, list) else [contents]:
+            if isinstance(part, str):
+                prompt_parts.append(part)
+            else:
+                # audio part: its bytes make the answer differ per file
+                data = getattr(getattr(part, "inline_data", None), "data", None) or b""
+                prompt_parts.append(f"[media {hashlib.sha1(data).hexdigest()}]")
+        prompt = "\n".join(prompt_parts)
+
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            over_limit = self.max_concurrency and self.stats["in_flight"] > self.max_concurrency
+
+        try:
+            latency = self._sample_latency()
+            error = "429" if over_limit else self._roll_error()
+            if model in self.overloaded_models:
+                error = "503"
+
+            if error == "429":
+                time.sleep(min(latency, 0.05))
+                with self._lock:
+                    self.stats["errors_429"] += 1
+                raise FakeGeminiError(
+                    "429 RESOURCE_EXHAUSTED. Resource has been exhausted (e.g. check quota). "
+                    f"Please retry in {self.retry_after}s."
+                )
+            if error == "503":
+                time.sleep(latency)
+                with self._lock:
+                    self.stats["errors_503"] += 1
+                raise FakeGeminiError("503 UNAVAILABLE. The model is overloaded. Please try again later.")
+
+            time.sleep(latency)
+            text = json.dumps(self._answer(prompt), ensure_ascii=False)
+            with self._lock:
+                self.stats["ok"] += 1
+                self.stats["latencies"].append(latency)
+            return FakeResponse(text, model)
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+
+    # ===== schema-valid answers =====
+    def _analysis(self, key: str, scenario_ids) -> dict:
+        # deterministic per input: same text -> same answer, batched or not
+        h = int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16)
+        label = _LABELS[h % len(_LABELS)]
+        return {
+            "transcript": "Client: (fake transcript)\nCS: (fake reply)",
+            "translation": "Client: (fake translation)\nCS: (fake reply)",
+            "language_used": ["English"],
+            "sentiment": {
+                "label": label,
+                "tone": _TONES[label][(h >> 8) % len(_TONES[label])],
+                "score": 50 + (h >> 16) % 50,
+                "explanation": f"Fake {label.lower()} result.",
+            },
+            "scenario_id": int(scenario_ids[(h >> 24) % len(scenario_ids)]) if scenario_ids else None,
+        }
+
+    def _answer(self, prompt: str):
+        scenario_ids = _SCENARIO_ID_RE.findall(prompt)
+
+        if "BATCH MODE" in prompt:
+            out = []
+            for input_id, text in _INPUT_BLOCK_RE.findall(prompt):
+                item = self._analysis(text, scenario_ids)
+                item["id"] = input_id
+                out.append(item)
+            return out
+
+        if "TASKS (ONLY)" in prompt:
+            return {
+                "transcript": "Client: (fake transcript)\nCS: (fake reply)",
+                "translation": "Client: (fake translation)\nCS: (fake reply)",
+                "language_used": ["English"],
+            }
+
+        # text prompts are keyed on the input text alone; audio on the whole prompt (media hash)
+        single = _INPUT_TEXT_RE.search(prompt)
+        return self._analysis(single.group(1) if single else prompt, scenario_ids)
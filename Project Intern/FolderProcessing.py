@@ -1,32 +1,156 @@
+import os
 import time
 import tempfile
 from pathlib import Path
 
 from AudioProcessing import process_single_audio_file
-from TextProcessing import process_single_text_file
+from TextProcessing import process_text_files, COALESCE_BATCH_SIZE
 from Utils import detect_file_type
-from ZipUtils import safe_extract_zip
+from ZipUtils import safe_extract_zip, zip_member_hashes
+from Manifest import Manifest
+from Scheduler import job_context, PRIORITY_BULK
 
 LOCAL_INPUT_PATH = r"C:\Users\W10\Documents\Audio Test Folder"
 
+# Folder runs are bulk backfills: their Gemini calls yield to uploads (see Scheduler.py)
+FOLDER_JOB_USER = os.getenv("FOLDER_JOB_USER", "folder-backfill")
+
 TEXT_DELAY_SECONDS = 2
 AUDIO_DELAY_SECONDS = 10
 
-def _process_one_local_file(file_path: Path):
+def _process_one_local_file(file_path: Path, manifest: Manifest, content_hash: str, zip_path: str = None, member: str = ""):
     ftype = detect_file_type(file_path.name)
 
     if ftype == "audio":
         print(f"\n[PROCESS] AUDIO -> {file_path}")
-        process_single_audio_file(str(file_path))
+        manifest.start(content_hash, zip_path or str(file_path), member)
+        try:
+            r = process_single_audio_file(str(file_path))
+            manifest.finish(content_hash, r.get("success"), r.get("error"))
+        except Exception as e:
+            manifest.finish(content_hash, False, str(e))
+            raise
         time.sleep(AUDIO_DELAY_SECONDS)
 
     elif ftype == "text":
-        print(f"\n[PROCESS] TEXT  -> {file_path}")
-        process_single_text_file(str(file_path))
+        _process_local_texts([(file_path, content_hash, member)], manifest, zip_path)
+
+
+def _process_local_texts(items, manifest: Manifest, zip_path: str = None):
+    """
+    Text files in groups so short ones share one Gemini call (see TextProcessing.process_text_files).
+    items = [(path, content_hash, zip member name or "")]
+    """
+    items = [(str(p), h, m) for p, h, m in items]
+    for i in range(0, len(items), COALESCE_BATCH_SIZE):
+        group = items[i:i + COALESCE_BATCH_SIZE]
+        for p, h, m in group:
+            print(f"\n[PROCESS] TEXT  -> {p}")
+            manifest.start(h, zip_path or p, m)
+        try:
+            results = process_text_files([p for p, _, _ in group], {p: h for p, h, _ in group})
+        except Exception as e:
+            for _, h, _ in group:
+                manifest.finish(h, False, str(e))
+            raise
+        for (_, h, _), r in zip(group, results):
+            manifest.finish(h, r.get("success"), r.get("error"))
         time.sleep(TEXT_DELAY_SECONDS)
 
 
-def process_all_files_once():
+def _process_zip(zip_file: Path, manifest: Manifest, zip_hash: str):
+    """Members already done (same content) are neither extracted nor analysed again."""
+    member_hashes = zip_member_hashes(str(zip_file))
+    if not member_hashes:
+        print(f"[INFO] No supported files inside ZIP: {zip_file.name}")
+        manifest.start(zip_hash, str(zip_file))
+        manifest.finish(zip_hash, True)
+        return
+
+    # same content twice inside the ZIP -> analysed once (first name wins)
+    unique = {}
+    for name, h in member_hashes.items():
+        unique.setdefault(h, name)
+    pending = {name: h for h, name in unique.items() if not manifest.is_done(h)}
+    if len(pending) < len(member_hashes):
+        print(f"[RESUME] {zip_file.name}: {len(member_hashes) - len(pending)} member(s) already done or duplicated")
+
+    manifest.start(zip_hash, str(zip_file))
+    with tempfile.TemporaryDirectory() as tmp:
+        extracted = safe_extract_zip(str(zip_file), tmp, members=set(pending))
+        # same normalisation as safe_extract_zip (Windows separators, "./a.txt", ...)
+        by_path = {os.path.abspath(os.path.join(tmp, name)): name for name in pending}
+
+        zip_texts = [p for p in extracted if detect_file_type(p) == "text"]
+        if zip_texts:
+            _process_local_texts(
+                [(p, pending[by_path[p]], by_path[p]) for p in zip_texts], manifest, str(zip_file)
+            )
+
+        for ef in extracted:
+            if ef not in zip_texts:
+                name = by_path[ef]
+                _process_one_local_file(Path(ef), manifest, pending[name], str(zip_file), name)
+
+    all_done = all(manifest.is_done(h) for h in member_hashes.values())
+    manifest.finish(zip_hash, all_done, None if all_done else "some members failed")
+
+
+def process_all_files_once(manifest: Manifest = None):
+    """
+    One pass over LOCAL_INPUT_PATH. Files whose content is already "done" in
+    the manifest (Manifest.py) are skipped, so reruns and crashed runs resume
+    where they stopped instead of inserting duplicate rows.
+    """
+    manifest = manifest or Manifest()
+    with job_context(PRIORITY_BULK, FOLDER_JOB_USER):
+        _process_all_files_once(manifest)
+
+
+def process_paths(paths, manifest: Manifest):
+    """
+    Process specific files (e.g. new arrivals from FolderWatcher) without
+    walking the folder. Same manifest rules as process_all_files_once; content
+    already claimed by a concurrent call (a copy arriving together) is skipped.
+    """
+    todo = []
+    for p in paths:
+        f = Path(p)
+        try:
+            h = manifest.file_hash(str(f))
+        except OSError as e:
+            print(f"[ERROR] Cannot read {f}: {e}")
+            continue
+        if manifest.claim(h):
+            todo.append((f, h))
+    try:
+        _process_paths(todo, manifest)
+    finally:
+        for _, h in todo:
+            manifest.release(h)
+
+
+def _process_paths(todo, manifest: Manifest):
+    with job_context(PRIORITY_BULK, FOLDER_JOB_USER):
+        texts = [(f, h, "") for f, h in todo if f.suffix.lower() != ".zip" and detect_file_type(f.name) == "text"]
+        if texts:
+            try:
+                _process_local_texts(texts, manifest)
+            except Exception as e:
+                print(f"[ERROR] Failed processing text files: {e}")
+
+        for f, h in todo:
+            try:
+                if f.suffix.lower() == ".zip":
+                    print(f"\n[PROCESS] ZIP   -> {f.name}")
+                    _process_zip(f, manifest, h)
+                elif detect_file_type(f.name) == "audio":
+                    _process_one_local_file(f, manifest, h)
+            except Exception as e:
+                print(f"[ERROR] Failed processing {f}: {e}")
+
+
+def _process_all_files_once(manifest: Manifest):
     base_path = Path(LOCAL_INPUT_PATH)
 
     if not base_path.exists():
@@ -59,27 +183,42 @@ def process_all_files_once():
 
     files.sort(key=sort_key)
 
-    print(f"[INFO] Found {len(files)} file(s). Starting processing...\n")
-
+    hashes = {}
     for f in files:
         try:
-            if f.suffix.lower() == ".zip":
-                print(f"\n[PROCESS] ZIP   -> {f.name}")
-                with tempfile.TemporaryDirectory() as tmp:
-                    extracted = safe_extract_zip(str(f), tmp)
+            hashes[f] = manifest.file_hash(str(f))
+        except OSError as e:
+            print(f"[ERROR] Cannot read {f}: {e}")
 
-                    if not extracted:
-                        print(f"[INFO] No supported files inside ZIP: {f.name}")
-                        continue
+    todo, seen = [], set()
+    for f in files:
+        # same content twice in the tree (copies) -> analysed once
+        if f in hashes and hashes[f] not in seen and not manifest.is_done(hashes[f]):
+            todo.append(f)
+            seen.add(hashes[f])
+    skipped = len(files) - len(todo)
 
-                    extracted.sort(key=lambda p: 0 if detect_file_type(p) == "text" else 1)
+    print(f"[INFO] Found {len(files)} file(s), {skipped} already processed. Starting processing...\n")
+
+    texts = [f for f in todo if f.suffix.lower() != ".zip" and detect_file_type(f.name) == "text"]
+    if texts:
+        try:
+            _process_local_texts([(f, hashes[f], "") for f in texts], manifest)
+        except Exception as e:
+            print(f"[ERROR] Failed processing text files: {e}")
 
-                    for ef in extracted:
-                        _process_one_local_file(Path(ef))
+    text_set = set(texts)
+    for f in todo:
+        if f in text_set:
+            continue
+        try:
+            if f.suffix.lower() == ".zip":
+                print(f"\n[PROCESS] ZIP   -> {f.name}")
+                _process_zip(f, manifest, hashes[f])
             else:
-                _process_one_local_file(f)
+                _process_one_local_file(f, manifest, hashes[f])
 
         except Exception as e:
             print(f"[ERROR] Failed processing {f}: {e}")
 
-    print("\n[DONE] Local folder processing completed.")
+    print(f"\n[DONE] Local folder processing completed. Manifest: {manifest.summary()}")
@@ -0,0 +1,285 @@
+"""
+Watch mode for the ingestion folder (python Main.py --watch).
+
+New or changed files are picked up from filesystem events and handed to a
+worker pool as soon as they have finished writing, instead of re-walking
+LOCAL_INPUT_PATH on every run.
+
+Event source:
+  - Linux: inotify via ctypes (no extra package), recursive, new sub-folders included
+  - elsewhere: polling directory mtimes every WATCH_POLL_SECONDS; only folders
+    whose mtime changed are listed again (a new file changes its folder's mtime)
+
+Write completion: a file is processed once its size and mtime have not changed
+for WATCH_SETTLE_SECONDS (copies over SMB / slow recorders close late or
+write in bursts). The Manifest keeps reruns and duplicate events idempotent.
+
+Catch-up: files already in the folder when the watch starts are queued like
+new arrivals (the manifest skips the done ones). The watch is set up before
+that scan, so nothing landing in between is missed.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Utils import AUDIO_EXTS, TEXT_EXTS
+
+WATCH_SETTLE_SECONDS = float(os.getenv("WATCH_SETTLE_SECONDS", "3"))
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "2"))
+WATCH_WORKERS = int(os.getenv("WATCH_WORKERS", "4"))
+# ready text files are grouped so short ones still share Gemini calls
+WATCH_TEXT_GROUP = int(os.getenv("WATCH_TEXT_GROUP", "10"))
+
+_WATCHED_EXTS = AUDIO_EXTS | TEXT_EXTS | {".zip"}
+_TEMP_SUFFIXES = (".tmp", ".part", ".crdownload", ".partial")
+
+
+def is_watched_file(path: str) -> bool:
+    name = os.path.basename(path)
+    if name.startswith((".", "~$")) or name.lower().endswith(_TEMP_SUFFIXES):
+        return False
+    return os.path.splitext(name)[1].lower() in _WATCHED_EXTS
+
+
+# ===== inotify (Linux) =====
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0x00000800
+_IN_CLOEXEC = 0x00080000
+_EVENT = struct.Struct("iIII")
+
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        import ctypes
+        import ctypes.util
+
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except Exception:
+        _libc = None
+
+_INOTIFY_AVAILABLE = _libc is not None and hasattr(_libc, "inotify_init1")
+
+
+class _InotifySource:
+    MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+
+    def __init__(self, root: str):
+        self.root = root
+        self._fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # wd -> dir path
+        self.initial = self._watch_tree(root)
+
+    def _watch_tree(self, top: str) -> list:
+        """Watch top and its sub-folders. Returns files already inside (landed before the watch)."""
+        found = []
+        for dirpath, _, files in os.walk(top):
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue
+            self._dirs[wd] = dirpath
+            found.extend(os.path.join(dirpath, f) for f in files)
+        return found
+
+    def poll(self, timeout: float):
+        """(changed file paths, rescan_needed)"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return [], False
+
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+
+        paths, rescan = [], False
+        off = 0
+        while off + _EVENT.size <= len(buf):
+            wd, mask, _, name_len = _EVENT.unpack_from(buf, off)
+            name = buf[off + _EVENT.size: off + _EVENT.size + name_len].rstrip(b"\0")
+            off += _EVENT.size + name_len
+
+            if mask & _IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    paths.extend(self._watch_tree(path))
+            else:
+                paths.append(path)
+        return paths, rescan
+
+    def close(self):
+        os.close(self._fd)
+
+
+# ===== polling fallback =====
+class _PollingSource:
+    def __init__(self, root: str):
+        self.root = root
+        self._dir_mtimes = {}
+        self._files = {}  # path -> (size, mtime_ns)
+        self.initial = self._scan_dir_tree(root)
+
+    def _scan_dir(self, d: str) -> list:
+        changed = []
+        try:
+            self._dir_mtimes[d] = os.stat(d).st_mtime_ns
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        if e.path not in self._dir_mtimes:
+                            changed.extend(self._scan_dir_tree(e.path))
+                    elif e.is_file(follow_symlinks=False):
+                        st = e.stat()
+                        sig = (st.st_size, st.st_mtime_ns)
+                        if self._files.get(e.path) != sig:
+                            self._files[e.path] = sig
+                            changed.append(e.path)
+        except FileNotFoundError:
+            self._dir_mtimes.pop(d, None)
+        return changed
+
+    def _scan_dir_tree(self, top: str) -> list:
+        changed = []
+        for dirpath, _, _ in os.walk(top):
+            changed.extend(self._scan_dir(dirpath))
+        return changed
+
+    def poll(self, timeout: float):
+        time.sleep(timeout)
+        changed = []
+        for d, old in list(self._dir_mtimes.items()):
+            try:
+                if os.stat(d).st_mtime_ns != old:
+                    changed.extend(self._scan_dir(d))
+            except FileNotFoundError:
+                self._dir_mtimes.pop(d, None)
+        return changed, False
+
+    def close(self):
+        pass
+
+
+class FolderWatcher:
+    """
+    handler(paths) is called from a pool of WATCH_WORKERS threads with files
+    that finished writing: one audio / ZIP per call, text files in groups.
+    """
+
+    def __init__(self, root: str, handler, *, settle_seconds: float = None, workers: int = None, use_inotify: bool = None):
+        self.root = os.path.abspath(root)
+        self.handler = handler
+        self.settle_seconds = WATCH_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self.workers = workers or WATCH_WORKERS
+        if use_inotify is None:
+            use_inotify = _INOTIFY_AVAILABLE
+        self.use_inotify = use_inotify
+
+        self._pending = {}     # path -> (size, mtime_ns, stable_since)
+        self._in_flight = set()
+        self._changed_in_flight = set()  # events for in-flight paths: settle again once done
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _note(self, paths):
+        for p in paths:
+            if not is_watched_file(p):
+                continue
+            if p in self._in_flight:
+                # rewritten while the previous version is processed: pick it up afterwards
+                self._changed_in_flight.add(p)
+                continue
+            # (re)start the settle timer on every event for this path
+            self._pending[p] = (-1, -1, time.monotonic())
+
+    def _settled(self) -> list:
+        now = time.monotonic()
+        ready = []
+        for p, (size, mtime, since) in list(self._pending.items()):
+            try:
+                st = os.stat(p)
+            except FileNotFoundError:
+                del self._pending[p]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                self._pending[p] = (st.st_size, st.st_mtime_ns, now)
+            elif now - since >= self.settle_seconds:
+                del self._pending[p]
+                ready.append(p)
+        return ready
+
+    def _submit(self, pool, ready):
+        texts = [p for p in ready if os.path.splitext(p)[1].lower() in TEXT_EXTS]
+        groups = [texts[i:i + WATCH_TEXT_GROUP] for i in range(0, len(texts), WATCH_TEXT_GROUP)]
+        groups += [[p] for p in ready if p not in texts]
+
+        for group in groups:
+            with self._lock:
+                self._in_flight.update(group)
+            print(f"[WATCH] {len(group)} file(s) ready: {', '.join(os.path.basename(p) for p in group)}")
+            pool.submit(self._run, group)
+
+    def _run(self, group):
+        try:
+            self.handler(group)
+        except Exception as e:
+            print(f"[WATCH ERROR] {group}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(group)
+                again = self._changed_in_flight.intersection(group)
+                self._changed_in_flight.difference_update(again)
+                self._note(again)
+
+    def run(self):
+        source = _InotifySource(self.root) if self.use_inotify else _PollingSource(self.root)
+        tick = min(WATCH_POLL_SECONDS, max(0.2, self.settle_seconds / 2))
+        kind = "inotify" if self.use_inotify else f"polling every {tick:g}s"
+        print(f"[WATCH] Watching {self.root} ({kind}, settle {self.settle_seconds}s, {self.workers} workers)")
+        with self._lock:
+            self._note(source.initial)  # catch-up: whatever landed while we were not running
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while not self._stop.is_set():
+                    paths, rescan = source.poll(tick)
+                    if rescan:
+                        print("[WATCH] Event queue overflow, rescanning folder")
+                        paths = [os.path.join(d, f) for d, _, files in os.walk(self.root) for f in files]
+                    with self._lock:
+                        self._note(paths)
+                        ready = self._settled()
+                    if ready:
+                        self._submit(pool, ready)
+            finally:
+                source.close()
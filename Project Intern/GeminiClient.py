@@ -2,13 +2,78 @@ import os
 import re
 import time
 import random
+import hashlib
+import threading
 from google import genai
-from Config import API_KEY
+from google.genai import types
+from Config import (
+    API_KEY, ENABLE_PROMPT_CACHE, ENABLE_CIRCUIT_BREAKER, ENABLE_MODEL_FALLBACK, ENABLE_HEDGED_REQUESTS,
+    MODEL_NAME, MODEL_FALLBACK_RULES,
+)
+from CircuitBreaker import CircuitBreaker, OPEN
+from Metrics import LLM_CALL_SECONDS, LLM_RETRIES, LLM_BACKOFF_SECONDS, LLM_FAILURES, LLM_MODEL_FALLBACKS
+from Scheduler import llm_slot, current_job, PRIORITY_INTERACTIVE
+from Hedging import hedged_call, hedge_delay, latency_tracker
 
-if not API_KEY:
-    raise RuntimeError("GEMINI_API_KEY not found in environment.")
+# "gemini" = real API, "fake" = FakeGemini.FakeGeminiBackend (offline / load tests)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").strip().lower()
 
-client = genai.Client(api_key=API_KEY)
+
+class GeminiBackend:
+    """
+    Real Gemini API. The genai client is built on first use, so importing this
+    module never needs GEMINI_API_KEY (only calling the real API does).
+    Also implements the prompt-prefix cache interface (create / delete).
+    """
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                if not API_KEY:
+                    raise RuntimeError("GEMINI_API_KEY not found in environment.")
+                self._client = genai.Client(api_key=API_KEY)
+            return self._client
+
+    def generate_content(self, model, contents, config=None):
+        return self.client.models.generate_content(
+            model=model,
+            contents=contents,
+            config=config
+        )
+
+    def create(self, model: str, prefix: str, ttl_seconds: int) -> str:
+        cache = self.client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                contents=[prefix],
+                ttl=f"{int(ttl_seconds)}s",
+                display_name="sentiment-prompt-prefix",
+            ),
+        )
+        return cache.name
+
+    def delete(self, name: str) -> None:
+        self.client.caches.delete(name=name)
+
+
+def _backend_from_env():
+    if LLM_BACKEND == "fake":
+        from FakeGemini import FakeGeminiBackend
+        print("[LLM] Using FakeGeminiBackend (LLM_BACKEND=fake)")
+        return FakeGeminiBackend.from_env()
+    return GeminiBackend()
+
+
+_backend = _backend_from_env()
+
+
+def get_backend():
+    return _backend
 
 _RETRY_SECONDS_RE = re.compile(r"retry in\s+([\d.]+)\s*s", re.IGNORECASE)
 _RETRY_DELAY_JSON_RE = re.compile(r"'retryDelay'\s*:\s*'(\d+)s'", re.IGNORECASE)
@@ -30,6 +95,69 @@ def _extract_retry_seconds(err_text: str):
 
     return None
 
+def _error_reason(err_text: str) -> str:
+    """Short metric label for an LLM error."""
+    err_lower = err_text.lower()
+    if "429" in err_text or "resource_exhausted" in err_lower or "quota" in err_lower:
+        return "429"
+    if "503" in err_text or "unavailable" in err_lower or "overloaded" in err_lower:
+        return "503"
+    return "error"
+
+def _breaker_outcome(e: Exception) -> str:
+    return "overload" if _error_reason(str(e)) == "503" else "error"
+
+# one breaker per model for the whole process: all callers see the same model health
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker()
+        return _breakers[model]
+
+def _llm_attempt(model: str):
+    """Scheduler slot + breaker permit for one request; the slot is only taken once the breaker admits calls."""
+    if not ENABLE_CIRCUIT_BREAKER:
+        return llm_slot()
+    return breaker_for(model).guard(_breaker_outcome, slot=llm_slot)
+
+
+class ModelOverloaded(RuntimeError):
+    """Raised instead of retrying further when the caller has a lighter model to fall back to."""
+
+
+def _send(model, contents, config, latency_key=None):
+    """One request; interactive calls are hedged once their latency history is known."""
+    def call():
+        return _backend.generate_content(model=model, contents=contents, config=config)
+
+    def primary():
+        # the hedge trigger learns from the primary's own latency, not the hedged wall time
+        # (a won hedge would pull the p95 down and make hedging fire more and more often)
+        t0 = time.perf_counter()
+        resp = call()
+        latency_tracker.observe(model, time.perf_counter() - t0, latency_key)
+        return resp
+
+    def duplicate():
+        # the hedge is its own attempt: own slot + breaker permit (hedged_call), own metric
+        t0 = time.perf_counter()
+        try:
+            resp = call()
+        except Exception as e:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - t0, model=model, outcome=_error_reason(str(e)))
+            raise
+        LLM_CALL_SECONDS.observe(time.perf_counter() - t0, model=model, outcome="ok")
+        return resp
+
+    if ENABLE_HEDGED_REQUESTS and current_job()[0] == PRIORITY_INTERACTIVE:
+        delay = hedge_delay(model, latency_key)
+        if delay is not None:
+            return hedged_call(primary, delay, hedge=duplicate, admit=lambda: _llm_attempt(model))
+    return primary()
+
 def safe_generate_content(
     model,
     contents,
@@ -37,27 +165,48 @@ def safe_generate_content(
     *,
     max_retries: int = 8,
     base_delay: float = 3.0,
-    jitter: float = 1.0
+    jitter: float = 1.0,
+    overload_limit: int = None,
+    latency_key: str = None
 ):
     """
     Robust wrapper for Gemini:
     - Retries on 503 (overloaded/unavailable) and 429 (quota/rate-limit)
     - FAIL FAST when daily quota (requests/day) is exhausted
+    - Each attempt waits for a Scheduler slot (priority / fair share); backoff sleeps hold no slot
+    - While the shared circuit breaker is open, attempts wait for it instead of sleeping
+      their own exponential backoff (see CircuitBreaker.py), without holding a slot
+    - Interactive calls slower than the usual p95 get one duplicate request (see Hedging.py)
+    - overload_limit: raise ModelOverloaded after this many 503s in a row (or at once if
+      the model's breaker is open) so the caller can switch model (see generate_for_task)
+    - latency_key: kind of call (prompt key) the hedge latency history is kept for
     """
     last_exc = None
+    overloads = 0
 
     for attempt in range(1, max_retries + 1):
+        if overload_limit and ENABLE_CIRCUIT_BREAKER and breaker_for(model).state == OPEN:
+            raise ModelOverloaded(f"{model}: circuit breaker open")
+
+        t0 = time.perf_counter()
         try:
-            return client.models.generate_content(
-                model=model,
-                contents=contents,
-                config=config
-            )
+            with _llm_attempt(model):
+                t0 = time.perf_counter()
+                resp = _send(model, contents, config, latency_key)
+            elapsed = time.perf_counter() - t0
+            LLM_CALL_SECONDS.observe(elapsed, model=model, outcome="ok")
+            return resp
 
         except Exception as e:
             last_exc = e
             err_text = str(e)
             err_lower = err_text.lower()
+            reason = _error_reason(err_text)
+            LLM_CALL_SECONDS.observe(time.perf_counter() - t0, model=model, outcome=reason)
+
+            overloads = overloads + 1 if reason == "503" else 0
+            if overload_limit and overloads >= overload_limit:
+                raise ModelOverloaded(f"{model}: {overloads} overload errors in a row") from e
 
             retryable = (
                 "503" in err_text
@@ -70,6 +219,7 @@ def safe_generate_content(
             )
 
             if not retryable:
+                LLM_FAILURES.inc(reason=reason)
                 raise
 
             if (
@@ -78,19 +228,212 @@ def safe_generate_content(
                 or "per day" in err_lower
                 or ("quota exceeded for metric" in err_lower and "perday" in err_lower)
             ):
+                LLM_FAILURES.inc(reason="daily_quota")
                 raise RuntimeError(
                     "Daily Gemini quota exhausted (requests/day). "
                     "Wait for quota reset, or enable billing / use a different project."
                 ) from e
 
             delay = _extract_retry_seconds(err_text)
-            if delay is None:
+            if ENABLE_CIRCUIT_BREAKER and reason == "503" and breaker_for(model).state == OPEN:
+                # the breaker holds everyone back until its probe succeeds
+                delay = 0.0
+            elif delay is None:
                 delay = base_delay * (2 ** (attempt - 1))
 
             delay = delay + random.uniform(0.1, jitter)
 
             print(f"[Gemini Retry] {attempt}/{max_retries} sleeping {delay:.1f}s sebab: {e}")
+            LLM_RETRIES.inc(reason=reason)
+            LLM_BACKOFF_SECONDS.inc(delay)
             time.sleep(delay)
 
+    LLM_FAILURES.inc(reason="retries_exhausted")
     raise last_exc
 
+
+# ========================
+# Prompt-prefix cache (static instructions + scenario list sent once)
+# ========================
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+# Gemini only caches prefixes above a minimum token count (~1024 tokens for flash).
+# Today's prefixes are below it: TRANSCRIBE_TRANSLATE_ONLY_PROMPT is ~850 chars and
+# ALL_IN_ONE_UNIVERSAL_PROMPT ~1,900 chars plus the scenario list, so every call
+# sends its prefix inline. Caching kicks in on its own once the scenario list grows
+# the all-in-one prefix past this size; lowering it only earns failed creates.
+PROMPT_CACHE_MIN_CHARS = int(os.getenv("PROMPT_CACHE_MIN_CHARS", "4000"))
+
+
+class LocalPrefixCacheStub:
+    """
+    Offline stand-in for the prefix-cache side of GeminiBackend: keeps prefixes in memory.
+    resolve(name) returns the cached text, so a fake model can expand it.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.created = 0
+        self.deleted = 0
+        self._lock = threading.Lock()
+
+    def create(self, model: str, prefix: str, ttl_seconds: int) -> str:
+        with self._lock:
+            self.created += 1
+            name = f"cachedContents/local-{self.created}"
+            self.store[name] = prefix
+        return name
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            if self.store.pop(name, None) is not None:
+                self.deleted += 1
+
+    def resolve(self, name: str):
+        return self.store.get(name)
+
+
+class PromptPrefixManager:
+    """
+    Registers a static prompt prefix once as cached context and reuses it.
+
+    Entries are keyed by (model, key) and remember the prefix hash: when the
+    prefix changes (e.g. scenarios edited) the old cache is deleted and a new
+    one created. Entries are refreshed shortly before their TTL ends.
+    A failed create (prefix too small, caching unavailable) is remembered for
+    the TTL so we don't retry it on every call; those calls send the prefix inline.
+    create / delete are API calls, so they run outside the lock; calls for the
+    same entry that arrive meanwhile send the prefix inline.
+    """
+
+    def __init__(self, backend, ttl_seconds: int = PROMPT_CACHE_TTL_SECONDS, min_chars: int = PROMPT_CACHE_MIN_CHARS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_chars = min_chars
+        self._entries = {}
+        self._creating = set()  # (model, key) with a create in flight
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "failures": 0, "chars_saved": 0}
+
+    def get_cache_name(self, key: str, model: str, prefix: str):
+        if len(prefix) < self.min_chars:
+            return None
+
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get((model, key))
+            if entry and entry["hash"] == digest and entry["expires"] > now + 60:
+                if entry["name"]:
+                    self.stats["hits"] += 1
+                    self.stats["chars_saved"] += len(prefix)
+                return entry["name"]
+            if (model, key) in self._creating:
+                return None
+            self._creating.add((model, key))
+            self.stats["misses"] += 1
+            stale = entry["name"] if entry else None
+            if stale:
+                self.stats["refreshes"] += 1
+
+        try:
+            if stale:
+                try:
+                    self.backend.delete(stale)
+                except Exception:
+                    pass  # expired caches are gone already
+            try:
+                name = self.backend.create(model, prefix, self.ttl_seconds)
+            except Exception as e:
+                print(f"[Prompt Cache] create failed for '{key}', sending prefix inline: {e}")
+                name = None
+
+            with self._lock:
+                if name is None:
+                    self.stats["failures"] += 1
+                self._entries[(model, key)] = {"hash": digest, "name": name, "expires": now + self.ttl_seconds}
+            return name
+        finally:
+            with self._lock:
+                self._creating.discard((model, key))
+
+    def invalidate(self, key: str, model: str) -> None:
+        with self._lock:
+            self._entries.pop((model, key), None)
+
+    def generate(self, key: str, model: str, prefix: str, contents, config=None, **retry_kwargs):
+        """
+        safe_generate_content with `prefix` coming from cached context when possible.
+        contents = the per-call part only (string or list of parts).
+        Hedge latencies are tracked per `key` unless the caller passes latency_key.
+        """
+        retry_kwargs.setdefault("latency_key", key)
+        name = self.get_cache_name(key, model, prefix) if ENABLE_PROMPT_CACHE else None
+
+        if name:
+            cfg = dict(config or {})
+            cfg["cached_content"] = name
+            try:
+                return safe_generate_content(model, contents, cfg, **retry_kwargs)
+            except Exception as e:
+                if "cache" not in str(e).lower():
+                    raise
+                # cache deleted / expired server-side -> forget it, go inline this time
+                print(f"[Prompt Cache] '{key}' unusable, sending prefix inline: {e}")
+                self.invalidate(key, model)
+
+        if isinstance(contents, list):
+            full = [prefix] + contents
+        else:
+            full = prefix + (contents or "")
+        return safe_generate_content(model, full, config, **retry_kwargs)
+
+
+# the LLM backend also owns its cached contexts (real API or fake)
+prompt_prefix_cache = PromptPrefixManager(_backend)
+
+
+def set_prompt_cache_backend(backend) -> None:
+    """Swap the prefix cache backend (e.g. LocalPrefixCacheStub() for offline tests)."""
+    global prompt_prefix_cache
+    prompt_prefix_cache = PromptPrefixManager(backend)
+
+
+def set_backend(backend) -> None:
+    """
+    Swap the LLM backend at runtime (e.g. FakeGeminiBackend(...) in a benchmark).
+    The prompt-prefix cache moves to the same backend.
+    """
+    global _backend
+    _backend = backend
+    set_prompt_cache_backend(backend)
+
+
+def generate_with_prefix(key: str, model: str, prefix: str, contents, config=None, **retry_kwargs):
+    return prompt_prefix_cache.generate(key, model, prefix, contents, config, **retry_kwargs)
+
+
+def generate_for_task(task: str, key: str, prefix: str, contents, config=None, **retry_kwargs):
+    """
+    generate_with_prefix over the model tiers of MODEL_FALLBACK_RULES[task]:
+    a tier that keeps answering 503 / overloaded hands the call to the next one.
+    Returns (response, model_used).
+    """
+    rule = MODEL_FALLBACK_RULES.get(task) or {}
+    models = rule.get("models") or [MODEL_NAME]
+    if not ENABLE_MODEL_FALLBACK:
+        models = models[:1]
+
+    for i, model in enumerate(models):
+        last = i == len(models) - 1
+        try:
+            response = generate_with_prefix(
+                key, model, prefix, contents, config,
+                overload_limit=None if last else rule.get("overloads", 3),
+                **retry_kwargs
+            )
+        except ModelOverloaded as e:
+            print(f"[Model Fallback] {task}: {e} -> {models[i + 1]}")
+            LLM_MODEL_FALLBACKS.inc(task=task, from_model=model, to_model=models[i + 1])
+            continue
+        return response, (getattr(response, "model_version", None) or model)
@@ -0,0 +1,174 @@
+"""
+Hedged Gemini requests for interactive uploads.
+
+A user waiting on a single upload should not sit on one slow response that
+a retry would have answered in the normal time. For PRIORITY_INTERACTIVE
+calls (Scheduler.current_job), if the call has not returned after the
+HEDGE_PERCENTILE latency of recent successful calls of the same kind (model
+and prompt key: a batch of ten inputs is not compared with a single text),
+the same request is sent once more and whichever finishes first wins; the
+other answer is dropped.
+
+Duplicates are capped by a token budget: every eligible call earns
+HEDGE_BUDGET of a token, a hedge spends one, so hedges stay at or below
+~HEDGE_BUDGET extra calls (5% by default) with a small burst allowance.
+The duplicate also takes its own Scheduler slot (same job) and, from
+GeminiClient, its own circuit breaker permit, so hedges never push
+concurrency past LLM_MAX_CONCURRENCY or a recovering model's ramp-up; if the
+first answer arrives while the duplicate is still queued, it is not sent.
+Win rates: llm_hedges_total{outcome="fired"|"won"|"lost"|"no_budget"} on /metrics,
+or hedge_stats().
+"""
+
+import os
+import queue
+import threading
+import contextvars
+from collections import deque
+
+from Metrics import LLM_HEDGES
+from Scheduler import llm_slot
+
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.05"))
+HEDGE_BURST = float(os.getenv("HEDGE_BURST", "3"))
+# no hedging until this many latencies are known for the (model, prompt key)
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.5"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "500"))
+
+
+class LatencyTracker:
+    """Recent successful call latencies per (model, prompt key)."""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float, key: str = None) -> None:
+        with self._lock:
+            if (model, key) not in self._samples:
+                self._samples[(model, key)] = deque(maxlen=self.window)
+            self._samples[(model, key)].append(seconds)
+
+    def percentile(self, model: str, p: float, min_samples: int = HEDGE_MIN_SAMPLES, key: str = None):
+        """None until min_samples latencies are known."""
+        with self._lock:
+            samples = sorted(self._samples.get((model, key)) or ())
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+class HedgeBudget:
+    def __init__(self, ratio: float = HEDGE_BUDGET, burst: float = HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+latency_tracker = LatencyTracker()
+hedge_budget = HedgeBudget()
+_stats = {"eligible": 0, "fired": 0, "won": 0, "lost": 0, "no_budget": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+    if outcome != "eligible":
+        LLM_HEDGES.inc(outcome=outcome)
+
+
+def hedge_stats() -> dict:
+    with _stats_lock:
+        out = dict(_stats)
+    out["extra_call_rate"] = round(out["fired"] / out["eligible"], 4) if out["eligible"] else 0.0
+    out["win_rate"] = round(out["won"] / out["fired"], 4) if out["fired"] else None
+    return out
+
+
+def hedge_delay(model: str, key: str = None):
+    """Seconds to wait before hedging a `key` call to `model`, or None (not enough history)."""
+    p = latency_tracker.percentile(model, HEDGE_PERCENTILE, key=key)
+    return None if p is None else max(HEDGE_MIN_DELAY_SECONDS, p)
+
+
+def _outcome(result):
+    tag, resp, err = result
+    if err is not None:
+        raise err
+    return resp
+
+
+def hedged_call(fn, delay: float, hedge=None, admit=llm_slot):
+    """
+    fn() in a thread; after `delay` s without an answer, hedge() (default fn) once more,
+    budget allowing. First success wins. If the first to finish failed, the other one's
+    result is used. The caller holds the primary's slot / breaker permit; the duplicate
+    is sent inside its own admit() (default: a Scheduler slot).
+    "fired" / "won" / "lost" only count duplicates that were actually sent.
+    """
+    hedge = hedge or fn
+    hedge_budget.earn()
+    _count("eligible")
+    done = queue.Queue()
+    lock = threading.Lock()
+    state = {"finished": False, "sent": False}
+    job = contextvars.copy_context()  # the duplicate queues as the caller's job
+
+    def run(tag, call):
+        try:
+            done.put((tag, call(), None))
+        except Exception as e:
+            done.put((tag, None, e))
+
+    threading.Thread(target=run, args=("primary", fn), daemon=True).start()
+    try:
+        return _outcome(done.get(timeout=delay))
+    except queue.Empty:
+        pass
+
+    if not hedge_budget.try_spend():
+        _count("no_budget")
+        return _outcome(done.get())
+
+    def run_hedge():
+        with admit():
+            with lock:
+                if state["finished"]:  # primary answered while we queued
+                    return
+                state["sent"] = True
+            _count("fired")
+            run("hedge", hedge)
+
+    threading.Thread(target=job.run, args=(run_hedge,), daemon=True).start()
+
+    first = done.get()
+    with lock:
+        state["finished"] = True
+        sent = state["sent"]
+    if first[2] is None or not sent:
+        if sent:
+            _count("won" if first[0] == "hedge" else "lost")
+        return _outcome(first)
+
+    second = done.get()
+    if second[2] is None:
+        _count("won" if second[0] == "hedge" else "lost")
+        return second[1]
+    _count("lost")
+    raise first[2]
@@ -0,0 +1,290 @@
+"""
+Shared ingest job table (ingest_jobs, see Migrations.py) for a fleet of Worker.py processes.
+
+- enqueue_file: one row per file content (unique content_hash), so re-enqueueing is a no-op
+- claim: SELECT ... FOR UPDATE SKIP LOCKED, so workers on several machines never take
+  the same row; each claim bumps `fence` and sets a lease
+- heartbeat: extends the leases of jobs still being worked on
+- reap_expired: jobs whose lease ran out (crashed worker) go back to pending
+- results are written by DBConnector.insert_* together with status=done, checked
+  against the fence (DBConnector.ingest_job_context)
+
+Files must be on storage every worker can read (same path on all machines).
+"""
+
+import os
+
+from mysql.connector import Error
+
+from DBConnector import get_db_connection
+from Scheduler import PRIORITIES, PRIORITY_BULK
+from Utils import AUDIO_EXTS, file_sha256
+
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = int(os.getenv("JOB_RETRY_MAX_SECONDS", "1800"))
+
+_JOB_COLUMNS = "job_id, content_hash, file_path, file_kind, priority_rank, username, attempts, fence, parent_job_id"
+
+
+def file_kind(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".zip":
+        return "zip"
+    return "audio" if ext in AUDIO_EXTS else "text"
+
+
+def priority_rank(priority: str) -> int:
+    return PRIORITIES.index(priority)
+
+
+def enqueue_file(path: str, *, priority: str = PRIORITY_BULK, username: str = None,
+                 content_hash: str = None, parent_job_id: int = None):
+    """Add a file to the queue. Returns job_id, or None if this content is already queued / done."""
+    path = os.path.abspath(path)
+    content_hash = content_hash or file_sha256(path)
+
+    connection = get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            INSERT IGNORE INTO ingest_jobs
+                (content_hash, file_path, file_kind, priority_rank, username, max_attempts, parent_job_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (content_hash, path, file_kind(path), priority_rank(priority), username, JOB_MAX_ATTEMPTS, parent_job_id))
+        connection.commit()
+        return cursor.lastrowid if cursor.rowcount == 1 else None
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def claim(worker_id: str, *, limit: int = 1, kind: str = None, rank: int = None,
+          lease_seconds: int = JOB_LEASE_SECONDS) -> list:
+    """
+    Claim up to `limit` runnable jobs (best priority first, then oldest).
+    kind / rank (exact priority_rank) narrow the claim (e.g. more text jobs of the same class for one batch).
+    Returns job dicts including the new fence.
+    """
+    connection = get_db_connection()
+    if not connection:
+        return []
+
+    where = ["status = 'pending'", "available_at <= NOW()"]
+    params = []
+    if kind:
+        where.append("file_kind = %s")
+        params.append(kind)
+    if rank is not None:
+        where.append("priority_rank = %s")
+        params.append(rank)
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        connection.start_transaction()
+        cursor.execute(f"""
+            SELECT job_id FROM ingest_jobs
+            WHERE {' AND '.join(where)}
+            ORDER BY priority_rank, job_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, (*params, int(limit)))
+        ids = [row["job_id"] for row in cursor.fetchall()]
+        if not ids:
+            connection.rollback()
+            return []
+
+        marks = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"""
+            UPDATE ingest_jobs
+            SET status = 'running',
+                lease_owner = %s,
+                lease_expires_at = NOW() + INTERVAL %s SECOND,
+                fence = fence + 1,
+                attempts = attempts + 1
+            WHERE job_id IN ({marks})
+        """, (worker_id, int(lease_seconds), *ids))
+        cursor.execute(f"SELECT {_JOB_COLUMNS} FROM ingest_jobs WHERE job_id IN ({marks})", tuple(ids))
+        jobs = cursor.fetchall()
+        connection.commit()
+        return jobs
+    except Error as e:
+        connection.rollback()
+        print("[DB ERROR]", e)
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def heartbeat(jobs: list, lease_seconds: int = JOB_LEASE_SECONDS) -> int:
+    """Extend leases of jobs we still own. Returns how many are still ours."""
+    if not jobs:
+        return 0
+    connection = get_db_connection()
+    if not connection:
+        return 0
+
+    cursor = connection.cursor()
+    owned = 0
+    try:
+        for job in jobs:
+            cursor.execute("""
+                UPDATE ingest_jobs
+                SET lease_expires_at = NOW() + INTERVAL %s SECOND
+                WHERE job_id = %s AND fence = %s AND status = 'running'
+            """, (int(lease_seconds), job["job_id"], job["fence"]))
+            owned += cursor.rowcount
+        connection.commit()
+    except Error as e:
+        print("[DB ERROR]", e)
+    finally:
+        cursor.close()
+        connection.close()
+    return owned
+
+
+def _retry_delay(attempts: int) -> int:
+    return min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def fail(job: dict, error: str) -> None:
+    """Back to pending with backoff, or failed after max_attempts. No-op if the claim was lost."""
+    connection = get_db_connection()
+    if not connection:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ingest_jobs
+            SET status = IF(attempts >= max_attempts, 'failed', 'pending'),
+                available_at = NOW() + INTERVAL %s SECOND,
+                error = %s,
+                lease_owner = NULL,
+                lease_expires_at = NULL
+            WHERE job_id = %s AND fence = %s AND status = 'running'
+        """, (_retry_delay(job["attempts"]), (error or "")[:2000], job["job_id"], job["fence"]))
+        connection.commit()
+    except Error as e:
+        print("[DB ERROR]", e)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def complete(job: dict, result_table: str = None) -> bool:
+    """Mark done for jobs that write no session row themselves (e.g. a ZIP expanded into member jobs)."""
+    connection = get_db_connection()
+    if not connection:
+        return False
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ingest_jobs
+            SET status = 'done', result_table = %s, error = NULL, lease_owner = NULL, lease_expires_at = NULL
+            WHERE job_id = %s AND fence = %s AND status = 'running'
+        """, (result_table, job["job_id"], job["fence"]))
+        connection.commit()
+        return cursor.rowcount == 1
+    except Error as e:
+        print("[DB ERROR]", e)
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def still_running(jobs: list) -> list:
+    """Jobs from `jobs` that are still running under our fence (processing ended without a stored row)."""
+    if not jobs:
+        return []
+    connection = get_db_connection()
+    if not connection:
+        return []
+    cursor = connection.cursor(dictionary=True)
+    try:
+        marks = ", ".join(["%s"] * len(jobs))
+        cursor.execute(
+            f"SELECT job_id, fence FROM ingest_jobs WHERE status = 'running' AND job_id IN ({marks})",
+            tuple(j["job_id"] for j in jobs),
+        )
+        live = {(r["job_id"], r["fence"]) for r in cursor.fetchall()}
+        return [j for j in jobs if (j["job_id"], j["fence"]) in live]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def finished_zips(*, job_ids=None, content_hashes=None) -> list:
+    """
+    content_hash of the done ZIP jobs (by job_id or content_hash) whose member jobs
+    are all done or failed for good, i.e. whose spool folder is no longer needed.
+    """
+    keys = list(job_ids or content_hashes or [])
+    if not keys:
+        return []
+    connection = get_db_connection()
+    if not connection:
+        return []
+    cursor = connection.cursor()
+    try:
+        marks = ", ".join(["%s"] * len(keys))
+        cursor.execute(f"""
+            SELECT p.content_hash FROM ingest_jobs p
+            WHERE p.{'job_id' if job_ids else 'content_hash'} IN ({marks})
+              AND p.file_kind = 'zip' AND p.status = 'done'
+              AND NOT EXISTS (
+                  SELECT 1 FROM ingest_jobs c
+                  WHERE c.parent_job_id = p.job_id AND c.status NOT IN ('done', 'failed')
+              )
+        """, tuple(keys))
+        return [r[0] for r in cursor.fetchall()]
+    except Error as e:
+        print("[DB ERROR]", e)
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def reap_expired() -> int:
+    """Jobs whose lease ran out (worker crashed / hung) -> pending again, or failed after max_attempts."""
+    connection = get_db_connection()
+    if not connection:
+        return 0
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ingest_jobs
+            SET status = IF(attempts >= max_attempts, 'failed', 'pending'),
+                error = CONCAT('lease expired (worker ', COALESCE(lease_owner, '?'), ')'),
+                lease_owner = NULL,
+                lease_expires_at = NULL
+            WHERE status = 'running' AND lease_expires_at < NOW()
+        """)
+        connection.commit()
+        return cursor.rowcount
+    except Error as e:
+        print("[DB ERROR]", e)
+        return 0
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def queue_summary() -> dict:
+    """{status: count}"""
+    connection = get_db_connection()
+    if not connection:
+        return {}
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT status, COUNT(*) FROM ingest_jobs GROUP BY status")
+        return {status: n for status, n in cursor.fetchall()}
+    finally:
+        cursor.close()
+        connection.close()
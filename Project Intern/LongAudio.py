@@ -0,0 +1,152 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from AnalyzeAudio import transcribe_translate_audio, analyze_audio_all_in_one
+from AudioPreprocess import encode_wav, load_wav_mono
+from ResultMerge import merge_models, stitch_transcripts, combine_sentiments, merge_languages
+from Scheduler import map_in_context
+from VoiceActivity import frame_energy_db, to_original_time
+
+# Recordings longer than this (after silence trimming) go through segment mode
+LONG_AUDIO_MIN_SECONDS = float(os.getenv("LONG_AUDIO_MIN_SECONDS", "600"))
+LONG_AUDIO_SEGMENT_SECONDS = float(os.getenv("LONG_AUDIO_SEGMENT_SECONDS", "300"))
+LONG_AUDIO_OVERLAP_SECONDS = float(os.getenv("LONG_AUDIO_OVERLAP_SECONDS", "4"))
+LONG_AUDIO_SEARCH_SECONDS = float(os.getenv("LONG_AUDIO_SEARCH_SECONDS", "30"))
+LONG_AUDIO_WORKERS = int(os.getenv("LONG_AUDIO_WORKERS", "4"))
+
+
+def _segment_note(i: int, n: int) -> str:
+    return (
+        f"\n\nNOTE: This audio is part {i + 1} of {n} of ONE longer call. "
+        "It may start or end mid-sentence. "
+        "Keep the same speaker labels for the same people: \"Client:\" for the client, "
+        "\"CS:\" for customer service."
+    )
+
+
+def split_at_silence(samples, sample_rate: int):
+    """
+    Cut points every ~LONG_AUDIO_SEGMENT_SECONDS, each moved to the quietest
+    moment within +-LONG_AUDIO_SEARCH_SECONDS so cuts land between words.
+    Every segment after the first starts LONG_AUDIO_OVERLAP_SECONDS early.
+    Returns [(start_sample, end_sample), ...].
+    """
+    total = len(samples)
+    seg = int(LONG_AUDIO_SEGMENT_SECONDS * sample_rate)
+    search = int(LONG_AUDIO_SEARCH_SECONDS * sample_rate)
+
+    db, frame = frame_energy_db(samples, sample_rate)
+    smooth = np.convolve(db, np.ones(10) / 10, mode="same")  # ~0.3 s: a pause, not one quiet frame
+
+    cuts = [0]
+    while total - cuts[-1] > seg * 1.5:  # no tiny tail segment
+        target = cuts[-1] + seg
+        lo = max(cuts[-1] + seg // 2, target - search) // frame
+        hi = min(total - seg // 2, target + search) // frame
+        if hi > lo:
+            cuts.append(int((lo + np.argmin(smooth[lo:hi])) * frame))
+        else:
+            cuts.append(target)
+    cuts.append(total)
+
+    overlap = int(LONG_AUDIO_OVERLAP_SECONDS * sample_rate)
+    return [(max(0, cuts[i] - (overlap if i else 0)), cuts[i + 1]) for i in range(len(cuts) - 1)]
+
+
+def long_audio_segments(audio_path: str, prepared: dict):
+    """
+    Segment list for long-audio mode, or None if the recording is short enough
+    (or not decodable: non-WAV formats are sent whole).
+    """
+    samples = prepared.get("samples")
+    sample_rate = prepared.get("sample_rate")
+
+    if samples is None and audio_path.lower().endswith(".wav"):
+        try:
+            samples, sample_rate = load_wav_mono(audio_path)
+        except Exception:
+            return None
+    if samples is None or len(samples) <= LONG_AUDIO_MIN_SECONDS * sample_rate:
+        return None
+
+    ranges = split_at_silence(samples, sample_rate)
+    tmap = prepared.get("timestamp_map")
+
+    segments = []
+    for i, (start, end) in enumerate(ranges):
+        segments.append({
+            "index": i,
+            "prompt_suffix": _segment_note(i, len(ranges)),
+            "prepared": {"data": encode_wav(samples[start:end], sample_rate), "mime_type": "audio/wav"},
+            "seconds": (end - start) / sample_rate,
+            # position in the ORIGINAL recording (before silence trimming)
+            "original_start": to_original_time(start / sample_rate, tmap),
+            "original_end": to_original_time(end / sample_rate, tmap),
+        })
+
+    print(f"[LONG AUDIO] {os.path.basename(audio_path)}: {len(samples) / sample_rate:.0f}s -> {len(segments)} segments")
+    return segments
+
+
+def _run_segments(fn, segments):
+    with ThreadPoolExecutor(max_workers=max(1, min(LONG_AUDIO_WORKERS, len(segments)))) as pool:
+        return map_in_context(pool, fn, segments)
+
+
+def _first_error(results, segments):
+    for r, seg in zip(results, segments):
+        if r.get("error"):
+            return {"error": f"Segment {seg['index'] + 1}/{len(segments)}: {r['error']}", "raw": r.get("raw")}
+    return None
+
+
+def _timeline(segments):
+    return [{"start": round(s["original_start"], 2), "end": round(s["original_end"], 2)} for s in segments]
+
+
+def transcribe_segments(audio_path: str, segments: list) -> dict:
+    """Cheap transcription of all segments in parallel, stitched into one transcript."""
+    results = _run_segments(
+        lambda seg: transcribe_translate_audio(audio_path, seg["prepared"], seg["prompt_suffix"]),
+        segments,
+    )
+
+    err = _first_error(results, segments)
+    if err:
+        return err
+
+    return {
+        "transcript": stitch_transcripts([r.get("transcript") for r in results]),
+        "translation": stitch_transcripts([r.get("translation") for r in results]),
+        "language_used": merge_languages(results),
+        "segments": _timeline(segments),
+        "model_used": merge_models(*(r.get("model_used") for r in results)),
+    }
+
+
+def analyze_segments(audio_path: str, segments: list, scenarios_text: str) -> dict:
+    """
+    Full analysis of all segments in parallel, reduced to one session result
+    (same shape as analyze_audio_all_in_one). Segments vote weighted by duration.
+    """
+    results = _run_segments(
+        lambda seg: analyze_audio_all_in_one(audio_path, scenarios_text, seg["prepared"], seg["prompt_suffix"]),
+        segments,
+    )
+
+    err = _first_error(results, segments)
+    if err:
+        return err
+
+    merged = combine_sentiments(results, [s["seconds"] for s in segments])
+    return {
+        "transcript": stitch_transcripts([r.get("transcript") for r in results]),
+        "translation": stitch_transcripts([r.get("translation") for r in results]),
+        "language_used": merge_languages(results),
+        "sentiment": merged["sentiment"],
+        "scenario_id": merged["scenario_id"],
+        "segments": _timeline(segments),
+        "model_used": merge_models(*(r.get("model_used") for r in results)),
+    }
@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from AnalyzeText import analyze_text_all_in_one
+from Config import ALL_IN_ONE_UNIVERSAL_PROMPT
+from DiskCache import DiskCache
+from ResultMerge import merge_models, combine_sentiments, merge_languages
+from Scheduler import map_in_context
+
+# Documents longer than this are analysed chunk by chunk (map) and reduced
+TEXT_CHUNK_MIN_CHARS = int(os.getenv("TEXT_CHUNK_MIN_CHARS", "40000"))
+TEXT_CHUNK_CHARS = int(os.getenv("TEXT_CHUNK_CHARS", "15000"))
+TEXT_CHUNK_WORKERS = int(os.getenv("TEXT_CHUNK_WORKERS", "4"))
+TEXT_CHUNK_CACHE_MAX_BYTES = int(os.getenv("TEXT_CHUNK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_chunk_result_cache = DiskCache("text_chunk_results", TEXT_CHUNK_CACHE_MAX_BYTES)
+
+# Any prompt change invalidates cached chunk results
+_PROMPT_HASH = hashlib.sha256(ALL_IN_ONE_UNIVERSAL_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+def _chunk_note(i: int, n: int) -> str:
+    return (
+        f"\n\nNOTE: This text is part {i + 1} of {n} of ONE longer document. "
+        "Analyse only this part; it may start or end mid-paragraph."
+    )
+
+
+def _hard_split(block: str, max_chars: int):
+    """Split one oversized paragraph, preferring sentence ends, then spaces."""
+    out = []
+    while len(block) > max_chars:
+        cut = max(block.rfind(". ", 0, max_chars), block.rfind("\n", 0, max_chars))
+        if cut < max_chars // 2:
+            cut = block.rfind(" ", 0, max_chars)
+        if cut < max_chars // 2:
+            cut = max_chars - 1
+        out.append(block[:cut + 1])
+        block = block[cut + 1:]
+    if block.strip():
+        out.append(block)
+    return out
+
+
+def split_text_chunks(text: str, max_chars: int = TEXT_CHUNK_CHARS):
+    """Pack paragraphs (blank-line, then line separated) into chunks of at most max_chars."""
+    blocks = []
+    for para in text.split("\n\n"):
+        for line in para.split("\n"):
+            if line.strip():
+                blocks.extend(_hard_split(line, max_chars) if len(line) > max_chars else [line])
+        blocks.append("")  # paragraph break marker
+
+    chunks = []
+    cur = ""
+    for b in blocks:
+        piece = "\n" + b if cur else b
+        if cur and len(cur) + len(piece) > max_chars:
+            chunks.append(cur.strip())
+            cur = b
+        else:
+            cur += piece
+    if cur.strip():
+        chunks.append(cur.strip())
+    return chunks
+
+
+def needs_chunking(text: str) -> bool:
+    return len(text or "") > TEXT_CHUNK_MIN_CHARS
+
+
+def analyze_long_text(text: str, scenarios_text: str) -> dict:
+    """
+    Map-reduce version of analyze_text_all_in_one for long documents.
+
+    map:    chunks analysed concurrently; successful chunk results are cached on disk
+            (key = chunk text + scenarios + prompt), so a retry of a partly failed
+            document only re-sends the chunks that failed.
+    reduce: ResultMerge.combine_sentiments, weighted by chunk length.
+
+    Returns the same shape as analyze_text_all_in_one.
+    """
+    chunks = split_text_chunks(text)
+    n = len(chunks)
+    print(f"[LONG TEXT] {len(text)} chars -> {n} chunks")
+
+    def run(i: int) -> dict:
+        key = hashlib.sha256(
+            f"{_PROMPT_HASH}\n{i}/{n}\n{scenarios_text}\n{chunks[i]}".encode("utf-8")
+        ).hexdigest()
+
+        cached = _chunk_result_cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        r = analyze_text_all_in_one(chunks[i], scenarios_text, prompt_suffix=_chunk_note(i, n))
+        if not r.get("error"):
+            _chunk_result_cache.put(key, json.dumps(r, ensure_ascii=False))
+        return r
+
+    with ThreadPoolExecutor(max_workers=max(1, min(TEXT_CHUNK_WORKERS, n))) as pool:
+        results = map_in_context(pool, run, range(n))
+
+    failed = [i + 1 for i, r in enumerate(results) if r.get("error")]
+    if failed:
+        first = results[failed[0] - 1]
+        return {
+            "error": f"{len(failed)} of {n} chunks failed (chunks {failed}); rerun to retry only those",
+            "raw": first.get("raw"),
+        }
+
+    merged = combine_sentiments(results, [len(c) for c in chunks])
+    return {
+        "transcript": "\n\n".join((r.get("transcript") or "").strip() for r in results),
+        "translation": "\n\n".join((r.get("translation") or "").strip() for r in results),
+        "language_used": merge_languages(results),
+        "sentiment": merged["sentiment"],
+        "scenario_id": merged["scenario_id"],
+        "model_used": merge_models(*(r.get("model_used") for r in results)),
+    }
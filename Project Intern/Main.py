@@ -1,5 +1,32 @@
-from FolderProcessing import process_all_files_once
+import argparse
+
+import FolderProcessing
+from FolderProcessing import process_all_files_once, process_paths
+from FolderWatcher import FolderWatcher
+from Manifest import Manifest
+from Migrations import ensure_schema
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentiment Batch Processor (Audio + Text)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and process new files as they land (see FolderWatcher.py)")
+    parser.add_argument("--folder", help="input folder (default: FolderProcessing.LOCAL_INPUT_PATH)")
+    args = parser.parse_args()
+
+    if args.folder:
+        FolderProcessing.LOCAL_INPUT_PATH = args.folder
+
     print("=== Sentiment Batch Processor (Audio + Text) ===")
-    process_all_files_once()
+    ensure_schema()
+    manifest = Manifest()
+
+    if args.watch:
+        # the watcher queues the files already there itself, after its watch is set up,
+        # so files landing during the catch-up are not missed (manifest skips done files)
+        watcher = FolderWatcher(FolderProcessing.LOCAL_INPUT_PATH, lambda paths: process_paths(paths, manifest))
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print("\n[WATCH] Stopped.")
+    else:
+        process_all_files_once(manifest)
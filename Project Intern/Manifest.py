@@ -0,0 +1,148 @@
+"""
+Durable manifest of files processed by folder runs (SQLite, stdlib only).
+
+One row per content hash, so a file is analysed once no matter how often the
+folder is re-walked, renamed or copied. Status:
+  running  picked up, not finished (a crash leaves it here -> redone next run)
+  done     stored in DB -> skipped on every later run
+  failed   analysis failed -> retried next run
+
+ZIP members get their own rows (path = the ZIP, member = name inside it), so a
+ZIP that crashed halfway resumes at the first unfinished member.
+
+A path -> hash table (keyed on size + mtime) avoids re-hashing unchanged files.
+
+claim() / release() keep one content hash with one caller at a time inside
+this process (FolderWatcher runs several handlers at once, and two copies of
+the same file can arrive together).
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from Utils import file_sha256
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.getenv("MANIFEST_PATH", os.path.join(BASE_DIR, "manifest.sqlite3"))
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_files (
+    content_hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    member TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_processed_files_status ON processed_files (status);
+CREATE TABLE IF NOT EXISTS path_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+"""
+
+
+class Manifest:
+    def __init__(self, path: str = None):
+        self.path = path or MANIFEST_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._claimed = set()  # content hashes being processed in this process
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ===== hashing =====
+    def file_hash(self, path: str) -> str:
+        """sha256 of the file; reuses the stored hash while size and mtime are unchanged."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM path_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, st.st_size, st.st_mtime_ns),
+            ).fetchone()
+        if row:
+            return row[0]
+
+        digest = file_sha256(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO path_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, digest),
+            )
+            self._conn.commit()
+        return digest
+
+    # ===== status =====
+    def status(self, content_hash: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM processed_files WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, content_hash: str) -> bool:
+        return self.status(content_hash) == STATUS_DONE
+
+    def claim(self, content_hash: str) -> bool:
+        """Reserve a hash for processing. False if it is done or already claimed."""
+        if self.is_done(content_hash):
+            return False
+        with self._lock:
+            if content_hash in self._claimed:
+                return False
+            self._claimed.add(content_hash)
+            return True
+
+    def release(self, content_hash: str) -> None:
+        with self._lock:
+            self._claimed.discard(content_hash)
+
+    def start(self, content_hash: str, path: str, member: str = "") -> None:
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO processed_files (content_hash, path, member, status, attempts, updated_at)
+                VALUES (?, ?, ?, ?, 1, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET
+                    path = excluded.path,
+                    member = excluded.member,
+                    status = excluded.status,
+                    attempts = attempts + 1,
+                    error = NULL,
+                    updated_at = excluded.updated_at
+                """,
+                (content_hash, os.path.abspath(path), member or "", STATUS_RUNNING, now),
+            )
+            self._conn.commit()
+
+    def finish(self, content_hash: str, ok: bool, error: str = None) -> None:
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE processed_files SET status = ?, error = ?, updated_at = ? WHERE content_hash = ?",
+                (STATUS_DONE if ok else STATUS_FAILED, None if ok else (error or "")[:2000], now, content_hash),
+            )
+            self._conn.commit()
+
+    def summary(self) -> dict:
+        """{status: count}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM processed_files GROUP BY status").fetchall()
+        return dict(rows)
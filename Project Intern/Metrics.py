@@ -0,0 +1,166 @@
+"""
+In-process metrics (counters + histograms) rendered in Prometheus text format.
+
+Usage:
+    from Metrics import STAGE_SECONDS
+    with STAGE_SECONDS.time(stage="text_extract"):
+        ...
+
+app.py serves render() at GET /metrics. Values live in this process only
+(one Flask process = one scrape target).
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+# seconds: 5 ms .. 10 min (Gemini calls on long audio take minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra=None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name}: expected labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def _header(self, name=None):
+        name = name or self.name
+        return [f"# HELP {name} {self.help}", f"# TYPE {name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        lines = self._header(f"{self.name}_total")
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}_total{_label_str(self.label_names, key)} {_fmt(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the block (also when it raises)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def snapshot(self, **labels) -> dict:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return {"count": state["count"], "sum": state["sum"]} if state else {"count": 0, "sum": 0.0}
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for b, c in zip(self.buckets, state["counts"]):
+                    cumulative += c
+                    le = _label_str(self.label_names, key, ("le", _fmt(b)))
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                labels = _label_str(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_fmt(state['sum'])}")
+                lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in list(REGISTRY):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ========================
+# Pipeline metrics
+# ========================
+# stage = text_extract | text_analyze | audio_prepare | audio_transcribe | svm_score | audio_full
+STAGE_SECONDS = Histogram("pipeline_stage_seconds", "Wall time per pipeline stage", ["stage"])
+FILES_PROCESSED = Counter("pipeline_files", "Files finished by the pipeline", ["kind", "outcome"])
+SVM_DECISIONS = Counter("svm_decisions", "Local SVM first pass: auto-labelled vs escalated to Gemini", ["decision"])
+
+LLM_CALL_SECONDS = Histogram("llm_call_seconds", "Wall time per LLM attempt", ["model", "outcome"])
+LLM_RETRIES = Counter("llm_retries", "Retried LLM attempts", ["reason"])
+LLM_BACKOFF_SECONDS = Counter("llm_backoff_seconds", "Time slept in LLM retry backoff")
+LLM_FAILURES = Counter("llm_failures", "LLM calls that gave up", ["reason"])
+LLM_BREAKER_TRANSITIONS = Counter("llm_breaker_transitions", "Circuit breaker state changes (CircuitBreaker.py)", ["state"])
+LLM_BREAKER_WAIT_SECONDS = Histogram("llm_breaker_wait_seconds", "Time callers waited for the circuit breaker")
+LLM_MODEL_FALLBACKS = Counter("llm_model_fallbacks", "Calls moved to a lighter model tier", ["task", "from_model", "to_model"])
+LLM_HEDGES = Counter("llm_hedges", "Hedged interactive calls by outcome (won = duplicate answered first)", ["outcome"])
+LLM_QUEUE_WAIT_SECONDS = Histogram("llm_queue_wait_seconds", "Time waiting for an LLM slot (Scheduler.py)", ["priority"])
+
+EVENTS_PUBLISHED = Counter("events_published", "Server-sent events published to user channels", ["event"])
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds", "Wall time per DB operation (connect included)", ["op"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_ERRORS = Counter("db_errors", "DB operations that failed", ["op"])
+
+INGEST_JOBS = Counter("ingest_jobs", "Worker.py jobs finished: done or sent back for retry", ["kind", "outcome"])
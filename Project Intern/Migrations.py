@@ -0,0 +1,216 @@
+"""
+Schema changes on top of the original tables, applied in order once per DB.
+
+    python Migrations.py          # apply pending migrations
+    python Migrations.py --status # list applied / pending
+
+Applied ids are stored in schema_migrations. A MySQL named lock keeps several
+workers starting at the same time from applying the same step twice.
+"""
+
+import sys
+
+from mysql.connector import Error
+
+from DBConnector import get_db_connection
+import SessionIndex
+import SessionSearch
+import TranscriptStore
+
+# (id, description, [statements]) - append only, never edit an applied step.
+# A statement may be a function(connection) for data steps (e.g. batched backfills).
+MIGRATIONS = [
+    (1, "ingest_jobs table for Worker.py", [
+        """
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            job_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            content_hash CHAR(64) NOT NULL,
+            file_path VARCHAR(1024) NOT NULL,
+            file_kind VARCHAR(8) NOT NULL,
+            priority_rank TINYINT NOT NULL DEFAULT 2,
+            username VARCHAR(128) NULL,
+            status VARCHAR(16) NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            max_attempts INT NOT NULL DEFAULT 5,
+            available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            lease_owner VARCHAR(128) NULL,
+            lease_expires_at DATETIME NULL,
+            fence BIGINT NOT NULL DEFAULT 0,
+            parent_job_id BIGINT NULL,
+            result_table VARCHAR(32) NULL,
+            result_id BIGINT NULL,
+            error TEXT NULL,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_ingest_jobs_hash (content_hash),
+            KEY idx_ingest_jobs_claim (status, priority_rank, available_at, job_id),
+            KEY idx_ingest_jobs_lease (status, lease_expires_at)
+        ) ENGINE=InnoDB
+        """,
+    ]),
+    (2, "model_used on session tables (model tier fallback)", [
+        "ALTER TABLE audio_sessions ADD COLUMN model_used VARCHAR(128) NULL",
+        "ALTER TABLE text_sessions ADD COLUMN model_used VARCHAR(128) NULL",
+    ]),
+    (3, "session_index for cross-source sorting / paging (+ backfill)", [
+        """
+        CREATE TABLE IF NOT EXISTS session_index (
+            source_type VARCHAR(8) NOT NULL,
+            session_pk BIGINT NOT NULL,
+            uploaded_at DATETIME NULL,
+            sentiment_label VARCHAR(32) NULL,
+            human_sentiment_label VARCHAR(32) NULL,
+            scenario_id INT NULL,
+            file_type VARCHAR(16) NOT NULL,
+            PRIMARY KEY (source_type, session_pk),
+            KEY idx_session_index_uploaded (uploaded_at, source_type, session_pk),
+            KEY idx_session_index_label (sentiment_label, uploaded_at),
+            KEY idx_session_index_human (human_sentiment_label, uploaded_at),
+            KEY idx_session_index_type (file_type, uploaded_at),
+            KEY idx_session_index_scenario (scenario_id, uploaded_at)
+        ) ENGINE=InnoDB
+        """,
+        SessionIndex.backfill,
+    ]),
+    (4, "session_search full-text index over transcripts (+ backfill)", [
+        """
+        CREATE TABLE IF NOT EXISTS session_search (
+            source_type VARCHAR(8) NOT NULL,
+            session_pk BIGINT NOT NULL,
+            body MEDIUMTEXT NOT NULL,
+            PRIMARY KEY (source_type, session_pk),
+            FULLTEXT KEY ft_session_search_body (body) WITH PARSER ngram
+        ) ENGINE=InnoDB
+        """,
+        SessionSearch.backfill,
+    ]),
+    (5, "session_transcripts: compressed transcripts out of the session rows (+ backfill)", [
+        """
+        CREATE TABLE IF NOT EXISTS session_transcripts (
+            source_type VARCHAR(8) NOT NULL,
+            session_pk BIGINT NOT NULL,
+            codec VARCHAR(8) NOT NULL,
+            transcript_raw_z MEDIUMBLOB NULL,
+            transcript_english_z MEDIUMBLOB NULL,
+            raw_bytes INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (source_type, session_pk)
+        ) ENGINE=InnoDB ROW_FORMAT=DYNAMIC
+        """,
+        TranscriptStore.backfill,
+    ]),
+    # 6 is not used: dropping the inline transcript columns is an operator step
+    # (python TranscriptStore.py --drop-inline), checked against session_transcripts
+    # filled by SessionArchive.py --archive; partitioning itself is Partitions.py --setup (a table rebuild)
+    (7, "session_archive for sessions past the retention window", [
+        """
+        CREATE TABLE IF NOT EXISTS session_archive (
+            source_type VARCHAR(8) NOT NULL,
+            session_pk BIGINT NOT NULL,
+            uploaded_at DATETIME NULL,
+            file_name VARCHAR(512) NULL,
+            file_type VARCHAR(16) NOT NULL,
+            sentiment_label VARCHAR(32) NULL,
+            human_sentiment_label VARCHAR(32) NULL,
+            scenario_id INT NULL,
+            codec VARCHAR(8) NOT NULL,
+            payload MEDIUMBLOB NOT NULL,
+            archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source_type, session_pk),
+            KEY idx_session_archive_uploaded (uploaded_at),
+            KEY idx_session_archive_label (sentiment_label, uploaded_at),
+            KEY idx_session_archive_type (file_type, uploaded_at)
+        ) ENGINE=InnoDB ROW_FORMAT=DYNAMIC
+        """,
+    ]),
+]
+
+
+def _ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            id INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+    """)
+
+
+def applied_ids(cursor) -> set:
+    _ensure_table(cursor)
+    cursor.execute("SELECT id FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(verbose: bool = True) -> list:
+    """Apply pending migrations. Returns the ids applied now."""
+    connection = get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB for migrations")
+
+    cursor = connection.cursor()
+    done_now = []
+    try:
+        cursor.execute("SELECT GET_LOCK('schema_migrations', 60)")
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Timed out waiting for the schema_migrations lock")
+        try:
+            done = applied_ids(cursor)
+            for mig_id, description, statements in MIGRATIONS:
+                if mig_id in done:
+                    continue
+                if verbose:
+                    print(f"[MIGRATE] {mig_id}: {description}")
+                for stmt in statements:
+                    if callable(stmt):
+                        stmt(connection)
+                    else:
+                        cursor.execute(stmt)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (id, description) VALUES (%s, %s)",
+                    (mig_id, description),
+                )
+                connection.commit()
+                done_now.append(mig_id)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('schema_migrations')")
+            cursor.fetchone()
+    except Error as e:
+        print("[DB ERROR]", e)
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+
+    return done_now
+
+
+def ensure_schema() -> None:
+    """apply_migrations at process start; a DB that is down now is reported, not fatal."""
+    try:
+        apply_migrations(verbose=True)
+    except Exception as e:
+        print(f"[MIGRATE] Could not apply migrations (run python Migrations.py): {e}")
+
+
+def main():
+    if "--status" in sys.argv:
+        connection = get_db_connection()
+        if not connection:
+            print("[ERROR] Cannot connect to DB")
+            return
+        cursor = connection.cursor()
+        try:
+            done = applied_ids(cursor)
+        finally:
+            cursor.close()
+            connection.close()
+        for mig_id, description, _ in MIGRATIONS:
+            print(f"{'applied' if mig_id in done else 'PENDING'}  {mig_id}: {description}")
+        return
+
+    applied = apply_migrations()
+    print(f"[MIGRATE] {len(applied)} migration(s) applied." if applied else "[MIGRATE] Schema up to date.")
+
+
+if __name__ == "__main__":
+    main()
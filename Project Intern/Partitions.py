@@ -0,0 +1,235 @@
+"""
+Monthly RANGE partitioning of the session tables by uploaded_at.
+
+Dashboards and lists read recent months only; with one partition per month,
+queries bounded on uploaded_at touch only those months' partitions, and
+archived months (SessionArchive.py) are removed by dropping a partition
+instead of deleting rows out of one ever-growing B-tree.
+
+    python Partitions.py --setup     # one-off: partition the tables below
+    python Partitions.py --maintain  # add months ahead, drop emptied old months
+    python Partitions.py             # list partitions
+
+--setup rebuilds each table (a full copy, run it in a quiet window). MySQL
+requires the partitioning column in every unique key, so primary keys become
+(pk, uploaded_at) and uploaded_at becomes DATETIME NOT NULL; NULLs are filled
+from file_created_at. Partitioned InnoDB tables cannot have foreign keys, so
+setup stops and lists any it finds. session_search (FULLTEXT) and
+session_transcripts stay unpartitioned; archival cleans them by primary key.
+
+Partition pYYYYMM holds that month; p_future catches anything beyond the
+last month created. --maintain is cheap while p_future is empty, so run it
+from cron at least monthly (SessionArchive.py --archive also calls it).
+"""
+
+import os
+import sys
+from datetime import date, datetime
+
+from mysql.connector import Error
+
+import DBConnector
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+# table -> primary key columns before uploaded_at
+PARTITIONED_TABLES = {
+    "audio_sessions": ["session_id"],
+    "text_sessions": ["id"],
+    "session_index": ["source_type", "session_pk"],
+}
+
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.year * 12 + d.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month.year}{month.month:02d}"
+
+
+def _partition_sql(month: date) -> str:
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1).isoformat()}')"
+
+
+def _months(first: date, last: date) -> list:
+    out, m = [], first
+    while m <= last:
+        out.append(m)
+        m = add_months(m, 1)
+    return out
+
+
+def partitions(cursor, table: str) -> list:
+    """[(name, upper bound str or 'MAXVALUE', estimated rows)] in order; [] if not partitioned."""
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    return [(r[0], str(r[1]).strip("'"), int(r[2] or 0)) for r in cursor.fetchall()]
+
+
+def _foreign_keys(cursor, table: str) -> list:
+    cursor.execute("""
+        SELECT CONSTRAINT_NAME, TABLE_NAME, REFERENCED_TABLE_NAME
+        FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+    """, (table, table))
+    return [f"{r[1]}.{r[0]} -> {r[2]}" for r in cursor.fetchall()]
+
+
+def setup(connection=None, verbose: bool = True) -> list:
+    """Partition every PARTITIONED_TABLES table not yet partitioned. Returns the tables changed."""
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    changed = []
+    try:
+        for table, pk_cols in PARTITIONED_TABLES.items():
+            if partitions(cursor, table):
+                continue
+            fks = _foreign_keys(cursor, table)
+            if fks:
+                raise RuntimeError(f"{table} has foreign keys, drop them before partitioning: {', '.join(fks)}")
+
+            if table != "session_index":
+                cursor.execute(f"""
+                    UPDATE {table}
+                    SET uploaded_at = COALESCE(file_created_at, NOW())
+                    WHERE uploaded_at IS NULL
+                """)
+            else:
+                # the session tables come first in PARTITIONED_TABLES, so they have no NULLs left
+                cursor.execute("""
+                    UPDATE session_index si
+                    JOIN audio_sessions a ON si.source_type = 'audio' AND a.session_id = si.session_pk
+                    SET si.uploaded_at = a.uploaded_at
+                    WHERE si.uploaded_at IS NULL
+                """)
+                cursor.execute("""
+                    UPDATE session_index si
+                    JOIN text_sessions t ON si.source_type = 'text' AND t.id = si.session_pk
+                    SET si.uploaded_at = t.uploaded_at
+                    WHERE si.uploaded_at IS NULL
+                """)
+                cursor.execute("DELETE FROM session_index WHERE uploaded_at IS NULL")  # orphans
+            connection.commit()
+
+            cursor.execute(f"SELECT MIN(uploaded_at) FROM {table}")
+            oldest = cursor.fetchone()[0] or datetime.now()
+            months = _months(month_start(oldest), add_months(month_start(date.today()), PARTITION_MONTHS_AHEAD))
+            parts = ",\n".join([_partition_sql(m) for m in months] + ["PARTITION p_future VALUES LESS THAN (MAXVALUE)"])
+
+            if verbose:
+                print(f"[PARTITIONS] {table}: {len(months)} monthly partition(s) from {partition_name(months[0])}")
+            cursor.execute(f"""
+                ALTER TABLE {table}
+                    MODIFY uploaded_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    DROP PRIMARY KEY,
+                    ADD PRIMARY KEY ({", ".join(pk_cols)}, uploaded_at)
+            """)
+            cursor.execute(f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS (uploaded_at) (\n{parts}\n)")
+            changed.append(table)
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+    return changed
+
+
+def _is_empty(cursor, table: str, partition: str) -> bool:
+    cursor.execute(f"SELECT 1 FROM {table} PARTITION ({partition}) LIMIT 1")
+    return cursor.fetchone() is None
+
+
+def maintain(connection=None, ahead: int = PARTITION_MONTHS_AHEAD, drop_before: date = None,
+             verbose: bool = True) -> dict:
+    """
+    Make sure partitions exist `ahead` months past the current one, and drop
+    partitions that end on or before `drop_before` (a month start) and hold no
+    rows (archive them first). Tables not partitioned yet are skipped.
+    Returns {"added": [...], "dropped": [...]} as "table.partition".
+    """
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    added, dropped = [], []
+    try:
+        for table in PARTITIONED_TABLES:
+            parts = partitions(cursor, table)
+            if not parts:
+                continue
+
+            bounds = [datetime.strptime(b[:10], "%Y-%m-%d").date() for _, b, _ in parts if b != "MAXVALUE"]
+            last_bound = max(bounds) if bounds else month_start(date.today())
+            wanted = _months(last_bound, add_months(month_start(date.today()), ahead))
+            if wanted:
+                # p_future is empty in normal operation, so this only renames an empty range
+                new = ",\n".join([_partition_sql(m) for m in wanted] + ["PARTITION p_future VALUES LESS THAN (MAXVALUE)"])
+                cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION p_future INTO (\n{new}\n)")
+                added += [f"{table}.{partition_name(m)}" for m in wanted]
+
+            if drop_before:
+                old = [
+                    name for name, bound, _ in parts[:-1]
+                    if bound != "MAXVALUE" and datetime.strptime(bound[:10], "%Y-%m-%d").date() <= drop_before
+                ]
+                empty = [p for p in old if _is_empty(cursor, table, p)]
+                if empty:
+                    cursor.execute(f"ALTER TABLE {table} DROP PARTITION {', '.join(empty)}")
+                    dropped += [f"{table}.{p}" for p in empty]
+    except Error as e:
+        print("[DB ERROR]", e)
+        raise
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+
+    if verbose:
+        print(f"[PARTITIONS] added {len(added)}, dropped {len(dropped)} partition(s)")
+    return {"added": added, "dropped": dropped}
+
+
+def main():
+    if "--setup" in sys.argv:
+        changed = setup()
+        print(f"[PARTITIONS] partitioned: {', '.join(changed) or 'nothing to do'}")
+        return
+    if "--maintain" in sys.argv:
+        maintain()
+        return
+
+    connection = DBConnector.get_db_connection()
+    if not connection:
+        print("[ERROR] Cannot connect to DB")
+        return
+    cursor = connection.cursor()
+    try:
+        for table in PARTITIONED_TABLES:
+            parts = partitions(cursor, table)
+            if not parts:
+                print(f"{table}: not partitioned (python Partitions.py --setup)")
+                continue
+            for name, bound, rows in parts:
+                print(f"{table}.{name}  < {bound}  ~{rows} row(s)")
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import re
+from typing import Dict, List
+
+_SPEAKER_RE = re.compile(r"^\s*(Client|CS)\s*:", re.IGNORECASE)
+
+# Complaint wins once it carries this share of the (weighted) evidence,
+# a call that turns into a complaint halfway is still a complaint.
+COMPLAINT_MIN_SHARE = 1 / 3
+
+_MAX_OVERLAP_LINES = 8
+
+
+def _norm_line(line: str) -> str:
+    return re.sub(r"[\W_]+", " ", line.lower()).strip()
+
+
+def stitch_transcripts(parts: List[str]) -> str:
+    """
+    Join per-segment transcripts into one.
+    - lines repeated across an overlap (end of part i == start of part i+1) are kept once
+    - a part that starts mid-turn (no "Client:"/"CS:" label) continues the previous speaker
+    """
+    out: List[str] = []
+    last_speaker = None
+
+    for part in parts:
+        lines = [ln for ln in (part or "").splitlines() if ln.strip()]
+        if not lines:
+            continue
+
+        # drop overlap duplicated from the previous part
+        tail = [_norm_line(ln) for ln in out[-_MAX_OVERLAP_LINES:]]
+        head = [_norm_line(ln) for ln in lines[:_MAX_OVERLAP_LINES]]
+        for k in range(min(len(tail), len(head)), 0, -1):
+            if tail[-k:] == head[:k]:
+                lines = lines[k:]
+                break
+
+        if lines and last_speaker and not _SPEAKER_RE.match(lines[0]):
+            lines[0] = f"{last_speaker}: {lines[0].strip()}"
+
+        out.extend(lines)
+        for ln in reversed(out):
+            m = _SPEAKER_RE.match(ln)
+            if m:
+                last_speaker = "Client" if m.group(1).lower() == "client" else "CS"
+                break
+
+    return "\n".join(out)
+
+
+def merge_languages(results: List[Dict]) -> List[str]:
+    """Union of language_used over parts, first-seen order."""
+    out: List[str] = []
+    for r in results:
+        langs = r.get("language_used") or []
+        if isinstance(langs, str):
+            langs = [langs]
+        for lang in langs:
+            if lang not in out:
+                out.append(lang)
+    return out
+
+
+def merge_models(*model_lists) -> str:
+    """model_used over parts / stages ("a, b" when some parts fell back to another tier)."""
+    out: List[str] = []
+    for value in model_lists:
+        for m in (value or "").split(","):
+            m = m.strip()
+            if m and m not in out:
+                out.append(m)
+    return ", ".join(out) or None
+
+
+def _score(v) -> float:
+    try:
+        return max(0.0, min(100.0, float(v)))
+    except (TypeError, ValueError):
+        return 50.0
+
+
+def combine_sentiments(results: List[Dict], weights: List[float] = None) -> Dict:
+    """
+    Reduce per-segment / per-chunk ALL-IN-ONE results into one session result.
+
+    Each result votes for its sentiment label with weight * confidence.
+    Complaint wins at COMPLAINT_MIN_SHARE, otherwise the heaviest label wins.
+    Score = weighted mean score of the parts that agree with the final label;
+    tone / scenario / explanation come from the strongest agreeing part.
+
+    Returns {"sentiment": {label, score, tone, explanation}, "scenario_id"}.
+    """
+    if weights is None:
+        weights = [1.0] * len(results)
+
+    votes: Dict[str, float] = {}
+    parts = []
+    for r, w in zip(results, weights):
+        s = r.get("sentiment", {}) or {}
+        label = (s.get("label") or "").strip()
+        if not label:
+            continue
+        v = float(w) * _score(s.get("score")) / 100.0
+        votes[label] = votes.get(label, 0.0) + v
+        parts.append((v, label, r, s))
+
+    if not parts:
+        return {"sentiment": {}, "scenario_id": None}
+
+    total = sum(votes.values()) or 1.0
+    complaint = next((k for k in votes if k.lower() == "complaint"), None)
+    if complaint and votes[complaint] / total >= COMPLAINT_MIN_SHARE:
+        label = complaint
+    else:
+        label = max(votes, key=votes.get)
+
+    agreeing = [p for p in parts if p[1] == label]
+    w_sum = sum(p[0] for p in agreeing) or 1.0
+    score = round(sum(p[0] * _score(p[3].get("score")) for p in agreeing) / w_sum)
+
+    _, _, best, best_s = max(agreeing, key=lambda p: p[0])
+    explanation = best_s.get("explanation") or ""
+    if len(results) > 1:
+        explanation = f"[{label} in {len(agreeing)} of {len(results)} parts] {explanation}".strip()
+
+    return {
+        "sentiment": {
+            "label": label,
+            "score": score,
+            "tone": best_s.get("tone"),
+            "explanation": explanation,
+        },
+        "scenario_id": best.get("scenario_id"),
+    }
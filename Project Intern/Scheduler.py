@@ -0,0 +1,180 @@
+"""
+LLM call scheduler: priority classes + weighted fair queuing across users.
+
+Every Gemini attempt (GeminiClient.safe_generate_content) takes one of
+LLM_MAX_CONCURRENCY slots first. When slots are busy, waiting calls are
+served by:
+  1) priority class: interactive > zip > bulk
+  2) inside a class: start-time fair queuing per user, so one user's
+     5,000-file backfill or big ZIP cannot starve another user's calls
+LLM_INTERACTIVE_RESERVED_SLOTS slots are never given to zip / bulk work,
+so an interactive upload does not wait behind minutes-long audio calls.
+
+Who is calling comes from a context variable set by the entry point:
+    with job_context(PRIORITY_ZIP, username):
+        process_zip_upload(path)
+Thread pools must use map_in_context() to carry it into worker threads.
+"""
+
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+from Config import ENABLE_LLM_SCHEDULER
+from Metrics import LLM_QUEUE_WAIT_SECONDS
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_ZIP = "zip"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_ZIP, PRIORITY_BULK)  # highest first
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_INTERACTIVE_RESERVED_SLOTS = int(os.getenv("LLM_INTERACTIVE_RESERVED_SLOTS", "1"))
+# "alice=2,bob=0.5": a user's share of their class (default 1)
+LLM_USER_WEIGHTS = os.getenv("LLM_USER_WEIGHTS", "")
+
+
+def _parse_weights(spec: str) -> dict:
+    out = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            user, w = part.split("=", 1)
+            try:
+                out[user.strip()] = max(0.01, float(w))
+            except ValueError:
+                pass
+    return out
+
+
+_job = contextvars.ContextVar("llm_job", default=(PRIORITY_BULK, "system"))
+
+
+@contextmanager
+def job_context(priority: str, user: str = None):
+    """Tag LLM calls made inside the block with a priority class and user."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _job.set((priority, user or "anonymous"))
+    try:
+        yield
+    finally:
+        _job.reset(token)
+
+
+def current_job():
+    """(priority, user) of the running code."""
+    return _job.get()
+
+
+def map_in_context(pool, fn, items) -> list:
+    """pool.map() that keeps the caller's job context in the worker threads."""
+    items = list(items)
+    contexts = [contextvars.copy_context() for _ in items]
+    return list(pool.map(lambda item, ctx: ctx.run(fn, item), items, contexts))
+
+
+class _Ticket:
+    __slots__ = ("priority", "user", "cost", "granted")
+
+    def __init__(self, priority: str, user: str, cost: float):
+        self.priority = priority
+        self.user = user
+        self.cost = cost
+        self.granted = False
+
+
+class LLMScheduler:
+    def __init__(self, slots: int, reserved_interactive: int = 0, weights: dict = None):
+        self.slots = max(1, slots)
+        self.reserved_interactive = max(0, min(reserved_interactive, self.slots - 1))
+        self.weights = weights or {}
+
+        self._cond = threading.Condition()
+        self._in_use = {p: 0 for p in PRIORITIES}
+        self._queues = {p: {} for p in PRIORITIES}      # priority -> user -> deque[_Ticket]
+        self._finish = {p: {} for p in PRIORITIES}      # priority -> user -> virtual finish tag
+        self._vclock = {p: 0.0 for p in PRIORITIES}
+
+    def _weight(self, user: str) -> float:
+        return self.weights.get(user, 1.0)
+
+    def _has_room(self, priority: str) -> bool:
+        total = sum(self._in_use.values())
+        if total >= self.slots:
+            return False
+        if priority == PRIORITY_INTERACTIVE:
+            return True
+        background = total - self._in_use[PRIORITY_INTERACTIVE]
+        return background < self.slots - self.reserved_interactive
+
+    def _dispatch(self):
+        """Grant free slots to waiting tickets (lock held)."""
+        granted = False
+        for priority in PRIORITIES:
+            queues = self._queues[priority]
+            while queues and self._has_room(priority):
+                finish = self._finish[priority]
+                vclock = self._vclock[priority]
+                # smallest start tag = max(class clock, user's last finish tag)
+                user = min(queues, key=lambda u: max(vclock, finish.get(u, 0.0)))
+                ticket = queues[user].popleft()
+                if not queues[user]:
+                    del queues[user]
+
+                start = max(vclock, finish.get(user, 0.0))
+                finish[user] = start + ticket.cost / self._weight(user)
+                self._vclock[priority] = start
+
+                ticket.granted = True
+                self._in_use[priority] += 1
+                granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, priority: str, user: str, cost: float = 1.0) -> _Ticket:
+        ticket = _Ticket(priority, user, cost)
+        with self._cond:
+            self._queues[priority].setdefault(user, deque()).append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait()
+        return ticket
+
+    def release(self, ticket: _Ticket) -> None:
+        with self._cond:
+            self._in_use[ticket.priority] -= 1
+            self._dispatch()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "in_use": dict(self._in_use),
+                "waiting": {p: sum(len(q) for q in self._queues[p].values()) for p in PRIORITIES},
+            }
+
+
+scheduler = LLMScheduler(
+    LLM_MAX_CONCURRENCY,
+    LLM_INTERACTIVE_RESERVED_SLOTS,
+    _parse_weights(LLM_USER_WEIGHTS),
+)
+
+
+@contextmanager
+def llm_slot(cost: float = 1.0):
+    """Hold one LLM slot for the current job while the block runs."""
+    if not ENABLE_LLM_SCHEDULER:
+        yield
+        return
+
+    priority, user = current_job()
+    t0 = time.perf_counter()
+    ticket = scheduler.acquire(priority, user, cost)
+    LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - t0, priority=priority)
+    try:
+        yield
+    finally:
+        scheduler.release(ticket)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -28,6 +28,20 @@ def _month_series_last_n(n: int = 12) -> List[Tuple[int, int]]:
     return list(reversed(out))
 
 
+def dashboard_since(period: str = "", n: int = 12) -> date:
+    """
+    First day the dashboard needs rows from: the start of the last-n-months
+    chart, or the selected period's month if that is older.
+    """
+    y, m = _month_series_last_n(n)[0]
+    since = date(y, m, 1)
+    try:
+        y_sel, m_sel = map(int, period.split("-"))
+        return min(since, date(y_sel, m_sel, 1))
+    except Exception:
+        return since
+
+
 def build_dashboard_data(
     *,
     rows: List[Dict[str, Any]],
@@ -0,0 +1,238 @@
+"""
+Archival of sessions older than the retention window (Migrations.py step 7).
+
+Sessions uploaded before the first day of the month ARCHIVE_RETENTION_MONTHS
+back are moved, batch by batch, out of the hot tables (audio_sessions /
+text_sessions, session_index, session_search, session_transcripts) into
+session_archive: one row per session with the filter columns in the clear
+and the whole session (transcripts included) as one compressed JSON payload
+(TranscriptStore codecs). Each batch is one transaction, so a session is in
+exactly one place. After archiving, partitions that ended before the cutoff
+are empty and get dropped (Partitions.maintain).
+
+Archived sessions stay reachable on demand:
+- fetch(): the transcript / comment pages fall back to it by primary key
+- update_human_label(): CS corrections still land on archived sessions
+  (label column + payload), so they keep counting for train_svm.py
+- labeled(): the human-labelled archived sessions train_svm.py trains on
+- iter_sessions(): GET /sentiment_result/export?archived=1 (same filters,
+  no text search)
+
+    python SessionArchive.py --archive   # monthly, from cron
+    python SessionArchive.py             # archive size / date range
+"""
+
+import os
+import sys
+import json
+from datetime import date, datetime
+
+from mysql.connector import Error
+
+import DBConnector
+import Partitions
+import SessionIndex
+import TranscriptStore
+
+ARCHIVE_RETENTION_MONTHS = int(os.getenv("ARCHIVE_RETENTION_MONTHS", "24"))
+ARCHIVE_BATCH = int(os.getenv("ARCHIVE_BATCH", "500"))
+ARCHIVE_FETCH_ROWS = int(os.getenv("ARCHIVE_FETCH_ROWS", "500"))
+
+_DATETIME_FIELDS = ("uploaded_at", "file_created_at", "human_updated_at")
+
+
+def retention_cutoff(months: int = ARCHIVE_RETENTION_MONTHS) -> date:
+    """Sessions uploaded before this day are archived (a month start)."""
+    return Partitions.add_months(Partitions.month_start(date.today()), -months)
+
+
+def _pack(row: dict) -> tuple:
+    codec = TranscriptStore.TRANSCRIPT_CODEC
+    return codec, TranscriptStore.compress(json.dumps(row, ensure_ascii=False, default=str), codec)
+
+
+def _session_row(source_type: str, codec: str, payload) -> dict:
+    """Archived payload -> dict shaped like the app's session rows (id, source_type, file_name, ...)."""
+    _, pk, name_col = SessionIndex.SOURCE_TABLES[source_type]
+    row = json.loads(TranscriptStore.decompress(payload, codec))
+    for field in _DATETIME_FIELDS:
+        if row.get(field):
+            row[field] = datetime.fromisoformat(row[field])
+    row.update(source_type=source_type, id=row.get(pk), file_name=row.get(name_col), archived=True)
+    return row
+
+
+def archive(connection=None, months: int = ARCHIVE_RETENTION_MONTHS,
+            batch_size: int = ARCHIVE_BATCH, verbose: bool = True) -> int:
+    """Move sessions older than the retention window into session_archive. Returns how many."""
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cutoff = retention_cutoff(months)
+    cursor = connection.cursor(dictionary=True)
+    archived = 0
+    try:
+        for source_type, (table, pk, name_col) in SessionIndex.SOURCE_TABLES.items():
+            while True:
+                cursor.execute(f"""
+                    SELECT * FROM {table}
+                    WHERE uploaded_at < %s
+                    ORDER BY uploaded_at, {pk}
+                    LIMIT %s
+                """, (cutoff, int(batch_size)))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                ids = [r[pk] for r in rows]
+                texts = TranscriptStore.get_many(cursor, [(source_type, i) for i in ids])
+                values = []
+                for r in rows:
+                    r.update(texts.get((source_type, r[pk])) or {})
+                    values.append((
+                        source_type, r[pk], r["uploaded_at"], r.get(name_col),
+                        SessionIndex.ext_file_type(r.get(name_col)), r.get("sentiment_label"),
+                        r.get("human_sentiment_label"), r.get("scenario_id"), *_pack(r),
+                    ))
+                cursor.executemany("""
+                    INSERT INTO session_archive (
+                        source_type, session_pk, uploaded_at, file_name, file_type,
+                        sentiment_label, human_sentiment_label, scenario_id, codec, payload
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE codec = VALUES(codec), payload = VALUES(payload)
+                """, values)
+
+                marks = ", ".join(["%s"] * len(ids))
+                # uploaded_at bounds let the partitioned tables prune to the old months
+                cursor.execute(f"""
+                    DELETE FROM session_index
+                    WHERE source_type = %s AND session_pk IN ({marks}) AND uploaded_at < %s
+                """, (source_type, *ids, cutoff))
+                for side in ("session_search", "session_transcripts"):
+                    cursor.execute(f"DELETE FROM {side} WHERE source_type = %s AND session_pk IN ({marks})",
+                                   (source_type, *ids))
+                cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({marks}) AND uploaded_at < %s", (*ids, cutoff))
+                connection.commit()
+
+                archived += len(ids)
+                if verbose:
+                    print(f"[ARCHIVE] {table}: archived up to {rows[-1]['uploaded_at']} ({archived} so far)")
+    except Error as e:
+        connection.rollback()
+        print("[DB ERROR]", e)
+        raise
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+    return archived
+
+
+def update_human_label(cursor, source_type: str, session_pk, label: str, updated_at: datetime) -> bool:
+    """Set the human label of an archived session in the caller's transaction. False if not archived."""
+    cursor.execute("""
+        SELECT codec, payload FROM session_archive
+        WHERE source_type = %s AND session_pk = %s
+        FOR UPDATE
+    """, (source_type, int(session_pk)))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    codec, payload = (row["codec"], row["payload"]) if isinstance(row, dict) else row
+    data = json.loads(TranscriptStore.decompress(payload, codec))
+    data.update(human_sentiment_label=label, human_updated_at=updated_at)
+    cursor.execute("""
+        UPDATE session_archive
+        SET human_sentiment_label = %s, codec = %s, payload = %s
+        WHERE source_type = %s AND session_pk = %s
+    """, (label, *_pack(data), source_type, int(session_pk)))
+    return True
+
+
+def fetch(cursor, source_type: str, session_pk):
+    """One archived session (app row shape + transcripts), or None."""
+    cursor.execute("""
+        SELECT codec, payload FROM session_archive
+        WHERE source_type = %s AND session_pk = %s
+    """, (source_type, int(session_pk)))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    codec, payload = (row["codec"], row["payload"]) if isinstance(row, dict) else row
+    return _session_row(source_type, codec, payload)
+
+
+def labeled(cursor, source_type: str = "audio") -> list:
+    """Archived sessions of one source type with a human label (app row shape + transcripts)."""
+    cursor.execute("""
+        SELECT codec, payload FROM session_archive
+        WHERE source_type = %s AND human_sentiment_label IS NOT NULL
+    """, (source_type,))
+    out = []
+    for row in cursor.fetchall():
+        codec, payload = (row["codec"], row["payload"]) if isinstance(row, dict) else row
+        out.append(_session_row(source_type, codec, payload))
+    return out
+
+
+def iter_sessions(**filters):
+    """
+    Archived sessions matching the list filters (file_type, sentiment, start, end),
+    newest first, streamed through an unbuffered cursor.
+    """
+    where, params = SessionIndex.filter_sql(**filters)  # session_archive has the same filter columns
+    connection = DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(f"""
+            SELECT si.source_type, si.codec, si.payload
+            FROM session_archive si
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY si.uploaded_at DESC, si.source_type DESC, si.session_pk DESC
+        """, tuple(params))
+        while True:
+            batch = cursor.fetchmany(ARCHIVE_FETCH_ROWS)
+            if not batch:
+                break
+            for source_type, codec, payload in batch:
+                yield _session_row(source_type, codec, payload)
+    finally:
+        for close in (cursor.close, connection.close):
+            try:
+                close()
+            except Error:
+                pass
+
+
+def main():
+    if "--archive" in sys.argv:
+        n = archive()
+        print(f"[ARCHIVE] {n} session(s) archived (before {retention_cutoff()}).")
+        Partitions.maintain(drop_before=retention_cutoff())
+        return
+
+    connection = DBConnector.get_db_connection()
+    if not connection:
+        print("[ERROR] Cannot connect to DB")
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*), MIN(uploaded_at), MAX(uploaded_at), SUM(LENGTH(payload))
+            FROM session_archive
+        """)
+        n, oldest, newest, size = cursor.fetchone()
+    finally:
+        cursor.close()
+        connection.close()
+    print(f"[ARCHIVE] {n} session(s), {oldest} .. {newest}, {(size or 0) / 1024 / 1024:.1f} MB compressed")
+    print(f"[ARCHIVE] retention: {ARCHIVE_RETENTION_MONTHS} month(s), next cutoff {retention_cutoff()}")
+
+
+if __name__ == "__main__":
+    main()
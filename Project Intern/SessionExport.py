@@ -0,0 +1,175 @@
+"""
+Streaming CSV / JSONL export of filtered sessions (GET /sentiment_result/export).
+
+One SELECT over session_index (+ the session tables for the wide columns,
+session_transcripts when transcripts are asked for),
+read through an unbuffered (server-side) cursor EXPORT_FETCH_ROWS at a time
+and written out as it arrives: memory stays flat however many rows match,
+and the download starts with the first batch. The single statement also
+means the export is one consistent snapshot.
+
+Filters are the /sentiment_result ones (SessionIndex.filter_sql, plus q =
+full-text match, see SessionSearch.py). Rows come newest first.
+"""
+
+import io
+import os
+import itertools
+import csv
+import json
+import time
+from decimal import Decimal
+from datetime import date, datetime
+
+from mysql.connector import Error
+
+import SessionArchive
+import SessionIndex
+import SessionSearch
+import TranscriptStore
+from DBConnector import get_db_connection
+from Metrics import DB_QUERY_SECONDS
+
+EXPORT_FETCH_ROWS = int(os.getenv("EXPORT_FETCH_ROWS", "1000"))
+# the server drops a streaming query if the client stops reading this long (slow downloads)
+EXPORT_NET_WRITE_TIMEOUT = int(os.getenv("EXPORT_NET_WRITE_TIMEOUT", "3600"))
+
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson; charset=utf-8"}
+
+COLUMNS = [
+    ("source_type", "si.source_type"),
+    ("id", "si.session_pk"),
+    ("file_name", "COALESCE(a.audio_filename, t.text_filename)"),
+    ("file_type", "si.file_type"),
+    ("uploaded_at", "si.uploaded_at"),
+    ("sentiment_label", "si.sentiment_label"),
+    ("human_sentiment_label", "si.human_sentiment_label"),
+    ("sentiment_score", "COALESCE(a.sentiment_score, t.sentiment_score)"),
+    ("sentiment_tone", "COALESCE(a.sentiment_tone, t.sentiment_tone)"),
+    ("scenario_id", "si.scenario_id"),
+    ("language_used", "COALESCE(a.language_used, t.language_used)"),
+    ("model_used", "COALESCE(a.model_used, t.model_used)"),
+    ("sentiment_explanation", "COALESCE(a.sentiment_explanation, t.sentiment_explanation)"),
+]
+# decompressed in Python (TranscriptStore.decode_pair) into transcript_raw, transcript_english
+TRANSCRIPT_COLUMNS = ["st.codec", "st.transcript_raw_z", "st.transcript_english_z"]
+TRANSCRIPT_NAMES = ["transcript_raw", "transcript_english"]
+
+
+def _export_sql(q: str = "", include_transcripts: bool = False, **filters):
+    exprs = [expr for _, expr in COLUMNS]
+    names = [name for name, _ in COLUMNS]
+    where, params = SessionIndex.filter_sql(**filters)
+    joins = ""
+    if include_transcripts:
+        exprs += TRANSCRIPT_COLUMNS
+        names += TRANSCRIPT_NAMES
+        joins = "LEFT JOIN session_transcripts st ON st.source_type = si.source_type AND st.session_pk = si.session_pk"
+    if q:
+        joins += " JOIN session_search ss ON ss.source_type = si.source_type AND ss.session_pk = si.session_pk"
+        match_where, match_params, _ = SessionSearch.match_sql(q)
+        where = match_where + where
+        params = match_params + params
+
+    sql = f"""
+        SELECT {', '.join(exprs)}
+        FROM session_index si
+        {joins}
+        LEFT JOIN audio_sessions a ON si.source_type = 'audio' AND a.session_id = si.session_pk
+        LEFT JOIN text_sessions t ON si.source_type = 'text' AND t.id = si.session_pk
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY si.uploaded_at DESC, si.source_type DESC, si.session_pk DESC
+    """
+    return names, sql, tuple(params)
+
+
+def iter_rows(q: str = "", include_transcripts: bool = False, **filters):
+    """Yields the column names, then one tuple per matching session."""
+    names, sql, params = _export_sql(q, include_transcripts, **filters)
+    n_plain = len(COLUMNS)
+
+    connection = get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+    cursor = connection.cursor(buffered=False)
+    t0 = time.perf_counter()
+    n = 0
+    try:
+        cursor.execute("SET SESSION net_write_timeout = %s", (EXPORT_NET_WRITE_TIMEOUT,))
+        cursor.execute(sql, params)
+        yield names
+        while True:
+            batch = cursor.fetchmany(EXPORT_FETCH_ROWS)
+            if not batch:
+                break
+            n += len(batch)
+            if include_transcripts:
+                batch = [row[:n_plain] + TranscriptStore.decode_pair(*row[n_plain:]) for row in batch]
+            yield from batch
+    finally:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - t0, op="export")
+        print(f"[EXPORT] {n} row(s) streamed in {time.perf_counter() - t0:.1f}s")
+        # an abandoned download leaves unread rows; dropping the connection discards them
+        for close in (cursor.close, connection.close):
+            try:
+                close()
+            except Error:
+                pass
+
+
+def iter_archived_rows(include_transcripts: bool = False, **filters):
+    """iter_rows over session_archive (SessionArchive.py): same columns, no text search."""
+    names = [name for name, _ in COLUMNS] + (TRANSCRIPT_NAMES if include_transcripts else [])
+    sessions = SessionArchive.iter_sessions(**filters)
+    first = next(sessions, None)  # runs the query before the names go out
+    yield names
+    for s in itertools.chain([first] if first else [], sessions):
+        s["file_type"] = SessionIndex.ext_file_type(s.get("file_name"))
+        yield tuple(s.get(name) for name in names)
+
+
+def _json_value(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode("utf-8", "replace")
+    return v
+
+
+def stream_csv(names, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")  # Excel opens UTF-8 CSV correctly with a BOM
+    writer.writerow(names)
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def stream_jsonl(names, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({k: _json_value(v) for k, v in zip(names, row)}, ensure_ascii=False))
+        if len(chunk) >= 200:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def export(fmt: str, q: str = "", include_transcripts: bool = False, archived: bool = False, **filters):
+    """Generator of text chunks for the HTTP response. archived: from session_archive instead."""
+    if archived and q:
+        raise ValueError("Text search is not available for archived sessions")
+    rows = iter_archived_rows(include_transcripts, **filters) if archived else iter_rows(q, include_transcripts, **filters)
+    names = next(rows)  # runs the query now: DB errors fail the request, not half a download
+    return stream_csv(names, rows) if fmt == "csv" else stream_jsonl(names, rows)
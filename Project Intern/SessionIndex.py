@@ -0,0 +1,188 @@
+"""
+session_index: one narrow row per audio / text session (Migrations.py step 3).
+
+List pages used to UNION ALL audio_sessions and text_sessions and sort the
+result by uploaded_at, a filesort over both full tables on every request.
+session_index holds just what lists filter and sort on, with composite
+indexes ending in uploaded_at, so "newest N" / filtered pages read one
+index range; the wide rows are then fetched by primary key.
+
+- index_session / index_human_label run in the caller's transaction
+  (DBConnector inserts, human label updates), so the index never drifts
+- backfill() fills / repairs it from the session tables in batches:
+      python SessionIndex.py --backfill
+"""
+
+import os
+import sys
+from datetime import timedelta
+
+import DBConnector  # module import: DBConnector imports this module too
+
+SESSION_INDEX_BACKFILL_BATCH = int(os.getenv("SESSION_INDEX_BACKFILL_BATCH", "5000"))
+
+# source_type -> (table, primary key, file name column)
+SOURCE_TABLES = {
+    "audio": ("audio_sessions", "session_id", "audio_filename"),
+    "text": ("text_sessions", "id", "text_filename"),
+}
+
+_FILE_TYPES = {".wav": "wav", ".pdf": "pdf", ".docx": "docx", ".txt": "txt"}
+
+
+def ext_file_type(file_name: str) -> str:
+    """File type as shown / filtered in the UI (by extension)."""
+    return _FILE_TYPES.get(os.path.splitext((file_name or "").lower())[1], "unknown")
+
+
+def index_session(cursor, source_type: str, session_pk, *, file_name, uploaded_at,
+                  sentiment_label=None, scenario_id=None, human_sentiment_label=None) -> None:
+    cursor.execute("""
+        INSERT INTO session_index (
+            source_type, session_pk, uploaded_at, sentiment_label,
+            human_sentiment_label, scenario_id, file_type
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (source_type, session_pk, uploaded_at, sentiment_label,
+          human_sentiment_label, scenario_id, ext_file_type(file_name)))
+
+
+def index_human_label(cursor, source_type: str, session_pk, label: str) -> None:
+    cursor.execute("""
+        UPDATE session_index
+        SET human_sentiment_label = %s
+        WHERE source_type = %s AND session_pk = %s
+    """, (label, source_type, int(session_pk)))
+
+
+def filter_sql(file_type=None, sentiment=None, start=None, end=None):
+    """([conditions on alias si], params) for the list filters."""
+    where, params = [], []
+    if file_type:
+        where.append("si.file_type = %s")
+        params.append(file_type)
+    if sentiment:
+        where.append("si.sentiment_label = %s")
+        params.append(sentiment.strip())
+    if start:
+        where.append("si.uploaded_at >= %s")
+        params.append(start)
+    if end:
+        where.append("si.uploaded_at < %s")
+        params.append(end + timedelta(days=1))
+    return where, params
+
+
+def query_keys(cursor, *, limit: int, offset: int = 0, count: bool = False, **filters):
+    """
+    Newest-first (source_type, session_pk) keys matching the filters
+    (file_type, sentiment, start / end dates; text search: SessionSearch.search).
+    Returns (total or None, keys).
+    """
+    where, params = filter_sql(**filters)
+    where = " WHERE " + " AND ".join(where) if where else ""
+
+    total = None
+    if count:
+        cursor.execute(f"SELECT COUNT(*) AS n FROM session_index si{where}", tuple(params))
+        total = _first_value(cursor.fetchone())
+
+    cursor.execute(f"""
+        SELECT si.source_type, si.session_pk
+        FROM session_index si{where}
+        ORDER BY si.uploaded_at DESC, si.source_type DESC, si.session_pk DESC
+        LIMIT %s OFFSET %s
+    """, (*params, int(limit), int(offset)))
+    keys = [(_value(r, 0, "source_type"), _value(r, 1, "session_pk")) for r in cursor.fetchall()]
+    return total, keys
+
+
+def fetch_by_keys(cursor, keys, audio_select: str, text_select: str, pk_alias: str) -> list:
+    """
+    Wide rows for `keys`, in the same order. audio_select / text_select are
+    "SELECT ... FROM audio_sessions a" / "... FROM text_sessions t" without WHERE;
+    rows must include source_type and the primary key as `pk_alias`.
+    """
+    rows = {}
+    for source_type, select, pk_col in (("audio", audio_select, "a.session_id"), ("text", text_select, "t.id")):
+        ids = [pk for st, pk in keys if st == source_type]
+        if not ids:
+            continue
+        marks = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"{select} WHERE {pk_col} IN ({marks})", tuple(ids))
+        for r in cursor.fetchall():
+            rows[(source_type, r[pk_alias])] = r
+    return [rows[k] for k in keys if k in rows]
+
+
+def _value(row, i, name):
+    return row[name] if isinstance(row, dict) else row[i]
+
+
+def _first_value(row):
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def backfill(connection=None, batch_size: int = SESSION_INDEX_BACKFILL_BATCH, verbose: bool = True) -> int:
+    """
+    Index every session row (existing index rows are refreshed). Idempotent,
+    commits per batch. Returns the number of rows written.
+    """
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    written = 0
+    try:
+        for source_type, (table, pk, name_col) in SOURCE_TABLES.items():
+            last = 0
+            while True:
+                cursor.execute(f"""
+                    SELECT {pk}, {name_col}, uploaded_at, sentiment_label, human_sentiment_label, scenario_id
+                    FROM {table}
+                    WHERE {pk} > %s
+                    ORDER BY {pk}
+                    LIMIT %s
+                """, (last, int(batch_size)))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                cursor.executemany("""
+                    INSERT INTO session_index (
+                        source_type, session_pk, uploaded_at, sentiment_label,
+                        human_sentiment_label, scenario_id, file_type
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        uploaded_at = VALUES(uploaded_at),
+                        sentiment_label = VALUES(sentiment_label),
+                        human_sentiment_label = VALUES(human_sentiment_label),
+                        scenario_id = VALUES(scenario_id),
+                        file_type = VALUES(file_type)
+                """, [
+                    (source_type, r[0], r[2], r[3], r[4], r[5], ext_file_type(r[1]))
+                    for r in rows
+                ])
+                connection.commit()
+                written += len(rows)
+                last = rows[-1][0]
+                if verbose:
+                    print(f"[SESSION INDEX] {table}: indexed up to {pk}={last}")
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+    return written
+
+
+def main():
+    if "--backfill" not in sys.argv:
+        print("usage: python SessionIndex.py --backfill")
+        return
+    print(f"[SESSION INDEX] {backfill()} row(s) indexed.")
+
+
+if __name__ == "__main__":
+    main()
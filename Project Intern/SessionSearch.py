@@ -0,0 +1,194 @@
+"""
+Full-text search over what was said (Migrations.py step 4).
+
+session_search holds, per session, the file name + transcript_raw +
+transcript_english under a MySQL FULLTEXT index using the ngram parser
+(transcripts mix English, Malay and Chinese; ngram needs no word
+boundaries). Rows are written in the same transaction as the session
+insert; existing sessions are backfilled by the migration or by
+    python SessionSearch.py --backfill
+
+search() ranks by MATCH ... AGAINST relevance (newest first on ties), with
+the usual list filters from session_index, paged in SQL. snippet() cuts the
+best-matching window of a transcript and marks the hits for the results page.
+"""
+
+import os
+import re
+import sys
+import html
+import time
+
+import DBConnector  # module import: DBConnector imports this module too
+import SessionIndex
+import TranscriptStore
+from Metrics import DB_QUERY_SECONDS
+
+SEARCH_BACKFILL_BATCH = int(os.getenv("SEARCH_BACKFILL_BATCH", "2000"))
+SNIPPET_CHARS = int(os.getenv("SNIPPET_CHARS", "160"))
+
+# the server's ngram_token_size: shorter terms are not in the FULLTEXT index
+NGRAM_TOKEN_SIZE = int(os.getenv("NGRAM_TOKEN_SIZE", "2"))
+
+# BOOLEAN MODE with every term a required phrase (+"refund"): natural language
+# mode splits an ngram query into bigrams and ORs them, which matches nearly everything
+MATCH_SQL = "MATCH(ss.body) AGAINST (%s IN BOOLEAN MODE)"
+# body starts with the file name (search_text)
+FILE_NAME_LIKE_SQL = "SUBSTRING_INDEX(ss.body, '\\n', 1) LIKE %s"
+
+
+def search_text(file_name, transcript, translation) -> str:
+    return "\n".join(p for p in (file_name, transcript, translation) if p)
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def match_sql(q: str):
+    """
+    ([conditions on alias ss], params, boolean query or None) for a search box value:
+    terms of NGRAM_TOKEN_SIZE+ chars must all occur (full-text), shorter ones
+    must occur in the file name. The boolean query also ranks (MATCH ... AS score).
+    """
+    terms = [t for t in (q or "").replace('"', " ").split() if t]
+    long_terms = [t for t in terms if len(t) >= NGRAM_TOKEN_SIZE]
+    where, params = [], []
+    query = " ".join(f'+"{t}"' for t in long_terms) or None
+    if query:
+        where.append(MATCH_SQL)
+        params.append(query)
+    for t in terms:
+        if len(t) < NGRAM_TOKEN_SIZE:
+            where.append(FILE_NAME_LIKE_SQL)
+            params.append(_like_pattern(t))
+    return where, params, query
+
+
+def index_session_text(cursor, source_type: str, session_pk, *, file_name, transcript, translation) -> None:
+    cursor.execute("""
+        INSERT INTO session_search (source_type, session_pk, body)
+        VALUES (%s, %s, %s)
+    """, (source_type, session_pk, search_text(file_name, transcript, translation)))
+
+
+def search(cursor, q: str, *, limit: int, offset: int = 0, count: bool = False, **filters):
+    """
+    (total or None, [(source_type, session_pk)]) best match first.
+    filters = SessionIndex.filter_sql filters (file_type, sentiment, start, end).
+    """
+    t0 = time.perf_counter()
+    match_where, match_params, query = match_sql(q)
+    if not match_where:
+        return (0 if count else None), []
+    where, params = SessionIndex.filter_sql(**filters)
+    where = " AND ".join(match_where + where)
+    params = match_params + params
+    score = MATCH_SQL if query else "0"
+    order_params = (query,) if query else ()
+
+    try:
+        total = None
+        if count:
+            cursor.execute(f"""
+                SELECT COUNT(*) AS n
+                FROM session_search ss
+                JOIN session_index si ON si.source_type = ss.source_type AND si.session_pk = ss.session_pk
+                WHERE {where}
+            """, tuple(params))
+            row = cursor.fetchone()
+            total = row["n"] if isinstance(row, dict) else row[0]
+
+        cursor.execute(f"""
+            SELECT ss.source_type, ss.session_pk,
+                   {score} AS score
+            FROM session_search ss
+            JOIN session_index si ON si.source_type = ss.source_type AND si.session_pk = ss.session_pk
+            WHERE {where}
+            ORDER BY score DESC, si.uploaded_at DESC
+            LIMIT %s OFFSET %s
+        """, (*order_params, *params, int(limit), int(offset)))
+        rows = cursor.fetchall()
+    finally:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - t0, op="search")
+
+    keys = [(r["source_type"], r["session_pk"]) if isinstance(r, dict) else (r[0], r[1]) for r in rows]
+    return total, keys
+
+
+def _terms(q: str) -> list:
+    return sorted({t for t in re.split(r"\s+", (q or "").strip()) if len(t) >= 2}, key=len, reverse=True)
+
+
+def snippet(text: str, q: str, width: int = SNIPPET_CHARS):
+    """
+    HTML-escaped window of `text` around the densest cluster of query terms,
+    hits wrapped in <mark>. None when no term occurs in `text`.
+    """
+    terms = _terms(q)
+    if not text or not terms:
+        return None
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    hits = [m.start() for m in pattern.finditer(text)]
+    if not hits:
+        return None
+
+    # window start with the most hits inside
+    best, best_n = hits[0], 0
+    j = 0
+    for i, h in enumerate(hits):
+        while hits[j] < h - width // 2:
+            j += 1
+        if i - j + 1 > best_n:
+            best, best_n = hits[j], i - j + 1
+
+    start = max(0, best - width // 4)
+    end = min(len(text), start + width)
+    window = re.sub(r"\s+", " ", text[start:end])
+
+    out, pos = [], 0
+    for m in pattern.finditer(window):
+        out.append(html.escape(window[pos:m.start()]))
+        out.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        pos = m.end()
+    out.append(html.escape(window[pos:]))
+    return ("…" if start > 0 else "") + "".join(out) + ("…" if end < len(text) else "")
+
+
+def backfill(connection=None, batch_size: int = SEARCH_BACKFILL_BATCH, verbose: bool = True) -> int:
+    """(Re)index the text of every session. Idempotent, commits per batch."""
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    written = 0
+    try:
+        for source_type in SessionIndex.SOURCE_TABLES:
+            for rows in TranscriptStore.session_texts(cursor, source_type, batch_size):
+                cursor.executemany("""
+                    INSERT INTO session_search (source_type, session_pk, body)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE body = VALUES(body)
+                """, [(source_type, r[0], search_text(r[1], r[2], r[3])) for r in rows])
+                connection.commit()
+                written += len(rows)
+                if verbose:
+                    print(f"[SEARCH] {source_type}: indexed up to pk={rows[-1][0]}")
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+    return written
+
+
+def main():
+    if "--backfill" not in sys.argv:
+        print("usage: python SessionSearch.py --backfill")
+        return
+    print(f"[SEARCH] {backfill()} row(s) indexed.")
+
+
+if __name__ == "__main__":
+    main()
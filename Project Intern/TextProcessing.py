@@ -2,25 +2,29 @@ import os
 from datetime import datetime
 
 from DBConnector import insert_text_record, get_all_scenarios
-from AnalyzeText import extract_text_from_file, analyze_text_all_in_one, format_language_used
+from AnalyzeText import extract_text_from_file, analyze_text_all_in_one, analyze_texts_batch, format_language_used
+from LongText import needs_chunking, analyze_long_text
 from Utils import detect_file_type, get_file_created_at
+from Config import ENABLE_TEXT_COALESCING
+from Metrics import STAGE_SECONDS, FILES_PROCESSED
 
-def process_single_text_file(file_path: str):
-    """
-    Analyze a single text-based file and insert record into DB.
-    Returns dict for UI usage.
-    """
+# Coalescing: texts up to COALESCE_MAX_CHARS are packed into one Gemini call
+COALESCE_MAX_CHARS = int(os.getenv("COALESCE_MAX_CHARS", "2000"))
+COALESCE_BATCH_SIZE = int(os.getenv("COALESCE_BATCH_SIZE", "10"))
+COALESCE_MAX_BATCH_CHARS = int(os.getenv("COALESCE_MAX_BATCH_CHARS", "16000"))
+
+def _scenario_text() -> str:
     scenarios = get_all_scenarios()
-    scenario_text = "\n".join(
+    return "\n".join(
         f"ID {s['id']}: {s['name']} — {s['description']}"
         for s in scenarios
     )
 
-    text = extract_text_from_file(file_path)
-    result = analyze_text_all_in_one(text, scenario_text)
-
+def _store_text_result(file_path: str, result: dict) -> dict:
+    """Insert one analysed text file into DB. Returns dict for UI usage."""
     if result.get("error"):
         print("[Error] Text analysis failed:", result.get("raw", ""))
+        FILES_PROCESSED.inc(kind="text", outcome="error")
         return {"success": False, "error": result.get("error"), "raw": result.get("raw")}
 
     language_used = format_language_used(result.get("language_used"))
@@ -42,8 +46,10 @@ def process_single_text_file(file_path: str):
         scenario_id=result.get("scenario_id"),
         language_used=language_used,
         file_created_at=file_created_at,
-        uploaded_at=uploaded_at
+        uploaded_at=uploaded_at,
+        model_used=result.get("model_used")
     )
+    FILES_PROCESSED.inc(kind="text", outcome="ok")
 
     return {
         "success": True,
@@ -56,5 +62,90 @@ def process_single_text_file(file_path: str):
         "score": sentiment.get("score"),
         "tone": sentiment.get("tone"),
         "explanation": sentiment.get("explanation"),
-        "scenario_id": result.get("scenario_id")
+        "scenario_id": result.get("scenario_id"),
+        "model_used": result.get("model_used")
     }
+
+def _extract(file_path: str, content_hash: str = None) -> str:
+    with STAGE_SECONDS.time(stage="text_extract"):
+        return extract_text_from_file(file_path, content_hash=content_hash)
+
+def _analyze_text(text: str, scenario_text: str) -> dict:
+    with STAGE_SECONDS.time(stage="text_analyze"):
+        # Long documents: chunked map-reduce (chunks in parallel, cached per chunk)
+        if needs_chunking(text):
+            return analyze_long_text(text, scenario_text)
+        return analyze_text_all_in_one(text, scenario_text)
+
+def process_single_text_file(file_path: str, content_hash: str = None):
+    """
+    Analyze a single text-based file and insert record into DB.
+    content_hash (optional) = sha256 already computed by the caller, e.g. during upload.
+    Returns dict for UI usage.
+    """
+    scenario_text = _scenario_text()
+    text = _extract(file_path, content_hash)
+    return _store_text_result(file_path, _analyze_text(text, scenario_text))
+
+def process_text_files(file_paths, content_hashes: dict = None) -> list:
+    """
+    Analyze many text files, coalescing short ones (<= COALESCE_MAX_CHARS)
+    into shared Gemini calls of up to COALESCE_BATCH_SIZE inputs.
+    Long files still get their own call (or chunked mode).
+    content_hashes (optional) = {file_path: sha256}.
+
+    Returns one UI dict per file, in input order.
+    """
+    content_hashes = content_hashes or {}
+    file_paths = list(file_paths)
+    results = [None] * len(file_paths)
+    scenario_text = _scenario_text()
+
+    texts = {}
+    for i, path in enumerate(file_paths):
+        try:
+            texts[i] = _extract(path, content_hashes.get(path))
+        except Exception as e:
+            FILES_PROCESSED.inc(kind="text", outcome="error")
+            results[i] = {"success": False, "file": path, "error": str(e)}
+
+    short = [i for i in texts if ENABLE_TEXT_COALESCING and 0 < len(texts[i]) <= COALESCE_MAX_CHARS]
+
+    batches = []
+    cur, cur_chars = [], 0
+    for i in short:
+        if cur and (len(cur) >= COALESCE_BATCH_SIZE or cur_chars + len(texts[i]) > COALESCE_MAX_BATCH_CHARS):
+            batches.append(cur)
+            cur, cur_chars = [], 0
+        cur.append(i)
+        cur_chars += len(texts[i])
+    if cur:
+        batches.append(cur)
+
+    for batch in batches:
+        if len(batch) == 1:
+            continue  # no point batching a single input
+        print(f"[BATCH] {len(batch)} short text file(s) in one request")
+        try:
+            with STAGE_SECONDS.time(stage="text_analyze_batch"):
+                by_id = analyze_texts_batch([(i, texts[i]) for i in batch], scenario_text)
+        except Exception as e:
+            print(f"[BATCH ERROR] {e} -> single calls")
+            continue  # results stay None, the loop below analyzes each file on its own
+        for i in batch:
+            if str(i) not in by_id:
+                continue  # missing from the answer: analyzed on its own below
+            try:
+                results[i] = _store_text_result(file_paths[i], by_id[str(i)])
+            except Exception as e:
+                results[i] = {"success": False, "file": file_paths[i], "error": str(e)}
+
+    for i, text in texts.items():
+        if results[i] is not None:
+            continue
+        try:
+            results[i] = _store_text_result(file_paths[i], _analyze_text(text, scenario_text))
+        except Exception as e:
+            results[i] = {"success": False, "file": file_paths[i], "error": str(e)}
+
+    return results
@@ -0,0 +1,379 @@
+"""
+Compressed, out-of-row transcript storage (Migrations.py step 5).
+
+transcript_raw / transcript_english used to sit inline in audio_sessions /
+text_sessions, so every scan of those tables (dashboards, lists, training
+queries) dragged the longest columns along. They now live in
+session_transcripts, one row per session, each text compressed on its own:
+
+- zlib by default; zstd (pip install zstandard) with TRANSCRIPT_CODEC=zstd.
+  The codec is stored per row ("none" when compressing would not save
+  anything, e.g. very short texts), so rows of any codec read back side by side
+- written in the caller's transaction by the DBConnector inserts (put)
+- read lazily, by primary key, only where the text is shown or exported
+  (get / get_many / attach)
+
+The old per-file fallback (transcripts/<file name>.txt, read by the transcript
+page on every request) is folded in by backfill(): a file for a session's
+file name wins over the inline transcript, as it did on that page.
+
+    python TranscriptStore.py --backfill     # copy inline columns + folder files
+    python TranscriptStore.py --report       # stored vs raw bytes, table sizes
+    python TranscriptStore.py --drop-inline  # free the old columns (see below)
+
+Dropping transcript_raw / transcript_english from the session tables cannot be
+undone, so it is an operator step, not a migration: stop every writer still
+on code older than this module, run --backfill, then --drop-inline. It
+refuses while any session row has no session_transcripts row.
+"""
+
+import os
+import re
+import sys
+import zlib
+
+import DBConnector  # module import: DBConnector imports this module too
+import SessionIndex
+
+try:
+    import zstandard
+    _ZSTD_AVAILABLE = True
+except ImportError:
+    _ZSTD_AVAILABLE = False
+
+TRANSCRIPT_CODEC = os.getenv("TRANSCRIPT_CODEC", "zlib").lower()
+TRANSCRIPT_ZLIB_LEVEL = int(os.getenv("TRANSCRIPT_ZLIB_LEVEL", "6"))
+TRANSCRIPT_ZSTD_LEVEL = int(os.getenv("TRANSCRIPT_ZSTD_LEVEL", "9"))
+TRANSCRIPT_BACKFILL_BATCH = int(os.getenv("TRANSCRIPT_BACKFILL_BATCH", "1000"))
+# legacy on-disk transcripts, folded into the table by backfill()
+TRANSCRIPT_FOLDER = os.getenv(
+    "TRANSCRIPT_FOLDER", os.path.join(os.path.dirname(os.path.abspath(__file__)), "transcripts")
+)
+
+if TRANSCRIPT_CODEC == "zstd" and not _ZSTD_AVAILABLE:
+    print("[TRANSCRIPTS] zstandard not installed, writing zlib")
+    TRANSCRIPT_CODEC = "zlib"
+
+_IN_CLAUSE_MAX = 1000
+
+
+def compress(text, codec: str = None):
+    if text is None:
+        return None
+    data = text.encode("utf-8")
+    if (codec or TRANSCRIPT_CODEC) == "zstd":
+        return zstandard.ZstdCompressor(level=TRANSCRIPT_ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, TRANSCRIPT_ZLIB_LEVEL)
+
+
+def decompress(blob, codec: str):
+    if blob is None:
+        return None
+    if codec == "none":
+        data = bytes(blob)
+    elif codec == "zstd":
+        if not _ZSTD_AVAILABLE:
+            raise RuntimeError("Transcript stored with zstd; pip install zstandard")
+        data = zstandard.ZstdDecompressor().decompress(bytes(blob))
+    else:
+        data = zlib.decompress(bytes(blob))
+    return data.decode("utf-8")
+
+
+def decode_pair(codec, raw_z, english_z) -> tuple:
+    """(transcript_raw, transcript_english) from a session_transcripts row."""
+    return decompress(raw_z, codec), decompress(english_z, codec)
+
+
+def _row_values(transcript, translation) -> tuple:
+    """(codec, transcript_raw_z, transcript_english_z, raw_bytes) for an INSERT."""
+    raw = [t.encode("utf-8") if t is not None else None for t in (transcript, translation)]
+    raw_bytes = sum(len(b) for b in raw if b)
+    packed = [compress(transcript), compress(translation)]
+    if sum(len(b) for b in packed if b) >= raw_bytes:
+        return "none", raw[0], raw[1], raw_bytes
+    return TRANSCRIPT_CODEC, packed[0], packed[1], raw_bytes
+
+
+def put(cursor, source_type: str, session_pk, transcript, translation=None) -> None:
+    cursor.execute("""
+        INSERT INTO session_transcripts (
+            source_type, session_pk, codec, transcript_raw_z, transcript_english_z, raw_bytes
+        )
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (source_type, session_pk, *_row_values(transcript, translation)))
+
+
+def get_many(cursor, keys) -> dict:
+    """{(source_type, session_pk): {"transcript_raw", "transcript_english"}} for `keys`."""
+    out = {}
+    for source_type in ("audio", "text"):
+        ids = [int(pk) for st, pk in keys if st == source_type]
+        for i in range(0, len(ids), _IN_CLAUSE_MAX):
+            chunk = ids[i:i + _IN_CLAUSE_MAX]
+            cursor.execute(f"""
+                SELECT session_pk, codec, transcript_raw_z, transcript_english_z
+                FROM session_transcripts
+                WHERE source_type = %s AND session_pk IN ({", ".join(["%s"] * len(chunk))})
+            """, (source_type, *chunk))
+            for r in cursor.fetchall():
+                pk, codec, raw_z, english_z = (
+                    (r["session_pk"], r["codec"], r["transcript_raw_z"], r["transcript_english_z"])
+                    if isinstance(r, dict) else r
+                )
+                raw, english = decode_pair(codec, raw_z, english_z)
+                out[(source_type, pk)] = {"transcript_raw": raw, "transcript_english": english}
+    return out
+
+
+def get(cursor, source_type: str, session_pk) -> dict:
+    empty = {"transcript_raw": None, "transcript_english": None}
+    return get_many(cursor, [(source_type, session_pk)]).get((source_type, int(session_pk)), empty)
+
+
+def attach(cursor, rows: list, pk_alias: str) -> list:
+    """Add transcript_raw / transcript_english to session row dicts (source_type + pk_alias)."""
+    texts = get_many(cursor, [(r["source_type"], r[pk_alias]) for r in rows])
+    for r in rows:
+        r.update(texts.get((r["source_type"], r[pk_alias]), {"transcript_raw": None, "transcript_english": None}))
+    return rows
+
+
+def _first_value(row):
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def _has_inline_columns(cursor, table: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'transcript_raw'
+    """, (table,))
+    return bool(_first_value(cursor.fetchone()))
+
+
+def _has_store(cursor) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'session_transcripts'
+    """)
+    return bool(_first_value(cursor.fetchone()))
+
+
+def session_texts(cursor, source_type: str, batch_size: int):
+    """
+    Batches of (pk, file name, transcript_raw, transcript_english) for every
+    session of `source_type`: from session_transcripts where the session has a
+    row there (everything written since step 5), else from the inline columns
+    while they still exist. For backfills.
+    """
+    table, pk, name_col = SessionIndex.SOURCE_TABLES[source_type]
+    inline = _has_inline_columns(cursor, table)
+    stored = _has_store(cursor)
+    last = 0
+    while True:
+        cursor.execute(f"""
+            SELECT {pk}, {name_col}{", transcript_raw, transcript_english" if inline else ""}
+            FROM {table}
+            WHERE {pk} > %s
+            ORDER BY {pk}
+            LIMIT %s
+        """, (last, int(batch_size)))
+        rows = [tuple(r.values()) if isinstance(r, dict) else tuple(r) for r in cursor.fetchall()]
+        if not rows:
+            return
+        texts = get_many(cursor, [(source_type, r[0]) for r in rows]) if stored else {}
+        out = []
+        for r in rows:
+            t = texts.get((source_type, r[0]))
+            if t:
+                out.append((r[0], r[1], t["transcript_raw"], t["transcript_english"]))
+            else:
+                out.append((r[0], r[1], *(r[2:4] if inline else (None, None))))
+        rows = out
+        yield rows
+        last = rows[-1][0]
+
+
+def _legacy_file_base(file_name: str) -> str:
+    """Name the transcript page used for transcripts/<name>.txt."""
+    safe = re.sub(r'[<>:"/\\|?*]', "_", os.path.basename(file_name or "file"))
+    return os.path.splitext(safe)[0]
+
+
+def _folder_transcripts(folder: str) -> dict:
+    if not os.path.isdir(folder):
+        return {}
+    return {
+        os.path.splitext(name)[0]: os.path.join(folder, name)
+        for name in os.listdir(folder)
+        if name.lower().endswith(".txt")
+    }
+
+
+def _read_file(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError as e:
+        print(f"[TRANSCRIPTS] Cannot read {path}: {e}")
+        return None
+
+
+def backfill(connection=None, batch_size: int = TRANSCRIPT_BACKFILL_BATCH,
+             folder: str = TRANSCRIPT_FOLDER, verbose: bool = True) -> int:
+    """
+    Copy the transcripts of every session missing from session_transcripts
+    (compressed), with transcripts/<file name>.txt taking precedence where one
+    exists. Idempotent, commits per batch. Returns the number of rows visited.
+    """
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    files = _folder_transcripts(folder)
+    cursor = connection.cursor()
+    written = folded = 0
+    try:
+        for source_type in SessionIndex.SOURCE_TABLES:
+            for rows in session_texts(cursor, source_type, batch_size):
+                values = []
+                for pk, file_name, transcript, translation in rows:
+                    path = files.get(_legacy_file_base(file_name))
+                    text = _read_file(path) if path else None
+                    if text:
+                        transcript = text
+                        folded += 1
+                    values.append((source_type, pk, *_row_values(transcript, translation)))
+                cursor.executemany("""
+                    INSERT INTO session_transcripts (
+                        source_type, session_pk, codec, transcript_raw_z, transcript_english_z, raw_bytes
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE session_pk = session_pk
+                """, values)  # rows already stored (by put or a previous run) are kept as they are
+                connection.commit()
+                written += len(values)
+                if verbose:
+                    print(f"[TRANSCRIPTS] {source_type}: stored up to pk={rows[-1][0]}")
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+    if verbose and folded:
+        print(f"[TRANSCRIPTS] {folded} transcript(s) taken from {folder} (files left in place)")
+    return written
+
+
+def drop_inline_columns(connection=None, verbose: bool = True) -> list:
+    """
+    Drop transcript_raw / transcript_english from the session tables once every
+    session row has its session_transcripts row. Returns the tables altered.
+    """
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    altered = []
+    try:
+        tables = []
+        for source_type, (table, pk, _) in SessionIndex.SOURCE_TABLES.items():
+            if not _has_inline_columns(cursor, table):
+                continue
+            cursor.execute(f"""
+                SELECT COUNT(*)
+                FROM {table} s
+                LEFT JOIN session_transcripts st ON st.source_type = %s AND st.session_pk = s.{pk}
+                WHERE st.session_pk IS NULL
+            """, (source_type,))
+            missing = _first_value(cursor.fetchone())
+            if missing:
+                raise RuntimeError(
+                    f"{missing} {table} row(s) have no session_transcripts row: "
+                    "stop old writers, run --backfill, then retry"
+                )
+            tables.append(table)
+
+        for table in tables:
+            if verbose:
+                print(f"[TRANSCRIPTS] dropping inline transcript columns from {table}")
+            # INPLACE rebuilds the table so the space is actually freed (INSTANT drops don't)
+            cursor.execute(f"""
+                ALTER TABLE {table}
+                    DROP COLUMN transcript_raw,
+                    DROP COLUMN transcript_english,
+                    ALGORITHM=INPLACE
+            """)
+            altered.append(table)
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+    return altered
+
+
+def storage_report(connection=None) -> dict:
+    """Raw vs stored transcript bytes, plus on-disk size of the session tables."""
+    own = connection is None
+    connection = connection or DBConnector.get_db_connection()
+    if not connection:
+        raise RuntimeError("Cannot connect to DB")
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT codec, COUNT(*), SUM(raw_bytes),
+                   SUM(COALESCE(LENGTH(transcript_raw_z), 0) + COALESCE(LENGTH(transcript_english_z), 0))
+            FROM session_transcripts
+            GROUP BY codec
+        """)
+        codecs = {
+            codec: {"rows": n, "raw_bytes": int(raw or 0), "stored_bytes": int(stored or 0)}
+            for codec, n, raw, stored in cursor.fetchall()
+        }
+        cursor.execute("""
+            SELECT TABLE_NAME, DATA_LENGTH + INDEX_LENGTH
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+              AND TABLE_NAME IN ('audio_sessions', 'text_sessions', 'session_transcripts')
+        """)
+        tables = {name: int(size or 0) for name, size in cursor.fetchall()}
+    finally:
+        cursor.close()
+        if own:
+            connection.close()
+
+    raw = sum(c["raw_bytes"] for c in codecs.values())
+    stored = sum(c["stored_bytes"] for c in codecs.values())
+    return {
+        "codecs": codecs,
+        "raw_bytes": raw,
+        "stored_bytes": stored,
+        "ratio": round(raw / stored, 2) if stored else None,
+        "table_bytes": tables,
+    }
+
+
+def main():
+    if "--backfill" in sys.argv:
+        print(f"[TRANSCRIPTS] {backfill()} row(s) checked.")
+    elif "--drop-inline" in sys.argv:
+        altered = drop_inline_columns()
+        print(f"[TRANSCRIPTS] inline columns dropped: {', '.join(altered) or 'nothing to do'}")
+    elif "--report" in sys.argv:
+        report = storage_report()
+        for codec, c in report["codecs"].items():
+            print(f"[TRANSCRIPTS] {codec}: {c['rows']} row(s), {c['raw_bytes']} -> {c['stored_bytes']} bytes")
+        print(f"[TRANSCRIPTS] compression ratio: {report['ratio']}")
+        for table, size in sorted(report["table_bytes"].items()):
+            print(f"[TRANSCRIPTS] {table}: {size / 1024 / 1024:.1f} MB (data + indexes)")
+    else:
+        print("usage: python TranscriptStore.py --backfill | --report | --drop-inline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import re
+import uuid
+import shutil
+import hashlib
+import tempfile
+
+from flask import Request
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", str(1024 * 1024)))
+
+
+class HashingUploadFile:
+    """
+    Target file for werkzeug's multipart parser.
+
+    Every chunk the parser writes goes straight to a temp file on disk and
+    into a running SHA-256, so an upload never sits in memory as one bytes
+    object and the content hash is ready the moment parsing ends.
+    If the upload is never kept (request aborted, file skipped), the temp
+    file is removed on close.
+    """
+
+    def __init__(self, tmp_dir: str):
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+        self._f = os.fdopen(fd, "w+b")
+        self._sha = hashlib.sha256()
+        self.size = 0
+        self._kept = False
+
+    def write(self, data) -> int:
+        self._sha.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def hexdigest(self) -> str:
+        return self._sha.hexdigest()
+
+    def keep_as(self, dest_path: str) -> None:
+        self._f.close()
+        # rename when on the same filesystem, copy otherwise
+        shutil.move(self.path, dest_path)
+        self.path = dest_path
+        self._kept = True
+
+    def close(self) -> None:
+        self._f.close()
+        if not self._kept:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __getattr__(self, name):
+        # read / seek / tell / flush ... from the real file
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+
+class IngestRequest(Request):
+    """
+    Flask request class that spools every uploaded file through HashingUploadFile.
+    Point ingest_tmp_dir at the upload folder's filesystem so keeping a file is a rename.
+    """
+
+    ingest_tmp_dir = os.path.join(tempfile.gettempdir(), "sentiment_uploads")
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUploadFile(self.ingest_tmp_dir)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[<>:"/\\|?*]', "_", os.path.basename(name or "file"))
+
+
+def ingest_upload(file_storage, dest_dir: str) -> dict:
+    """
+    Persist one uploaded file into dest_dir and return
+      {"path", "sha256", "size", "file_name"}
+    for the processing pipeline.
+
+    With IngestRequest the file is already on disk and hashed, so this is a
+    rename. Any other stream is copied in INGEST_CHUNK_SIZE chunks.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+
+    file_name = _safe_name(file_storage.filename)
+    dest_path = os.path.join(dest_dir, f"{uuid.uuid4().hex[:12]}_{file_name}")
+
+    stream = file_storage.stream
+    if isinstance(stream, HashingUploadFile) and not stream._kept:
+        stream.keep_as(dest_path)
+        return {"path": dest_path, "sha256": stream.hexdigest(), "size": stream.size, "file_name": file_name}
+
+    sha = hashlib.sha256()
+    size = 0
+    with open(dest_path, "wb") as out:
+        while True:
+            chunk = stream.read(INGEST_CHUNK_SIZE)
+            if not chunk:
+                break
+            sha.update(chunk)
+            size += len(chunk)
+            out.write(chunk)
+
+    return {"path": dest_path, "sha256": sha.hexdigest(), "size": size, "file_name": file_name}
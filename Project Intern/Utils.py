@@ -1,4 +1,5 @@
 import os
+import hashlib
 from datetime import datetime
 
 AUDIO_EXTS = {".wav", ".mp3", ".m4a", ".aac", ".ogg", ".flac"}
@@ -22,3 +23,12 @@ def get_file_created_at(path: str):
         return datetime.fromtimestamp(ts)
     except Exception:
         return None
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Content hash of a file, read in chunks (constant memory)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+
+FRAME_SECONDS = 0.03
+
+# Non-speech longer than VAD_MIN_GAP_SECONDS is cut down to VAD_KEEP_GAP_SECONDS
+VAD_MIN_GAP_SECONDS = float(os.getenv("VAD_MIN_GAP_SECONDS", "1.5"))
+VAD_KEEP_GAP_SECONDS = float(os.getenv("VAD_KEEP_GAP_SECONDS", "0.4"))
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))
+VAD_PAD_SECONDS = float(os.getenv("VAD_PAD_SECONDS", "0.3"))
+
+# Hold music / tones: loud but flat energy (speech rises and falls with syllables)
+HOLD_MUSIC_MAX_STD_DB = float(os.getenv("HOLD_MUSIC_MAX_STD_DB", "3.0"))
+HOLD_MUSIC_MIN_SECONDS = float(os.getenv("HOLD_MUSIC_MIN_SECONDS", "5.0"))
+
+_ABS_FLOOR_DB = -55.0
+
+
+def _runs(mask):
+    """[(start, end), ...] of consecutive True frames."""
+    if not len(mask):
+        return []
+    m = np.concatenate([[False], mask, [False]]).astype(np.int8)
+    d = np.diff(m)
+    return list(zip(np.flatnonzero(d == 1), np.flatnonzero(d == -1)))
+
+
+def frame_energy_db(samples, sample_rate: int):
+    frame = max(1, int(sample_rate * FRAME_SECONDS))
+    n = len(samples) // frame
+    x = samples[: n * frame].astype(np.float32).reshape(n, frame) / 32768.0
+    return 10.0 * np.log10(np.mean(x * x, axis=1) + 1e-10), frame
+
+
+def detect_speech(samples, sample_rate: int):
+    """Per-frame speech mask (energy gate, hold-music rejection, padding). Returns (mask, frame_len)."""
+    db, frame = frame_energy_db(samples, sample_rate)
+    if not len(db):
+        return np.zeros(0, dtype=bool), frame
+
+    noise_floor = np.percentile(db, 10)
+    active = db > max(noise_floor + VAD_MARGIN_DB, _ABS_FLOOR_DB)
+
+    # hold music: long active runs whose 1 s energy spread stays flat
+    win = max(1, int(1.0 / FRAME_SECONDS))
+    min_music = int(HOLD_MUSIC_MIN_SECONDS / FRAME_SECONDS)
+    for start, end in _runs(active):
+        if end - start < min_music:
+            continue
+        seg = db[start:end]
+        n_win = len(seg) // win
+        if n_win == 0:
+            continue
+        spread = seg[: n_win * win].reshape(n_win, win).std(axis=1)
+        flat = np.repeat(spread < HOLD_MUSIC_MAX_STD_DB, win)
+        for fs, fe in _runs(flat):
+            if fe - fs >= min_music:
+                active[start + fs:start + fe] = False
+
+    # pad speech so word onsets / tails are not clipped
+    pad = int(VAD_PAD_SECONDS / FRAME_SECONDS)
+    if pad:
+        active = np.convolve(active.astype(np.int8), np.ones(2 * pad + 1, dtype=np.int8), mode="same") > 0
+
+    return active, frame
+
+
+def trim_silence(samples, sample_rate: int):
+    """
+    Drop long non-speech stretches (silence, hold music), keeping a short pause
+    in their place so speaker turns still read naturally.
+
+    Returns (trimmed_samples, timestamp_map) where timestamp_map is a list of
+      {"trimmed_start", "original_start", "duration"}  (seconds)
+    for every kept piece. Use to_original_time() to map back.
+    """
+    mask, frame = detect_speech(samples, sample_rate)
+    total = len(samples)
+
+    min_gap = int(VAD_MIN_GAP_SECONDS * sample_rate)
+    half_keep = int(VAD_KEEP_GAP_SECONDS * sample_rate / 2)
+
+    # cut ranges in sample units
+    cuts = []
+    for fs, fe in _runs(~mask):
+        s, e = fs * frame, (total if fe == len(mask) else fe * frame)
+        if e - s < min_gap:
+            continue
+        cuts.append((s + (0 if s == 0 else half_keep), e - (0 if e == total else half_keep)))
+
+    kept = total - sum(ce - cs for cs, ce in cuts)
+    if not cuts or kept < sample_rate:
+        # nothing to cut, or the gate found (almost) no speech -> don't trust it, send everything
+        return samples, [{"trimmed_start": 0.0, "original_start": 0.0, "duration": float(total / sample_rate)}]
+
+    pieces = []
+    timestamp_map = []
+    pos = 0
+    out_len = 0
+    for cs, ce in cuts + [(total, total)]:
+        cs, ce = int(cs), int(ce)
+        if cs > pos:
+            pieces.append(samples[pos:cs])
+            timestamp_map.append({
+                "trimmed_start": float(out_len / sample_rate),
+                "original_start": float(pos / sample_rate),
+                "duration": float((cs - pos) / sample_rate),
+            })
+            out_len += cs - pos
+        pos = ce
+
+    trimmed = np.concatenate(pieces) if pieces else samples[:0]
+    return trimmed, timestamp_map
+
+
+def to_original_time(t: float, timestamp_map) -> float:
+    """Map a time in the trimmed audio back to the original recording."""
+    if not timestamp_map:
+        return t
+    for seg in timestamp_map:
+        if t < seg["trimmed_start"] + seg["duration"]:
+            return seg["original_start"] + max(0.0, t - seg["trimmed_start"])
+    last = timestamp_map[-1]
+    return last["original_start"] + last["duration"]
@@ -0,0 +1,223 @@
+"""
+Ingest worker: claims files from the shared ingest_jobs table (JobQueue.py)
+and runs the normal pipeline on them. Start as many as you like, on as many
+machines as you like, against the same MySQL database.
+
+    python Worker.py                              # work until stopped
+    python Worker.py --drain                      # exit when the queue is empty
+    python Worker.py --enqueue /shared/inbox      # queue a folder (or file / ZIP)
+    python Worker.py --status
+
+ZIP jobs are extracted to JOB_SPOOL_DIR (shared storage) and each member
+becomes its own job, so members spread over the fleet. A ZIP's spool folder
+is removed once all its member jobs are done or failed for good.
+"""
+
+import os
+import sys
+import time
+import socket
+import shutil
+import argparse
+import threading
+from pathlib import Path
+
+import JobQueue
+from AudioProcessing import process_single_audio_file
+from DBConnector import ingest_job_context
+from Manifest import Manifest
+from Metrics import INGEST_JOBS
+from Migrations import apply_migrations
+from Scheduler import PRIORITIES, PRIORITY_BULK, job_context
+from TextProcessing import process_text_files, COALESCE_BATCH_SIZE
+from Utils import AUDIO_EXTS, TEXT_EXTS, file_sha256
+from ZipUtils import safe_extract_zip
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", os.path.join(BASE_DIR, "uploaded_files", "job_spool"))
+WORKER_IDLE_SECONDS = float(os.getenv("WORKER_IDLE_SECONDS", "5"))
+WORKER_REAP_SECONDS = float(os.getenv("WORKER_REAP_SECONDS", "60"))
+
+
+class _Heartbeat(threading.Thread):
+    """Keeps the leases of the jobs in hand alive while the pipeline runs."""
+
+    def __init__(self, jobs: list):
+        super().__init__(daemon=True)
+        self.jobs = jobs
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = max(5, JobQueue.JOB_LEASE_SECONDS / 3)
+        while not self._stop_event.wait(interval):
+            owned = JobQueue.heartbeat(self.jobs)
+            if owned < len(self.jobs):
+                print(f"[WORKER] {len(self.jobs) - owned} job lease(s) lost; their results will not be stored")
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _context_for(job: dict):
+    return job_context(PRIORITIES[job["priority_rank"]], job.get("username") or "worker")
+
+
+def _clean_spool(*, parent_ids=None, content_hashes=None):
+    """Remove the spool folders of ZIPs whose member jobs have all finished."""
+    parent_ids = sorted({p for p in parent_ids or [] if p})
+    if not parent_ids and not content_hashes:
+        return
+    for h in JobQueue.finished_zips(job_ids=parent_ids or None, content_hashes=content_hashes):
+        dest = os.path.join(JOB_SPOOL_DIR, h)
+        if os.path.isdir(dest):
+            shutil.rmtree(dest, ignore_errors=True)
+            print(f"[WORKER] spool {h[:12]} removed (all member jobs finished)")
+
+
+def _finish(jobs: list, results: list):
+    """Jobs not marked done by the DB insert (analysis failed / row not stored) go back for retry."""
+    by_id = {j["job_id"]: r for j, r in zip(jobs, results)}
+    unfinished = {j["job_id"] for j in JobQueue.still_running(jobs)}
+    for job in jobs:
+        if job["job_id"] in unfinished:
+            r = by_id.get(job["job_id"]) or {}
+            JobQueue.fail(job, r.get("error") or "no session row stored")
+            INGEST_JOBS.inc(kind=job["file_kind"], outcome="retry")
+        else:
+            INGEST_JOBS.inc(kind=job["file_kind"], outcome="done")
+    _clean_spool(parent_ids=[j.get("parent_job_id") for j in jobs])
+
+
+def _run_texts(jobs: list):
+    paths = [j["file_path"] for j in jobs]
+    fences = {j["file_path"]: (j["job_id"], j["fence"]) for j in jobs}
+    with _context_for(jobs[0]), ingest_job_context(fences):
+        results = process_text_files(paths, {j["file_path"]: j["content_hash"] for j in jobs})
+    _finish(jobs, results)
+
+
+def _run_audio(job: dict):
+    with _context_for(job), ingest_job_context({job["file_path"]: (job["job_id"], job["fence"])}):
+        result = process_single_audio_file(job["file_path"])
+    _finish([job], [result])
+
+
+def _run_zip(job: dict):
+    dest = os.path.join(JOB_SPOOL_DIR, job["content_hash"])
+    os.makedirs(dest, exist_ok=True)
+    members = safe_extract_zip(job["file_path"], dest)
+    queued = 0
+    for path in members:
+        if JobQueue.enqueue_file(
+            path,
+            priority=PRIORITIES[job["priority_rank"]],
+            username=job.get("username"),
+            parent_job_id=job["job_id"],
+        ):
+            queued += 1
+    print(f"[WORKER] ZIP {os.path.basename(job['file_path'])}: {queued}/{len(members)} member job(s) queued")
+    JobQueue.complete(job, "zip")
+    INGEST_JOBS.inc(kind="zip", outcome="done")
+    _clean_spool(parent_ids=[job["job_id"]])  # nothing new queued (all duplicates) -> not needed
+
+
+def work_once(worker_id: str) -> bool:
+    """Claim and run one unit of work. False when nothing was runnable."""
+    jobs = JobQueue.claim(worker_id, limit=1)
+    if not jobs:
+        return False
+
+    first = jobs[0]
+    if first["file_kind"] == "text" and COALESCE_BATCH_SIZE > 1:
+        # fill the batch with more text jobs of the same class so short ones share a Gemini call
+        jobs += JobQueue.claim(worker_id, limit=COALESCE_BATCH_SIZE - 1, kind="text", rank=first["priority_rank"])
+
+    beat = _Heartbeat(jobs)
+    beat.start()
+    try:
+        if first["file_kind"] == "text":
+            _run_texts(jobs)
+        elif first["file_kind"] == "zip":
+            _run_zip(first)
+        else:
+            _run_audio(first)
+    except Exception as e:
+        print(f"[WORKER ERROR] job(s) {[j['job_id'] for j in jobs]}: {e}")
+        for job in jobs:
+            JobQueue.fail(job, str(e))
+            INGEST_JOBS.inc(kind=job["file_kind"], outcome="retry")
+        _clean_spool(parent_ids=[j.get("parent_job_id") for j in jobs])
+    finally:
+        beat.stop()
+    return True
+
+
+def run_worker(worker_id: str = None, drain: bool = False):
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    apply_migrations(verbose=False)
+    print(f"[WORKER] {worker_id} started")
+
+    last_reap = 0.0
+    while True:
+        if time.monotonic() - last_reap > WORKER_REAP_SECONDS:
+            reaped = JobQueue.reap_expired()
+            if reaped:
+                print(f"[WORKER] {reaped} expired lease(s) returned to the queue")
+            # members can also fail for good through an expired lease
+            if os.path.isdir(JOB_SPOOL_DIR):
+                _clean_spool(content_hashes=os.listdir(JOB_SPOOL_DIR))
+            last_reap = time.monotonic()
+
+        if work_once(worker_id):
+            continue
+        if drain:
+            print(f"[WORKER] {worker_id}: queue empty, exiting. {JobQueue.queue_summary()}")
+            return
+        time.sleep(WORKER_IDLE_SECONDS)
+
+
+def enqueue_path(path: str, priority: str = PRIORITY_BULK, username: str = None) -> int:
+    """Queue a file, ZIP or whole folder. Files already processed by local folder runs are skipped."""
+    apply_migrations(verbose=False)
+    manifest = Manifest()
+    p = Path(path)
+    files = [p] if p.is_file() else [f for f in p.rglob("*") if f.is_file()]
+
+    queued = 0
+    for f in files:
+        if f.suffix.lower() not in AUDIO_EXTS | TEXT_EXTS | {".zip"}:
+            continue
+        h = file_sha256(str(f))
+        if manifest.is_done(h):
+            continue
+        if JobQueue.enqueue_file(str(f), priority=priority, username=username, content_hash=h):
+            queued += 1
+    print(f"[QUEUE] {queued} new job(s) from {path}")
+    return queued
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ingest worker (shared MySQL job table)")
+    ap.add_argument("--enqueue", metavar="PATH", help="queue a file, ZIP or folder and exit")
+    ap.add_argument("--priority", choices=PRIORITIES, default=PRIORITY_BULK)
+    ap.add_argument("--user", help="owner of enqueued jobs (fair-share key)")
+    ap.add_argument("--drain", action="store_true", help="exit when no job is runnable")
+    ap.add_argument("--worker-id")
+    ap.add_argument("--status", action="store_true")
+    args = ap.parse_args()
+
+    if args.status:
+        print(JobQueue.queue_summary())
+    elif args.enqueue:
+        enqueue_path(args.enqueue, args.priority, args.user)
+    else:
+        try:
+            run_worker(args.worker_id, args.drain)
+        except KeyboardInterrupt:
+            print("\n[WORKER] Stopped.")
+            sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
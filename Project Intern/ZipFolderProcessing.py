@@ -4,19 +4,17 @@ import tempfile
 from ZipUtils import safe_extract_zip
 from Utils import detect_file_type
 from AudioProcessing import process_single_audio_file
-from TextProcessing import process_single_text_file
+from TextProcessing import process_text_files
 
 
 def process_zip_upload(zip_path: str) -> dict:
     """
     Extract ZIP LOCALLY (no Gemini)
-    Then process extracted files one by one.
+    Then process extracted files: short texts coalesced into shared calls, audio one by one.
     """
     if not os.path.exists(zip_path):
         return {"success": False, "error": f"ZIP not found: {zip_path}"}
 
-    processed = 0
-    failed = 0
     results = []
 
     with tempfile.TemporaryDirectory() as tmp:
@@ -25,34 +23,25 @@ def process_zip_upload(zip_path: str) -> dict:
         if not extracted_files:
             return {"success": False, "error": "No supported files inside ZIP"}
 
-        # Sort: text first then audio (optional)
-        def sort_key(path: str):
-            t = detect_file_type(path)
-            return 0 if t == "text" else 1
+        # Text first (short ones coalesced into shared Gemini calls), then audio
+        text_files = [p for p in extracted_files if detect_file_type(p) == "text"]
+        audio_files = [p for p in extracted_files if detect_file_type(p) == "audio"]
 
-        extracted_files.sort(key=sort_key)
-
-        for file_path in extracted_files:
+        if text_files:
             try:
-                ftype = detect_file_type(file_path)
-
-                if ftype == "audio":
-                    r = process_single_audio_file(file_path)
-                elif ftype == "text":
-                    r = process_single_text_file(file_path)
-                else:
-                    continue
-
-                results.append(r)
-                if r.get("success"):
-                    processed += 1
-                else:
-                    failed += 1
+                results.extend(process_text_files(text_files))
+            except Exception as e:
+                results.extend({"success": False, "file": p, "error": str(e)} for p in text_files)
 
+        for file_path in audio_files:
+            try:
+                results.append(process_single_audio_file(file_path))
             except Exception as e:
-                failed += 1
                 results.append({"success": False, "file": file_path, "error": str(e)})
 
+        processed = sum(1 for r in results if r.get("success"))
+        failed = len(results) - processed
+
     return {
         "success": True,
         "processed": processed,
@@ -1,22 +1,42 @@
 import os
+import hashlib
 import zipfile
 
 SUPPORTED_IN_ZIP = (".wav", ".mp3", ".m4a", ".pdf", ".docx", ".txt")
 
-def safe_extract_zip(zip_path: str, extract_to: str) -> list[str]:
+def _is_supported_member(member) -> bool:
+    return not member.is_dir() and member.filename.lower().endswith(SUPPORTED_IN_ZIP)
+
+
+def zip_member_hashes(zip_path: str, chunk_size: int = 1024 * 1024) -> dict:
+    """sha256 of each supported member, streamed (nothing written to disk). {member name: hash}"""
+    out = {}
+    with zipfile.ZipFile(zip_path, "r") as z:
+        for member in z.infolist():
+            if not _is_supported_member(member):
+                continue
+            h = hashlib.sha256()
+            with z.open(member) as src:
+                for chunk in iter(lambda: src.read(chunk_size), b""):
+                    h.update(chunk)
+            out[member.filename] = h.hexdigest()
+    return out
+
+
+def safe_extract_zip(zip_path: str, extract_to: str, members=None) -> list[str]:
     """
     Extract zip safely (avoid zip-slip). Returns list of extracted file paths (supported only).
+    members (optional) = only extract these member names.
     """
     extracted_files = []
 
     with zipfile.ZipFile(zip_path, "r") as z:
         for member in z.infolist():
-            if member.is_dir():
+            if not _is_supported_member(member):
                 continue
 
             name = member.filename
-
-            if not name.lower().endswith(SUPPORTED_IN_ZIP):
+            if members is not None and name not in members:
                 continue
 
             dest_path = os.path.abspath(os.path.join(extract_to, name))
@@ -4,7 +4,6 @@ import json
 import uuid
 from datetime import datetime
 from functools import wraps
-from io import BytesIO
 from threading import Thread, Lock
 
 from dotenv import load_dotenv
@@ -24,13 +23,23 @@ from flask import (
     jsonify,
 )
 
+from markupsafe import Markup
 from werkzeug.security import check_password_hash
 
-from docx import Document
-from pypdf import PdfReader
+from UploadIngest import IngestRequest, ingest_upload
+from Utils import AUDIO_EXTS, TEXT_EXTS
+import Metrics
+from Scheduler import job_context, PRIORITY_INTERACTIVE, PRIORITY_ZIP
 
 # Your existing DB helper (DO NOT create db.py)
 from DBConnector import get_db_connection
+from Migrations import ensure_schema
+import SessionIndex
+import SessionSearch
+import SessionExport
+import SessionArchive
+import TranscriptStore
+from EventBus import bus, notifications, sse_stream
 
 # Optional push: if pywebpush not installed, app still runs.
 try:
@@ -40,8 +49,10 @@ except Exception:  # pragma: no cover
     WebPushException = Exception
 
 # Dashboard aggregation helper (we provide this file in /services/dashboard_service.py)
-from Services.dashboard_service import build_dashboard_data
+from Services.dashboard_service import build_dashboard_data, dashboard_since
 from ZipFolderProcessing import process_zip_upload
+from AudioProcessing import process_single_audio_file
+from TextProcessing import process_text_files
 
 
 
@@ -59,11 +70,9 @@ TEMPLATE_ROOT = os.path.join(BASE_DIR, "Interface")
 
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploaded_files")
-TRANSCRIPT_FOLDER = os.path.join(BASE_DIR, "transcripts")
 
 os.makedirs(STATIC_DIR, exist_ok=True)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(TRANSCRIPT_FOLDER, exist_ok=True)
 
 app = Flask(
     __name__,
@@ -72,6 +81,16 @@ app = Flask(
 )
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key-change-me")
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 ** 3)))
+
+# Uploaded files are streamed to disk + hashed while the request is parsed
+# (bounded memory per upload). Spool next to UPLOAD_FOLDER so keeping a file is a rename.
+IngestRequest.ingest_tmp_dir = os.path.join(UPLOAD_FOLDER, ".incoming")
+app.request_class = IngestRequest
+
+# Bring the schema up to date however the app is started (python app.py, flask run,
+# gunicorn app:app): the named lock in Migrations keeps concurrent workers from racing.
+ensure_schema()
 
 
 # ========================
@@ -153,10 +172,6 @@ def send_push_to_user(username: str, title: str, body: str, url: str = "/sentime
 # ========================
 # Small utilities
 # ========================
-def safe_filename(name: str) -> str:
-    return re.sub(r'[<>:"/\\|?*]', "_", os.path.basename(name or "file"))
-
-
 def parse_date(d: str):
     if not d:
         return None
@@ -167,16 +182,7 @@ def parse_date(d: str):
 
 
 def detect_file_type(filename: str) -> str:
-    name = (filename or "").lower()
-    if name.endswith(".wav"):
-        return "wav"
-    if name.endswith(".pdf"):
-        return "pdf"
-    if name.endswith(".docx"):
-        return "docx"
-    if name.endswith(".txt"):
-        return "txt"
-    return "unknown"
+    return SessionIndex.ext_file_type(filename)
 
 
 def format_dt_parts(dt):
@@ -203,27 +209,6 @@ def normalize_sentiment(label: str) -> str:
     return ""
 
 
-# ========================
-# Text extraction for docs
-# ========================
-def extract_text_from_docx(file_storage) -> str:
-    data = file_storage.read()
-    doc = Document(BytesIO(data))
-    parts = [p.text.strip() for p in doc.paragraphs if p.text and p.text.strip()]
-    return "\n".join(parts).strip()
-
-
-def extract_text_from_pdf(file_storage) -> str:
-    data = file_storage.read()
-    reader = PdfReader(BytesIO(data))
-    parts = []
-    for page in reader.pages:
-        t = page.extract_text() or ""
-        if t.strip():
-            parts.append(t)
-    return "\n".join(parts).strip()
-
-
 # ========================
 # Auth decorators
 # ========================
@@ -319,52 +304,88 @@ def fetch_user(username: str):
         conn.close()
 
 
+_AUDIO_SELECT = """
+    SELECT
+        a.session_id AS id,
+        'audio' AS source_type,
+        a.audio_filename AS file_name,
+        a.file_type,
+        a.sentiment_label,
+        a.sentiment_score,
+        a.sentiment_tone,
+        a.sentiment_explanation,
+        a.scenario_id,
+        a.uploaded_at,
+        a.human_sentiment_label,
+        a.human_updated_at
+    FROM audio_sessions a
+"""
+
+_TEXT_SELECT = """
+    SELECT
+        t.id AS id,
+        'text' AS source_type,
+        t.text_filename AS file_name,
+        t.file_type,
+        t.sentiment_label,
+        t.sentiment_score,
+        t.sentiment_tone,
+        t.sentiment_explanation,
+        t.scenario_id,
+        t.uploaded_at,
+        t.human_sentiment_label,
+        t.human_updated_at
+    FROM text_sessions t
+"""
+
+
+def fetch_sessions_page(limit: int, offset: int = 0, count: bool = False, q: str = "", **filters):
+    """
+    (total or None, rows) newest first, or best match first when q is given
+    (full-text over file name + transcripts, see SessionSearch.py). Filters / sort /
+    paging run on the index tables; only the page's rows are read from the session tables.
+    Rows carry transcripts (for snippets) only when q is given.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return (0 if count else None), []
+    cur = conn.cursor(dictionary=True)
+    try:
+        if q:
+            total, keys = SessionSearch.search(cur, q, limit=limit, offset=offset, count=count, **filters)
+        else:
+            total, keys = SessionIndex.query_keys(cur, limit=limit, offset=offset, count=count, **filters)
+        rows = SessionIndex.fetch_by_keys(cur, keys, _AUDIO_SELECT, _TEXT_SELECT, "id")
+        if q:
+            TranscriptStore.attach(cur, rows, "id")
+        return total, rows
+    finally:
+        cur.close()
+        conn.close()
+
+
 def fetch_sessions_for_ui(limit: int = 2000):
+    return fetch_sessions_page(limit)[1]
+
+
+def fetch_dashboard_rows(period: str = "", limit: int = 5000):
+    """Rows for build_dashboard_data, bounded to the months it shows (prunes monthly partitions)."""
+    return fetch_sessions_page(limit, start=dashboard_since(period))[1]
+
+
+def fetch_session(source_type: str, record_id: int, transcripts: bool = False):
     conn = get_db_connection()
     if not conn:
-        return []
+        return None
     cur = conn.cursor(dictionary=True)
     try:
-        cur.execute(
-            f"""
-            SELECT
-                a.session_id AS id,
-                'audio' AS source_type,
-                a.audio_filename AS file_name,
-                a.file_type,
-                a.transcript_raw,
-                a.transcript_english,
-                a.sentiment_label,
-                a.sentiment_score,
-                a.sentiment_tone,
-                a.sentiment_explanation,
-                a.scenario_id,
-                a.uploaded_at,
-                a.human_sentiment_label,
-                a.human_updated_at
-            FROM audio_sessions a
-            UNION ALL
-            SELECT
-                t.id AS id,
-                'text' AS source_type,
-                t.text_filename AS file_name,
-                t.file_type,
-                t.transcript_raw,
-                t.transcript_english,
-                t.sentiment_label,
-                t.sentiment_score,
-                t.sentiment_tone,
-                t.sentiment_explanation,
-                t.scenario_id,
-                t.uploaded_at,
-                t.human_sentiment_label,
-                t.human_updated_at
-            FROM text_sessions t
-            ORDER BY uploaded_at DESC
-            LIMIT {int(limit)}
-            """
-        )
-        return cur.fetchall()
+        rows = SessionIndex.fetch_by_keys(cur, [(source_type, int(record_id))], _AUDIO_SELECT, _TEXT_SELECT, "id")
+        if not rows:
+            # past the retention window: read-only copy in session_archive (SessionArchive.py)
+            return SessionArchive.fetch(cur, source_type, record_id)
+        if transcripts:
+            TranscriptStore.attach(cur, rows, "id")
+        return rows[0]
     finally:
         cur.close()
         conn.close()
@@ -380,6 +401,7 @@ def update_human_label(source_type: str, record_id: int, label: str) -> None:
         raise RuntimeError("DB connection failed")
 
     cur = conn.cursor()
+    updated_at = datetime.now()
     try:
         if source_type == "audio":
             cur.execute(
@@ -388,7 +410,7 @@ def update_human_label(source_type: str, record_id: int, label: str) -> None:
                 SET human_sentiment_label=%s, human_updated_at=%s
                 WHERE session_id=%s
                 """,
-                (label, datetime.now(), int(record_id)),
+                (label, updated_at, int(record_id)),
             )
         else:
             cur.execute(
@@ -397,8 +419,15 @@ def update_human_label(source_type: str, record_id: int, label: str) -> None:
                 SET human_sentiment_label=%s, human_updated_at=%s
                 WHERE id=%s
                 """,
-                (label, datetime.now(), int(record_id)),
+                (label, updated_at, int(record_id)),
             )
+        source_type = "audio" if source_type == "audio" else "text"
+        if cur.rowcount == 0:
+            # no hot row changed: either the label was already set, or the
+            # session is past the retention window and lives in session_archive
+            SessionArchive.update_human_label(cur, source_type, record_id, label, updated_at)
+        else:
+            SessionIndex.index_human_label(cur, source_type, record_id, label)
         conn.commit()
     finally:
         cur.close()
@@ -447,6 +476,20 @@ def debug_subs():
     )
 
 
+# ========================
+# Prometheus metrics
+# ========================
+# Optional: set METRICS_TOKEN and scrape with "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+@app.get("/metrics")
+def metrics():
+    if METRICS_TOKEN and request.headers.get("Authorization", "") != f"Bearer {METRICS_TOKEN}":
+        abort(401)
+    return Response(Metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 # ========================
 # Root redirect
 # ========================
@@ -546,7 +589,7 @@ def admin_dashboard():
     source_type = request.args.get("source_type", "")  # audio/text/""
 
     dashboard_data = build_dashboard_data(
-        rows=fetch_sessions_for_ui(limit=5000),
+        rows=fetch_dashboard_rows(period),
         period=period,
         source_type=source_type,
     )
@@ -572,7 +615,7 @@ def dashboard():
     source_type = request.args.get("source_type", "")
 
     dashboard_data = build_dashboard_data(
-        rows=fetch_sessions_for_ui(limit=5000),
+        rows=fetch_dashboard_rows(period),
         period=period,
         source_type=source_type,
     )
@@ -600,76 +643,57 @@ def sentiment_result():
     sentiment = request.args.get("sentiment", "")
     start = parse_date(request.args.get("start_date", ""))
     end = parse_date(request.args.get("end_date", ""))
-    q = (request.args.get("q", "") or "").strip().lower()
+    q = (request.args.get("q", "") or "").strip()
 
-    page = int(request.args.get("page", 1))
+    page = max(1, int(request.args.get("page", 1)))
     per_page = 10
 
-    rows = fetch_sessions_for_ui(limit=5000)
-    filtered = []
+    filters = dict(file_type=file_type, sentiment=sentiment, start=start, end=end, q=q)
+    total, rows = fetch_sessions_page(per_page, (page - 1) * per_page, count=True, **filters)
+    total_pages = max(1, (total + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+        _, rows = fetch_sessions_page(per_page, (page - 1) * per_page, **filters)
 
+    page_rows = []
     for r in rows:
         fname = r.get("file_name") or ""
-        ftype = detect_file_type(fname)
         dt = r.get("uploaded_at")
 
-        if file_type and ftype != file_type:
-            continue
-
-        if sentiment and str(r.get("sentiment_label") or "").strip().lower() != sentiment.strip().lower():
-            continue
-
-        if (start or end):
-            if not isinstance(dt, datetime):
-                try:
-                    dt = datetime.fromisoformat(str(dt))
-                except Exception:
-                    continue
-            d = dt.date()
-            if start and d < start:
-                continue
-            if end and d > end:
-                continue
-
-        if q and q not in fname.lower():
-            continue
-
         summ = re.sub(r"\s+", " ", (r.get("sentiment_explanation") or "").strip())
         if len(summ) > 90:
             summ = summ[:90] + "..."
 
         d_disp, t_disp = format_dt_parts(dt)
 
-        filtered.append(
+        snip = None
+        if q:
+            snip = (
+                SessionSearch.snippet(r.get("transcript_raw") or "", q)
+                or SessionSearch.snippet(r.get("transcript_english") or "", q)
+            )
+
+        page_rows.append(
             {
                 "db_id": r.get("id"),
                 "source_type": r.get("source_type"),
                 "audio_file": fname,
-                "file_type": ftype,
+                "file_type": detect_file_type(fname),
                 "summary": summ,
                 "sentiment": r.get("sentiment_label") or "",
                 "score": r.get("sentiment_score"),
                 "tone": r.get("sentiment_tone") or "",
                 "explanation": r.get("sentiment_explanation") or "",
                 "scenario_id": r.get("scenario_id"),
-                "transcript": r.get("transcript_raw") or "",
-                "translation": r.get("transcript_english") or "",
                 "datetime": dt,
                 "date_display": d_disp,
                 "time_display": t_disp,
                 "human_sentiment_label": r.get("human_sentiment_label"),
                 "human_updated_at": r.get("human_updated_at"),
+                "snippet": Markup(snip) if snip else None,
             }
         )
 
-    total = len(filtered)
-    total_pages = max(1, (total + per_page - 1) // per_page)
-    page = max(1, min(page, total_pages))
-
-    start_i = (page - 1) * per_page
-    end_i = start_i + per_page
-    page_rows = filtered[start_i:end_i]
-
     return render_template(
         "user/sentiment_result.html",
         rows=page_rows,
@@ -684,6 +708,42 @@ def sentiment_result():
     )
 
 
+@app.get("/sentiment_result/export")
+@login_required
+def sentiment_result_export():
+    """Same filters as /sentiment_result, every matching row, streamed (see SessionExport.py)."""
+    fmt = (request.args.get("format", "csv") or "csv").lower()
+    if fmt not in SessionExport.EXPORT_FORMATS:
+        abort(400)
+
+    try:
+        chunks = SessionExport.export(
+            fmt,
+            q=(request.args.get("q", "") or "").strip(),
+            include_transcripts=request.args.get("transcripts") == "1",
+            archived=request.args.get("archived") == "1",
+            file_type=request.args.get("file_type", ""),
+            sentiment=request.args.get("sentiment", ""),
+            start=parse_date(request.args.get("start_date", "")),
+            end=parse_date(request.args.get("end_date", "")),
+        )
+    except ValueError as e:
+        return str(e), 400
+    except Exception as e:
+        print("[EXPORT ERROR]", e)
+        abort(503)
+
+    filename = f"sentiment_results_{datetime.now():%Y%m%d_%H%M%S}.{fmt}"
+    return Response(
+        chunks,
+        mimetype=SessionExport.EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Accel-Buffering": "no",  # nginx: pass chunks through as they come
+        },
+    )
+
+
 # ========================
 # Comment + human label update
 # Template: Interface/user/comment.html
@@ -696,12 +756,7 @@ def comment_page(source_type: str, db_id: int):
         abort(404)
 
     # locate row
-    rows = fetch_sessions_for_ui(limit=5000)
-    row = None
-    for r in rows:
-        if r.get("source_type") == source_type and int(r.get("id")) == int(db_id):
-            row = r
-            break
+    row = fetch_session(source_type, db_id)
     if not row:
         abort(404)
 
@@ -760,67 +815,192 @@ def transcript_view(source_type: str, db_id: int):
     if source_type not in ("audio", "text"):
         abort(404)
 
-    rows = fetch_sessions_for_ui(limit=5000)
-    row = None
-    for r in rows:
-        if r.get("source_type") == source_type and int(r.get("id")) == int(db_id):
-            row = r
-            break
+    # transcripts/<name>.txt files were folded into session_transcripts (TranscriptStore.backfill)
+    row = fetch_session(source_type, db_id, transcripts=True)
     if not row:
         abort(404)
 
-    file_name = row.get("file_name") or ""
-    safe_name = safe_filename(file_name)
-    safe_base = os.path.splitext(safe_name)[0]
-    txt_path = os.path.join(TRANSCRIPT_FOLDER, f"{safe_base}.txt")
-
-    transcript_text = ""
-    if os.path.exists(txt_path):
-        try:
-            with open(txt_path, "r", encoding="utf-8") as f:
-                transcript_text = f.read().strip()
-        except Exception:
-            transcript_text = ""
-
-    if not transcript_text:
-        transcript_text = (row.get("transcript_raw") or "").strip()
-
-    if not transcript_text:
-        transcript_text = "No transcript available."
+    transcript_text = (row.get("transcript_raw") or "").strip() or "No transcript available."
 
     return render_template(
         "user/transcript_view.html",
-        audio_file=file_name,
+        audio_file=row.get("file_name") or "",
         scenario_title=str(row.get("scenario_id") or ""),
         transcript=transcript_text,
     )
 
 
 # ========================
-# Minimal notification endpoints (safe for existing JS)
+# Notifications (in-memory, see EventBus.py) + server-sent events
 # ========================
+def _job_snapshot(job_id: str, username: str):
+    with JOBS_LOCK:
+        job = dict(JOBS.get(job_id) or {})
+    if not job or job.get("username") != username:
+        return None
+    job.pop("username", None)
+    job["job_id"] = job_id
+    return job
+
+
+@app.get("/api/events")
+@login_required
+def api_events():
+    """One long-lived text/event-stream per tab: job progress, notifications, unread count."""
+    username = session.get("username")
+    initial = [("unread", {"unread_count": notifications.unread_count(username)})]
+    job = _job_snapshot(session.get("last_job_id") or "", username)
+    if job:
+        initial.append(("job", job))
+
+    return Response(
+        sse_stream(bus.subscribe(username), initial),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/notifications/unread-count")
 @login_required
 def api_unread_count():
-    return jsonify({"unread_count": 0})
+    return jsonify({"unread_count": notifications.unread_count(session.get("username"))})
 
 
 @app.get("/api/notifications")
 @login_required
 def api_notifications():
-    return jsonify({"unread_count": 0, "items": []})
+    username = session.get("username")
+    limit = max(1, min(int(request.args.get("limit", 10)), 100))
+    return jsonify({
+        "unread_count": notifications.unread_count(username),
+        "items": notifications.items(username, limit),
+    })
 
 
 @app.post("/api/notifications/mark-read")
 @login_required
 def api_mark_read():
-    return jsonify({"ok": True})
+    data = request.get_json(silent=True) or {}
+    try:
+        notification_id = int(data.get("id"))
+    except (TypeError, ValueError):
+        return jsonify({"ok": False}), 400
+    unread = notifications.mark_read(session.get("username"), notification_id)
+    return jsonify({"ok": True, "unread_count": unread})
 
 
 @app.post("/api/notifications/mark-all-read")
 @login_required
 def api_mark_all_read():
-    return jsonify({"ok": True})
+    unread = notifications.mark_read(session.get("username"))
+    return jsonify({"ok": True, "unread_count": unread})
+
+
+# ========================
+# Upload -> background analysis job
+# Form: Interface/user/upload.html
+# ========================
+def _job_progress(job_id: str, username: str, **fields) -> None:
+    """Update JOBS[job_id] and push the new state to the user's open tabs."""
+    with JOBS_LOCK:
+        JOBS[job_id].update(fields)
+    bus.publish(username, "job", _job_snapshot(job_id, username))
+
+
+def _run_upload_job(job_id: str, username: str, uploads: list) -> None:
+    processed = 0
+    failed = 0
+
+    # text files together (per priority): short ones share Gemini calls
+    texts = [up for up in uploads if os.path.splitext(up["path"])[1].lower() in TEXT_EXTS]
+    done_files = 0
+    for priority in (PRIORITY_INTERACTIVE, PRIORITY_ZIP):
+        group = [up for up in texts if up["priority"] == priority]
+        if not group:
+            continue
+        try:
+            with job_context(priority, username):
+                text_results = process_text_files([up["path"] for up in group], {up["path"]: up["sha256"] for up in group})
+            for r in text_results:
+                if r.get("success"):
+                    processed += 1
+                else:
+                    failed += 1
+        except Exception as e:
+            print(f"[ERROR] Upload job {job_id} failed on text files: {e}")
+            failed += len(group)
+        done_files += len(group)
+        _job_progress(job_id, username, done=done_files, processed=processed, failed=failed)
+
+    for up in uploads:
+        path = up["path"]
+        ext = os.path.splitext(path)[1].lower()
+        if ext in TEXT_EXTS:
+            continue
+        try:
+            if ext == ".zip":
+                # ZIPs are queued behind interactive uploads (see Scheduler.py)
+                with job_context(PRIORITY_ZIP, username):
+                    r = process_zip_upload(path)
+                processed += r.get("processed", 0)
+                failed += r.get("failed", 0) + (0 if r.get("success") else 1)
+                continue
+
+            with job_context(up["priority"], username):
+                r = process_single_audio_file(path)
+            if r.get("success"):
+                processed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"[ERROR] Upload job {job_id} failed on {up['file_name']}: {e}")
+            failed += 1
+        finally:
+            done_files += 1
+            _job_progress(job_id, username, done=done_files, processed=processed, failed=failed)
+
+    status = "done" if processed or not failed else "error"
+    message = f"{processed} file(s) analysed, {failed} failed."
+
+    _job_progress(job_id, username, status=status, message=message)
+    notifications.add(username, f"Analysis {'complete' if status == 'done' else 'failed'}: {message}", "/sentiment_result")
+
+    send_push_to_user(username, "Analysis complete" if status == "done" else "Analysis failed", message)
+
+
+@app.post("/upload")
+@user_required
+def upload_file():
+    # a whole folder (webkitdirectory) is bulk work like a ZIP: queued behind single uploads
+    files = (
+        [(fs, PRIORITY_INTERACTIVE) for fs in request.files.getlist("audio_files")]
+        + [(fs, PRIORITY_ZIP) for fs in request.files.getlist("audio_folder")]
+        + [(fs, PRIORITY_INTERACTIVE) for fs in request.files.getlist("doc_files")]
+    )
+
+    uploads = []
+    for fs, priority in files:
+        if not fs or not fs.filename:
+            continue
+        ext = os.path.splitext(fs.filename)[1].lower()
+        if ext not in AUDIO_EXTS and ext not in TEXT_EXTS and ext != ".zip":
+            continue
+        uploads.append(dict(ingest_upload(fs, UPLOAD_FOLDER), priority=priority))
+
+    if not uploads:
+        flash("No supported files selected.")
+        return redirect(request.referrer or url_for("sentiment_result"))
+
+    job_id = uuid.uuid4().hex
+    username = session.get("username")
+    with JOBS_LOCK:
+        JOBS[job_id] = {"username": username, "status": "running", "message": "", "total": len(uploads), "done": 0}
+    session["last_job_id"] = job_id
+
+    Thread(target=_run_upload_job, args=(job_id, username, uploads), daemon=True).start()
+
+    flash(f"{len(uploads)} file(s) uploaded. Analysis is running in the background.")
+    return redirect(url_for("sentiment_result"))
 
 
 # ========================
@@ -842,7 +1022,13 @@ def api_job_status():
     if job.get("username") != session.get("username"):
         return jsonify({"status": "none"})
 
-    return jsonify({"status": job.get("status"), "message": job.get("message", "")})
+    return jsonify({
+        "job_id": job_id,
+        "status": job.get("status"),
+        "message": job.get("message", ""),
+        "done": job.get("done", 0),
+        "total": job.get("total", 0),
+    })
 
 
 if __name__ == "__main__":
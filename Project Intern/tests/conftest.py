@@ -0,0 +1,10 @@
+"""
+Unit tests for the pure-logic parts of the pipeline (no MySQL, no Gemini).
+
+    cd "Project Intern" && python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
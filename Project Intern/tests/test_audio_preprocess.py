@@ -0,0 +1,55 @@
+"""load_wav_mono: down-mix and anti-aliased resampling, block by block."""
+
+import wave
+
+import numpy as np
+import pytest
+
+import AudioPreprocess
+
+
+def _write_wav(path, channels, rate, seconds=2.0):
+    t = np.arange(int(rate * seconds)) / rate
+    voice = 0.5 * np.sin(2 * np.pi * 440 * t)
+    hiss = 0.3 * np.sin(2 * np.pi * 15000 * t) if rate > 30000 else 0 * t  # aliases if not filtered
+    frames = np.stack([voice + hiss, 0.9 * (voice + hiss)][:channels], axis=1)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((frames * 32767).astype("<i2").tobytes())
+    return path
+
+
+def _amplitude(samples, rate, freq):
+    x = samples.astype(np.float64) / 32767
+    spectrum = np.abs(np.fft.rfft(x)) * 2 / len(x)
+    return spectrum[int(round(freq * len(x) / rate))]
+
+
+def test_stereo_44k_becomes_mono_16k_without_aliasing(tmp_path):
+    path = _write_wav(tmp_path / "a.wav", channels=2, rate=44100)
+    samples, rate = AudioPreprocess.load_wav_mono(str(path))
+
+    assert rate == 16000
+    assert abs(len(samples) - 32000) <= 1
+    assert _amplitude(samples, rate, 440) == pytest.approx(0.475, abs=0.02)  # mean of 0.5 and 0.45
+    # 15 kHz would fold to 1 kHz at 16 kHz; the low-pass must have removed it
+    assert _amplitude(samples, rate, 1000) < 0.01
+
+
+def test_block_boundaries_do_not_change_the_output(tmp_path, monkeypatch):
+    path = _write_wav(tmp_path / "a.wav", channels=2, rate=44100)
+    whole, _ = AudioPreprocess.load_wav_mono(str(path))
+
+    monkeypatch.setattr(AudioPreprocess, "READ_BLOCK_FRAMES", 1001)
+    blocks, _ = AudioPreprocess.load_wav_mono(str(path))
+
+    assert len(blocks) == len(whole)
+    assert np.max(np.abs(blocks.astype(int) - whole.astype(int))) <= 1
+
+
+def test_phone_audio_is_never_upsampled(tmp_path):
+    path = _write_wav(tmp_path / "a.wav", channels=1, rate=8000)
+    samples, rate = AudioPreprocess.load_wav_mono(str(path))
+    assert rate == 8000 and len(samples) == 16000
@@ -0,0 +1,133 @@
+import time
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from CircuitBreaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+def _breaker(**kwargs):
+    kwargs.setdefault("failure_threshold", 2)
+    kwargs.setdefault("open_seconds", 0.05)
+    kwargs.setdefault("max_open_seconds", 1.0)
+    kwargs.setdefault("ramp_max", 2)
+    return CircuitBreaker(**kwargs)
+
+
+def _call(breaker, outcome):
+    is_probe = breaker.acquire(max_wait=1)
+    breaker.release(is_probe, outcome)
+    return is_probe
+
+
+def test_opens_after_consecutive_overloads_only():
+    b = _breaker()
+    _call(b, "overload")
+    _call(b, "ok")  # resets the run
+    _call(b, "overload")
+    _call(b, "error")  # other errors do not move the breaker
+    assert b.state == CLOSED
+    _call(b, "overload")
+    assert b.state == OPEN
+
+
+def test_open_breaker_holds_callers_back():
+    b = _breaker(open_seconds=10)
+    _call(b, "overload")
+    _call(b, "overload")
+    with pytest.raises(CircuitOpenError):
+        b.acquire(max_wait=0.05)
+
+
+def test_one_probe_then_ramp_up():
+    b = _breaker()
+    _call(b, "overload")
+    _call(b, "overload")
+    time.sleep(0.06)
+
+    assert b.acquire(max_wait=1) is True
+    assert b.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        b.acquire(max_wait=0.05)  # only one probe at a time
+    b.release(True, "ok")
+    assert b.state == CLOSED
+
+    # ramp: 1 call in flight, then 2, then unlimited (ramp_max=2)
+    assert b.acquire(max_wait=1) is False
+    with pytest.raises(CircuitOpenError):
+        b.acquire(max_wait=0.05)
+    b.release(False, "ok")
+    first, second = b.acquire(max_wait=1), b.acquire(max_wait=1)
+    b.release(first, "ok")
+    b.release(second, "ok")
+    assert b.snapshot()["ramp_limit"] is None
+
+
+def test_failed_probe_reopens_for_longer():
+    b = _breaker()
+    _call(b, "overload")
+    _call(b, "overload")
+    time.sleep(0.06)
+    assert _call(b, "overload") is True
+    assert b.state == OPEN
+    assert b._open_seconds == pytest.approx(0.1)
+
+
+def test_overload_during_ramp_reopens():
+    b = _breaker()
+    _call(b, "overload")
+    _call(b, "overload")
+    time.sleep(0.06)
+    _call(b, "ok")  # probe
+    _call(b, "overload")
+    assert b.state == OPEN
+
+
+def test_guard_classifies_exceptions():
+    b = _breaker(failure_threshold=1)
+    with pytest.raises(RuntimeError):
+        with b.guard(lambda e: "overload", max_wait=1):
+            raise RuntimeError("503 overloaded")
+    assert b.state == OPEN
+
+
+def test_guard_holds_no_slot_while_the_breaker_is_open():
+    b = _breaker(open_seconds=0.2)
+    _call(b, "overload")
+    _call(b, "overload")
+    slots = []
+
+    @contextmanager
+    def slot():
+        slots.append("taken")
+        yield
+
+    t0 = time.monotonic()
+    with b.guard(lambda e: "overload", max_wait=1, slot=slot):
+        assert slots == ["taken"]
+        assert b.state == HALF_OPEN
+    assert time.monotonic() - t0 >= 0.15
+    assert b.state == CLOSED
+
+
+def test_guard_gives_the_slot_back_when_the_permit_is_gone():
+    b = _breaker(open_seconds=0.05)
+    _call(b, "overload")
+    _call(b, "overload")
+    time.sleep(0.06)
+    events = []
+
+    @contextmanager
+    def slot():
+        # another caller takes the probe while we queue for the slot
+        if not events:
+            assert b.acquire(max_wait=1) is True
+            threading.Timer(0.05, b.release, args=(True, "ok")).start()
+        events.append("in")
+        yield
+        events.append("out")
+
+    with b.guard(lambda e: "overload", max_wait=1, slot=slot):
+        pass
+    assert events == ["in", "out", "in", "out"]
@@ -0,0 +1,34 @@
+"""DiskCache: lazy directory, round trip, least-recently-used eviction."""
+
+import os
+
+import DiskCache
+
+
+def _cache(tmp_path, monkeypatch, max_bytes):
+    monkeypatch.setattr(DiskCache, "CACHE_ROOT", str(tmp_path))
+    return DiskCache.DiskCache("t", max_bytes)
+
+
+def test_directory_is_created_on_first_put(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, monkeypatch, 1000)
+    assert not os.path.exists(cache.dir)
+    assert cache.get("k") is None
+
+    cache.put("k", "value")
+    assert cache.get("k") == "value"
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, monkeypatch, 35)
+    for n, key in enumerate(["a", "b", "c"]):
+        cache.put(key, key * 10)
+        os.utime(cache._path(key), (n, n))  # a oldest, c newest
+
+    # used since: b is now the oldest one
+    assert cache.get("a") == "a" * 10
+    cache.put("d", "d" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" * 10
+    assert cache.get("d") == "d" * 10
@@ -0,0 +1,118 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+import Hedging
+from Hedging import HedgeBudget, LatencyTracker
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    b = HedgeBudget(ratio=1.0, burst=3)
+    monkeypatch.setattr(Hedging, "hedge_budget", b)
+    return b
+
+
+def test_budget_earns_fractions_and_caps_the_burst():
+    b = HedgeBudget(ratio=0.5, burst=1.5)
+    assert not b.try_spend()
+    b.earn()
+    assert not b.try_spend()
+    b.earn()
+    assert b.try_spend()
+    for _ in range(10):
+        b.earn()
+    assert b.try_spend()
+    assert not b.try_spend()  # 1.5 tokens at most
+
+
+def test_latency_percentile_needs_samples_and_is_per_key():
+    t = LatencyTracker(window=100)
+    for i in range(1, 21):
+        t.observe("m", float(i), "single")
+    assert t.percentile("m", 0.95, min_samples=21, key="single") is None
+    assert t.percentile("m", 0.95, min_samples=20, key="single") == 20.0
+    assert t.percentile("m", 0.95, min_samples=1, key="batch") is None
+
+
+def _calls(*behaviours):
+    """fn() whose n-th call sleeps / raises / returns as behaviours[n] says."""
+    lock = threading.Lock()
+    count = []
+
+    def fn():
+        with lock:
+            n = len(count)
+            count.append(n)
+        delay, result = behaviours[n]
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return fn, count
+
+
+def test_fast_primary_is_not_hedged(budget):
+    fn, count = _calls((0.0, "primary"))
+    assert Hedging.hedged_call(fn, delay=0.5) == "primary"
+    assert len(count) == 1
+
+
+def test_slow_primary_is_hedged_and_hedge_wins(budget):
+    fn, count = _calls((1.0, "primary"), (0.0, "hedge"))
+    assert Hedging.hedged_call(fn, delay=0.05) == "hedge"
+    assert len(count) == 2
+
+
+def test_no_budget_waits_for_primary(budget):
+    budget.ratio = 0.0
+    fn, count = _calls((0.1, "primary"))
+    assert Hedging.hedged_call(fn, delay=0.01) == "primary"
+    assert len(count) == 1
+
+
+def test_failed_first_answer_falls_back_to_the_other(budget):
+    fn, _ = _calls((0.1, RuntimeError("primary failed")), (0.2, "hedge"))
+    assert Hedging.hedged_call(fn, delay=0.01) == "hedge"
+
+
+def test_both_failing_raises_the_first_error(budget):
+    fn, _ = _calls((0.1, RuntimeError("first")), (0.2, RuntimeError("second")))
+    with pytest.raises(RuntimeError, match="first"):
+        Hedging.hedged_call(fn, delay=0.01)
+
+
+def test_duplicate_goes_through_its_own_admission(budget):
+    admitted = []
+
+    @contextmanager
+    def admit():
+        admitted.append(threading.current_thread().name)
+        yield
+
+    fn, count = _calls((0.5, "primary"), (0.0, "hedge"))
+    assert Hedging.hedged_call(fn, delay=0.05, admit=admit) == "hedge"
+    assert len(admitted) == 1 and admitted[0] != threading.current_thread().name
+
+
+def test_duplicate_still_queued_is_not_sent_or_counted(budget):
+    release = threading.Event()
+
+    @contextmanager
+    def admit():
+        release.wait(2)  # no slot until the primary has answered
+        yield
+
+    before = Hedging.hedge_stats()
+    fn, count = _calls((0.2, "primary"), (0.0, "hedge"))
+    assert Hedging.hedged_call(fn, delay=0.05, admit=admit) == "primary"
+    release.set()
+    time.sleep(0.1)
+
+    after = Hedging.hedge_stats()
+    assert len(count) == 1
+    assert after["fired"] == before["fired"]
+    assert after["lost"] == before["lost"]
@@ -0,0 +1,208 @@
+"""JobQueue claims and lease fencing, on an in-memory SQLite that speaks the MySQL subset JobQueue uses."""
+
+import re
+import sqlite3
+
+import pytest
+
+import DBConnector
+import JobQueue
+
+SCHEMA = """
+CREATE TABLE ingest_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL UNIQUE,
+    file_path TEXT NOT NULL,
+    file_kind TEXT NOT NULL,
+    priority_rank INTEGER NOT NULL DEFAULT 2,
+    username TEXT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    available_at TEXT NOT NULL DEFAULT (datetime('now')),
+    lease_owner TEXT NULL,
+    lease_expires_at TEXT NULL,
+    fence INTEGER NOT NULL DEFAULT 0,
+    parent_job_id INTEGER NULL,
+    result_table TEXT NULL,
+    result_id INTEGER NULL,
+    error TEXT NULL
+)
+"""
+
+_MYSQL_TO_SQLITE = [
+    (re.compile(r"NOW\(\) \+ INTERVAL %s SECOND"), "datetime('now', %s || ' seconds')"),
+    (re.compile(r"NOW\(\)"), "datetime('now')"),
+    (re.compile(r"INSERT IGNORE"), "INSERT OR IGNORE"),
+    (re.compile(r"\bIF\("), "IIF("),
+    (re.compile(r"FOR UPDATE SKIP LOCKED"), ""),
+    (re.compile(r"%s"), "?"),
+]
+
+
+class _Cursor:
+    def __init__(self, conn, dictionary):
+        self._cur = conn.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        for pattern, repl in _MYSQL_TO_SQLITE:
+            sql = pattern.sub(repl, sql)
+        self._cur.execute(sql, tuple(params))
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {d[0]: v for d, v in zip(self._cur.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def close(self):
+        self._cur.close()
+
+
+class _Connection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary=False):
+        return _Cursor(self._conn, dictionary)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("CONCAT", -1, lambda *parts: "".join(str(p) for p in parts if p is not None))
+    conn.execute(SCHEMA)
+    monkeypatch.setattr(JobQueue, "get_db_connection", lambda: _Connection(conn))
+    yield conn
+    conn.close()
+
+
+def _enqueue(name, **kwargs):
+    return JobQueue.enqueue_file(f"/data/{name}", content_hash=name.ljust(64, "0"), **kwargs)
+
+
+def _row(db, job_id):
+    return db.execute("SELECT status, fence, attempts FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+
+def test_enqueue_same_content_once(db):
+    assert _enqueue("a.wav") is not None
+    assert _enqueue("a.wav") is None
+
+
+def test_claim_best_priority_first_and_only_once(db):
+    bulk = _enqueue("bulk.wav", priority="bulk")
+    interactive = _enqueue("mine.txt", priority="interactive")
+
+    first = JobQueue.claim("w1")
+    assert [j["job_id"] for j in first] == [interactive]
+    assert first[0]["fence"] == 1 and first[0]["attempts"] == 1
+
+    second = JobQueue.claim("w2", limit=5)
+    assert [j["job_id"] for j in second] == [bulk]
+    assert JobQueue.claim("w3") == []
+
+
+def test_claim_filters_by_kind(db):
+    _enqueue("a.wav")
+    text = _enqueue("b.txt")
+    assert [j["job_id"] for j in JobQueue.claim("w1", kind="text")] == [text]
+
+
+def test_expired_lease_fences_out_the_old_worker(db):
+    job_id = _enqueue("a.wav")
+    [stale] = JobQueue.claim("w1", lease_seconds=-5)
+    assert JobQueue.reap_expired() == 1
+    assert _row(db, job_id)[0] == "pending"
+
+    [fresh] = JobQueue.claim("w2")
+    assert fresh["fence"] == stale["fence"] + 1
+
+    # the first worker comes back: nothing it does touches the job any more
+    assert JobQueue.heartbeat([stale]) == 0
+    assert JobQueue.still_running([stale, fresh]) == [fresh]
+    assert JobQueue.complete(stale) is False
+    JobQueue.fail(stale, "late")
+    assert _row(db, job_id) == ("running", fresh["fence"], 2)
+
+    assert JobQueue.heartbeat([fresh]) == 1
+    assert JobQueue.complete(fresh) is True
+    assert _row(db, job_id)[0] == "done"
+
+
+def test_result_write_is_fenced(db):
+    job_id = _enqueue("a.wav")
+    [stale] = JobQueue.claim("w1", lease_seconds=-5)
+    JobQueue.reap_expired()
+    JobQueue.claim("w2")
+
+    cursor = _Connection(db).cursor()
+    with DBConnector.ingest_job_context({"/data/a.wav": (job_id, stale["fence"])}):
+        assert DBConnector._fence_ingest_job(cursor, "/data/a.wav", "audio_sessions", 1) is False
+    assert _row(db, job_id)[0] == "running"
+
+
+def test_fail_backs_off_then_gives_up(db, monkeypatch):
+    monkeypatch.setattr(JobQueue, "JOB_MAX_ATTEMPTS", 2)
+    job_id = _enqueue("a.wav")
+
+    [job] = JobQueue.claim("w1")
+    JobQueue.fail(job, "boom")
+    assert _row(db, job_id)[0] == "pending"
+    assert JobQueue.claim("w1") == []  # not before the retry delay
+
+    db.execute("UPDATE ingest_jobs SET available_at = datetime('now', '-1 seconds')")
+    [job] = JobQueue.claim("w1")
+    JobQueue.fail(job, "boom")
+    assert _row(db, job_id)[0] == "failed"
+
+
+def test_claim_filters_by_exact_rank(db):
+    _enqueue("mine.txt", priority="interactive")
+    bulk = _enqueue("bulk.txt", priority="bulk")
+    assert [j["job_id"] for j in JobQueue.claim("w1", rank=2)] == [bulk]
+
+
+def test_finished_zips_waits_for_every_member(db):
+    zip_id = _enqueue("calls.zip")
+    [zip_job] = JobQueue.claim("w1")
+    JobQueue.complete(zip_job, "zip")
+    _enqueue("m1.wav", parent_job_id=zip_id)
+    _enqueue("m2.wav", parent_job_id=zip_id)
+    zip_hash = "calls.zip".ljust(64, "0")
+
+    first, second = JobQueue.claim("w1", limit=2)
+    assert JobQueue.complete(first)
+    assert JobQueue.finished_zips(job_ids=[zip_id]) == []
+    JobQueue.fail(second, "boom")  # back to pending: not finished yet
+    assert JobQueue.finished_zips(content_hashes=[zip_hash]) == []
+
+    db.execute("UPDATE ingest_jobs SET status = 'failed' WHERE job_id = ?", (second["job_id"],))
+    assert JobQueue.finished_zips(job_ids=[zip_id]) == [zip_hash]
+    assert JobQueue.finished_zips(content_hashes=[zip_hash]) == [zip_hash]
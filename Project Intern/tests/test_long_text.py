@@ -0,0 +1,73 @@
+"""LongText: paragraph-aware chunking and the cached map-reduce over chunks."""
+
+import pytest
+
+import DiskCache
+import LongText
+
+
+def test_chunks_respect_the_limit_and_keep_every_word():
+    paragraphs = [" ".join(f"p{p}w{w}." for w in range(40)) for p in range(30)]
+    paragraphs.append("x" * 500)  # one word longer than a chunk
+    text = "\n\n".join(paragraphs)
+
+    chunks = LongText.split_text_chunks(text, max_chars=300)
+
+    assert len(chunks) > 1
+    assert all(len(c) <= 300 for c in chunks)
+    assert "".join("".join(chunks).split()) == "".join(text.split())
+
+
+def test_whole_paragraphs_are_packed_together():
+    chunks = LongText.split_text_chunks("first para\n\nsecond para\n\nthird para", max_chars=25)
+    assert chunks == ["first para\n\nsecond para", "third para"]
+
+
+@pytest.fixture
+def analyzed(tmp_path, monkeypatch):
+    monkeypatch.setattr(DiskCache, "CACHE_ROOT", str(tmp_path))
+    monkeypatch.setattr(LongText, "_chunk_result_cache", DiskCache.DiskCache("chunks", 10 ** 6))
+    monkeypatch.setattr(LongText.split_text_chunks, "__defaults__", (20,))
+
+    sent, failing = [], set()
+
+    def analyze(text, scenarios_text, prompt_suffix=""):
+        sent.append(text)
+        if text in failing:
+            return {"error": "Invalid JSON", "raw": "oops"}
+        label = "Complaint" if "angry" in text else "Neutral"
+        return {
+            "transcript": text.upper(),
+            "language_used": ["English"],
+            "sentiment": {"label": label, "score": 90},
+            "scenario_id": 1,
+            "model_used": "flash",
+        }
+
+    monkeypatch.setattr(LongText, "analyze_text_all_in_one", analyze)
+    return sent, failing
+
+
+def test_chunks_are_reduced_in_order(analyzed):
+    sent, _ = analyzed
+    result = LongText.analyze_long_text("calm opening line\n\nangry middle part\n\ncalm closing line", "")
+
+    assert sorted(sent) == sorted(["calm opening line", "angry middle part", "calm closing line"])
+    assert result["transcript"] == "CALM OPENING LINE\n\nANGRY MIDDLE PART\n\nCALM CLOSING LINE"
+    assert result["sentiment"]["label"] == "Complaint"
+    assert result["model_used"] == "flash"
+
+
+def test_rerun_only_resends_failed_chunks(analyzed):
+    sent, failing = analyzed
+    text = "calm opening line\n\nangry middle part\n\ncalm closing line"
+
+    failing.add("angry middle part")
+    result = LongText.analyze_long_text(text, "")
+    assert result["error"].startswith("1 of 3 chunks failed (chunks [2])")
+
+    failing.clear()
+    sent.clear()
+    result = LongText.analyze_long_text(text, "")
+    assert sent == ["angry middle part"]
+    assert "error" not in result
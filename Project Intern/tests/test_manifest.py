@@ -0,0 +1,68 @@
+"""Manifest: status per content hash, persisted across runs; cached path hashes; claims."""
+
+import os
+
+import pytest
+
+from Manifest import Manifest, STATUS_DONE, STATUS_FAILED, STATUS_RUNNING
+from Utils import file_sha256
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    m = Manifest(str(tmp_path / "manifest.sqlite3"))
+    yield m
+    m.close()
+
+
+def test_status_survives_a_restart(tmp_path):
+    path = str(tmp_path / "manifest.sqlite3")
+    m = Manifest(path)
+    m.start("h1", "/in/a.txt")
+    m.start("h2", "/in/calls.zip", member="b.wav")
+    m.finish("h2", ok=True)
+    m.start("h3", "/in/c.txt")
+    m.finish("h3", ok=False, error="boom")
+    m.close()
+
+    m = Manifest(path)  # h1 was left running, as after a crash
+    assert m.status("h1") == STATUS_RUNNING
+    assert m.is_done("h2")
+    assert m.status("h3") == STATUS_FAILED
+    assert m.status("unknown") is None
+    assert m.summary() == {STATUS_RUNNING: 1, STATUS_DONE: 1, STATUS_FAILED: 1}
+    m.close()
+
+
+def test_retry_counts_attempts_and_clears_the_error(manifest):
+    manifest.start("h", "/in/a.txt")
+    manifest.finish("h", ok=False, error="boom")
+    manifest.start("h", "/in/renamed.txt")
+
+    row = manifest._conn.execute("SELECT path, status, attempts, error FROM processed_files").fetchone()
+    assert row == (os.path.abspath("/in/renamed.txt"), STATUS_RUNNING, 2, None)
+
+
+def test_file_hash_is_reused_until_the_file_changes(manifest, tmp_path, monkeypatch):
+    f = tmp_path / "a.txt"
+    f.write_text("one")
+    assert manifest.file_hash(str(f)) == file_sha256(str(f))
+
+    monkeypatch.setattr("Manifest.file_sha256", lambda path: pytest.fail("re-hashed an unchanged file"))
+    first = manifest.file_hash(str(f))
+
+    monkeypatch.undo()
+    f.write_text("two, longer")
+    assert manifest.file_hash(str(f)) != first
+
+
+def test_claim_is_exclusive_and_skips_done_hashes(manifest):
+    assert manifest.claim("h")
+    assert not manifest.claim("h")
+    manifest.release("h")
+    assert manifest.claim("h")
+    manifest.release("h")
+
+    manifest.start("h", "/in/a.txt")
+    manifest.finish("h", ok=True)
+    assert not manifest.claim("h")
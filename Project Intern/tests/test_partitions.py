@@ -0,0 +1,19 @@
+from datetime import date, datetime
+
+from Partitions import add_months, month_start, partition_name
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2024, 11, 1), 2) == date(2025, 1, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert add_months(date(2024, 3, 1), -24) == date(2022, 3, 1)
+    assert add_months(date(2024, 3, 1), 0) == date(2024, 3, 1)
+
+
+def test_add_months_returns_a_month_start():
+    assert add_months(date(2024, 1, 31), 1) == date(2024, 2, 1)
+
+
+def test_month_start_and_partition_name():
+    assert month_start(datetime(2024, 2, 29, 23, 59)) == date(2024, 2, 1)
+    assert partition_name(date(2024, 2, 1)) == "p202402"
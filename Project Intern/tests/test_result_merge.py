@@ -0,0 +1,9 @@
+from ResultMerge import merge_models
+
+
+def test_merge_models_keeps_first_seen_order_without_duplicates():
+    assert merge_models("flash", "flash-lite, flash", None, " pro ") == "flash, flash-lite, pro"
+
+
+def test_merge_models_nothing_known():
+    assert merge_models(None, "", " , ") is None
@@ -0,0 +1,19 @@
+from SessionSearch import snippet
+
+
+def test_snippet_marks_hits_and_escapes_html():
+    out = snippet("Client: <b>refund</b> still LATE", "refund late")
+    assert out == "Client: &lt;b&gt;<mark>refund</mark>&lt;/b&gt; still <mark>LATE</mark>"
+
+
+def test_snippet_windows_the_densest_cluster():
+    text = "refund " + "x" * 500 + " late refund late " + "y" * 500
+    out = snippet(text, "refund late", width=60)
+    assert out.startswith("…") and out.endswith("…")
+    assert out.count("<mark>") == 3
+
+
+def test_snippet_none_without_hits_or_usable_terms():
+    assert snippet("nothing here", "refund") is None
+    assert snippet("a b c", "a") is None  # single-character terms are ignored
+    assert snippet("", "refund") is None
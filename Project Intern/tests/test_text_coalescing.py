@@ -0,0 +1,47 @@
+"""process_text_files: short texts share one batch call, the rest (and batch misses) go one by one."""
+
+import pytest
+
+import TextProcessing
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = {"batch": [], "single": []}
+    texts = {"/t/a.txt": "short a", "/t/b.txt": "short b", "/t/c.txt": "short c", "/t/long.txt": "x" * 50}
+
+    def batch(items, scenario_text):
+        calls["batch"].append([text for _, text in items])
+        return {str(i): {"transcript": text} for i, text in items if text != "short b"}  # b is dropped
+
+    def single(text, scenario_text):
+        calls["single"].append(text)
+        return {"transcript": text}
+
+    monkeypatch.setattr(TextProcessing, "ENABLE_TEXT_COALESCING", True)
+    monkeypatch.setattr(TextProcessing, "COALESCE_MAX_CHARS", 10)
+    monkeypatch.setattr(TextProcessing, "_scenario_text", lambda: "")
+    monkeypatch.setattr(TextProcessing, "_extract", lambda path, content_hash=None: texts[path])
+    monkeypatch.setattr(TextProcessing, "analyze_texts_batch", batch)
+    monkeypatch.setattr(TextProcessing, "_analyze_text", single)
+    monkeypatch.setattr(TextProcessing, "_store_text_result", lambda path, result: {"success": True, "file": path, **result})
+    return calls
+
+
+def test_short_texts_share_one_call_and_misses_are_retried(calls):
+    paths = ["/t/a.txt", "/t/long.txt", "/t/b.txt", "/t/c.txt"]
+    results = TextProcessing.process_text_files(paths)
+
+    assert calls["batch"] == [["short a", "short b", "short c"]]
+    assert sorted(calls["single"]) == ["short b", "x" * 50]
+    assert [r["file"] for r in results] == paths
+    assert all(r["success"] for r in results)
+
+
+def test_batch_size_limit_splits_batches(calls, monkeypatch):
+    monkeypatch.setattr(TextProcessing, "COALESCE_BATCH_SIZE", 2)
+    TextProcessing.process_text_files(["/t/a.txt", "/t/b.txt", "/t/c.txt"])
+
+    # a+b batched; c alone is not worth a batch and goes straight to a single call
+    assert calls["batch"] == [["short a", "short b"]]
+    assert sorted(calls["single"]) == ["short b", "short c"]
@@ -0,0 +1,30 @@
+import pytest
+
+import TranscriptStore
+
+TEXT = "Client: Saya mahu refund. 退款 still pending\n" * 50
+
+
+@pytest.mark.parametrize("codec", ["zlib", "none"])
+def test_compress_round_trip(codec):
+    blob = TEXT.encode("utf-8") if codec == "none" else TranscriptStore.compress(TEXT, codec)
+    assert TranscriptStore.decompress(blob, codec) == TEXT
+
+
+def test_none_passes_through():
+    assert TranscriptStore.compress(None) is None
+    assert TranscriptStore.decompress(None, "zlib") is None
+
+
+def test_row_values_compresses_repetitive_text():
+    codec, raw_z, english_z, raw_bytes = TranscriptStore._row_values(TEXT, None)
+    assert codec == TranscriptStore.TRANSCRIPT_CODEC
+    assert english_z is None and raw_bytes == len(TEXT.encode("utf-8"))
+    assert len(raw_z) < raw_bytes
+    assert TranscriptStore.decode_pair(codec, raw_z, english_z) == (TEXT, None)
+
+
+def test_row_values_stores_tiny_text_uncompressed():
+    codec, raw_z, english_z, _ = TranscriptStore._row_values("ok", "ok")
+    assert codec == "none"
+    assert TranscriptStore.decode_pair(codec, raw_z, english_z) == ("ok", "ok")
@@ -0,0 +1,54 @@
+"""trim_silence: long silence and hold music are cut, timestamps map back to the original."""
+
+import numpy as np
+import pytest
+
+import VoiceActivity
+
+SR = 16000
+rng = np.random.default_rng(0)
+
+
+def _speech(seconds):
+    t = np.arange(int(seconds * SR)) / SR
+    syllables = (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) ** 2  # loud/quiet a few times a second
+    return (rng.standard_normal(len(t)) * syllables * 5000).astype(np.int16)
+
+
+def _silence(seconds):
+    return (rng.standard_normal(int(seconds * SR)) * 30).astype(np.int16)
+
+
+def _hold_music(seconds):
+    return (np.sin(2 * np.pi * 440 * np.arange(int(seconds * SR)) / SR) * 8000).astype(np.int16)
+
+
+@pytest.mark.parametrize("gap", [_silence, _hold_music])
+def test_long_gap_is_cut_to_a_short_pause(gap):
+    samples = np.concatenate([_speech(3), gap(10), _speech(3)])
+    trimmed, timestamp_map = VoiceActivity.trim_silence(samples, SR)
+
+    assert 6 <= len(trimmed) / SR <= 8
+    assert len(timestamp_map) == 2
+    first, second = timestamp_map
+    assert first["original_start"] == 0.0
+    assert second["trimmed_start"] == pytest.approx(first["duration"])
+    assert 12 <= second["original_start"] <= 13  # second speech starts at 13 s, minus padding
+
+    # the same audio sample, looked up in both recordings
+    t = second["trimmed_start"] + 1.0
+    orig = VoiceActivity.to_original_time(t, timestamp_map)
+    assert np.array_equal(trimmed[int(t * SR):int(t * SR) + 100], samples[int(orig * SR):int(orig * SR) + 100])
+
+
+def test_no_speech_is_sent_untouched():
+    samples = _silence(5)
+    trimmed, timestamp_map = VoiceActivity.trim_silence(samples, SR)
+    assert trimmed is samples
+    assert timestamp_map == [{"trimmed_start": 0.0, "original_start": 0.0, "duration": 5.0}]
+
+
+def test_short_pauses_are_kept():
+    samples = np.concatenate([_speech(2), _silence(1), _speech(2)])
+    trimmed, _ = VoiceActivity.trim_silence(samples, SR)
+    assert len(trimmed) == len(samples)
@@ -10,13 +10,16 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import classification_report, confusion_matrix
 
 from DBConnector import get_db_connection
+import TranscriptStore
+import SessionArchive
 
 def fetch_labeled_data():
     """
     Requires:
       audio_sessions.human_sentiment_label (Complaint / Non-Complaint)
     Uses:
-      transcript_english if exists else transcript_raw
+      transcript_english if exists else transcript_raw (from session_transcripts)
+      plus labelled sessions already moved to session_archive
     """
     conn = get_db_connection()
     if not conn:
@@ -24,17 +27,27 @@ def fetch_labeled_data():
 
     cur = conn.cursor(dictionary=True)
     cur.execute("""
-        SELECT
-            COALESCE(transcript_english, transcript_raw) AS text,
-            human_sentiment_label AS label
+        SELECT session_id, human_sentiment_label AS label
         FROM audio_sessions
         WHERE human_sentiment_label IS NOT NULL
-          AND (transcript_raw IS NOT NULL OR transcript_english IS NOT NULL)
     """)
-    rows = cur.fetchall()
+    labeled = cur.fetchall()
+    texts = TranscriptStore.get_many(cur, [("audio", r["session_id"]) for r in labeled])
+    archived = SessionArchive.labeled(cur, "audio")
     cur.close()
     conn.close()
 
+    rows = []
+    for r in labeled:
+        t = texts.get(("audio", r["session_id"])) or {}
+        text = t.get("transcript_english") or t.get("transcript_raw")
+        if text:
+            rows.append({"text": text, "label": r["label"]})
+    for r in archived:
+        text = r.get("transcript_english") or r.get("transcript_raw")
+        if text:
+            rows.append({"text": text, "label": r["human_sentiment_label"]})
+
     df = pd.DataFrame(rows)
     if df.empty:
         return df